@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from .config import Config
+from .utils import atomic_write_json, get_cache_dir, setup_logger
+
+logger = setup_logger("AnalysisCache")
+
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+class AnalysisCache:
+    """
+    On-disk cache of reference video analysis results.
+
+    Each entry is one JSON file named after its key. The file mtime is bumped on every
+    hit, so eviction drops the least recently used entries first once the entry count
+    or total size limit is exceeded. Entries older than `max_age_days` are never served.
+    """
+
+    def __init__(self, directory=None, max_entries=None, max_bytes=None, max_age_days=None):
+        settings = Config.get_setting("analysis_cache", {})
+        self.enabled = settings.get("enabled", True)
+        self.directory = directory or get_cache_dir("analysis")
+        self.max_entries = max_entries or settings.get("max_entries", DEFAULT_MAX_ENTRIES)
+        self.max_bytes = max_bytes or settings.get("max_bytes", DEFAULT_MAX_BYTES)
+        self.max_age_days = max_age_days or settings.get("max_age_days", DEFAULT_MAX_AGE_DAYS)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(video_sha256, user_prompt, prompt_language, model, template_sha256):
+        """Build the cache key for one analysis request."""
+        raw = json.dumps(
+            [video_sha256, user_prompt or "", prompt_language or "", model or "", template_sha256],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached analysis for `key`, or None on a miss or stale entry."""
+        if not self.enabled:
+            return None
+        path = self._entry_path(key)
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except FileNotFoundError:
+                return None
+            except Exception as e:
+                logger.warning(f"Dropping unreadable analysis cache entry {path}: {e}")
+                self._remove(path)
+                return None
+
+            if time.time() - entry.get("created_at", 0) > self.max_age_days * 86400:
+                self._remove(path)
+                return None
+
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+            return entry.get("analysis")
+
+    def put(self, key, analysis):
+        """Store an analysis result and evict old entries if over budget."""
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                atomic_write_json(self._entry_path(key), {"created_at": time.time(), "analysis": analysis})
+            except Exception as e:
+                logger.warning(f"Failed to write analysis cache entry: {e}")
+                return
+            self._evict()
+
+    def clear(self):
+        """Remove every cached analysis."""
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    self._remove(os.path.join(self.directory, name))
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json") or name.startswith(".tmp_"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age_days * 86400:
+                self._remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            self._remove(path)
+            total_bytes -= size
@@ -0,0 +1,145 @@
+import json
+import re
+
+# Response schema for reference video analysis. `propertyOrdering` makes Gemini emit
+# veo_prompt before the douyin copy, so a streaming caller can start Veo early.
+ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "style_notes": {"type": "STRING"},
+        "veo_prompt": {"type": "STRING"},
+        "douyin": {
+            "type": "OBJECT",
+            "properties": {
+                "title": {"type": "STRING"},
+                "description": {"type": "STRING"},
+                "tags": {"type": "ARRAY", "items": {"type": "STRING"}},
+            },
+            "required": ["title", "description", "tags"],
+            "propertyOrdering": ["title", "description", "tags"],
+        },
+    },
+    "required": ["style_notes", "veo_prompt", "douyin"],
+    "propertyOrdering": ["style_notes", "veo_prompt", "douyin"],
+}
+
+REPAIR_PROMPT = (
+    "The following text was supposed to be a single JSON object with the keys "
+    "\"style_notes\", \"veo_prompt\" and \"douyin\" (an object with \"title\", "
+    "\"description\" and \"tags\"). Return it as valid JSON matching that schema, keeping "
+    "the original wording. Output JSON only.\n\n"
+)
+
+
+def extract_json(text):
+    """
+    Parse the analysis JSON object from a model response.
+
+    Accepts a bare object, a fenced ```json block, or an object embedded in prose; in the
+    last case the first complete object is decoded, never a greedy span between the
+    first "{" and the last "}".
+    """
+    if not text:
+        raise ValueError("Empty response")
+    text = text.strip()
+    if text.startswith("{") and text.endswith("}"):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+
+    fenced_match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, flags=re.DOTALL | re.IGNORECASE)
+    if fenced_match:
+        try:
+            return json.loads(fenced_match.group(1))
+        except ValueError:
+            pass
+
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"\{", text):
+        try:
+            data, _ = decoder.raw_decode(text, match.start())
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+
+    raise ValueError("Failed to parse JSON from model response")
+
+
+def validate_analysis(data):
+    """Raise ValueError unless `data` has a non-empty veo_prompt; returns `data`."""
+    if not isinstance(data, dict):
+        raise ValueError("Model response is not a JSON object")
+    if not isinstance(data.get("veo_prompt"), str) or not data["veo_prompt"].strip():
+        raise ValueError("Model response missing 'veo_prompt'")
+    return data
+
+
+class StreamingFieldParser:
+    """
+    Incremental scanner for a JSON object arriving in chunks.
+
+    `feed(text)` returns the top-level string fields that became complete in that
+    chunk, as (key, value) pairs, without waiting for the rest of the object. Nested
+    objects and arrays are skipped; the full object is decoded by `result()` at the end.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._expect_key = False
+        self._key = None
+        self.fields = {}
+
+    def feed(self, text):
+        completed = []
+        self._text += text
+        while self._pos < len(self._text):
+            char = self._text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        try:
+                            value = json.loads(self._text[self._string_start:self._pos + 1])
+                        except ValueError:
+                            # Malformed string (e.g. raw control characters); leave it to result().
+                            self._pos += 1
+                            continue
+                        if self._expect_key:
+                            self._key = value
+                        else:
+                            self.fields[self._key] = value
+                            completed.append((self._key, value))
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1 and char == "{":
+                    self._expect_key = True
+            elif char in "}]":
+                self._depth -= 1
+            elif self._depth == 1 and char == ":":
+                self._expect_key = False
+            elif self._depth == 1 and char == ",":
+                self._expect_key = True
+            self._pos += 1
+        return completed
+
+    @property
+    def text(self):
+        return self._text
+
+    def result(self):
+        """Decode the complete streamed response."""
+        return extract_json(self._text)
@@ -0,0 +1,773 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import time
+from .analysis_cache import AnalysisCache
+from .analysis_output import ANALYSIS_SCHEMA, REPAIR_PROMPT, StreamingFieldParser, extract_json, validate_analysis
+from .client_pool import ClientRegistry
+from .config import Config
+from .download import MAX_PARALLEL_DOWNLOADS, DownloadError, stream_download, write_bytes_atomic
+from .eta import DurationEstimator, current_progress
+from .job_store import DOWNLOADING, FAILED, RUNNING, SUCCEEDED, JobStore
+from .metrics import (
+    ANALYSIS,
+    DOWNLOAD,
+    FILE_WAIT,
+    GENERATION,
+    LOCAL_COPY,
+    PREPROCESS,
+    SAVE,
+    UPLOAD,
+    VEO_SUBMIT,
+    MetricsRegistry,
+)
+from .output_store import OutputStore, candidate_path
+from .polling import OperationPoller, PollingPolicy, PollingTimeoutError
+from .result_cache import ResultCache
+from .routing import ModelRouter
+from .scheduler import UPLOAD_KEY, RequestScheduler, is_rate_limited, is_submit_retryable
+from .transcode import ReferencePreprocessor
+from .upload_cache import UploadCache
+from .upload_source import prepare_upload_source
+from .utils import setup_logger
+
+logger = setup_logger("VeoClient")
+
+class AsyncVeoClient:
+    """
+    Asyncio client for Veo generation and reference video analysis.
+
+    All network calls go through `client.aio`, so a single event loop can drive many
+    outstanding uploads and Veo operations without a thread per job.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        upload_cache=None,
+        analysis_cache=None,
+        preprocessor=None,
+        job_store=None,
+        router=None,
+        estimator=None,
+        result_cache=None,
+        output_store=None,
+    ):
+        """
+        Args:
+            client: Optional genai.Client to use. Defaults to the process-wide shared
+                client for the configured API key, base URL and proxy.
+            upload_cache, analysis_cache, preprocessor, job_store, router, estimator,
+            result_cache, output_store: Optional replacements for the stores kept under
+                the project's `.cache`/`.data` directories (e.g. scratch copies for
+                benchmarks and tests); the defaults are created when omitted.
+        """
+        try:
+            self.client = client or ClientRegistry.get_client()
+            self.upload_cache = upload_cache or UploadCache()
+            self.analysis_cache = analysis_cache or AnalysisCache()
+            self.preprocessor = preprocessor or ReferencePreprocessor()
+            self.poller = OperationPoller(self.client)
+            self.job_store = job_store or JobStore()
+            self.metrics = MetricsRegistry.get()
+            self.scheduler = RequestScheduler.get()
+            self.router = router or ModelRouter.get()
+            self.estimator = estimator or DurationEstimator.get()
+            self.result_cache = result_cache or ResultCache()
+            self.output_store = output_store or OutputStore()
+            self._inflight = {}
+            self.coalesced_requests = 0
+            current_model = Config.get_current_model()
+            logger.info(f"Initialized AsyncVeoClient with model: {current_model}")
+        except Exception as e:
+            logger.error(f"Failed to initialize AsyncVeoClient: {e}")
+            raise
+
+    @contextlib.contextmanager
+    def _stage(self, stage, model=None, aspect_ratio=None):
+        """
+        Time a stage for the latency histograms and, when it succeeds, for ETA predictions.
+
+        The progress tracker of the calling job (if any) is told when the stage starts
+        and ends.
+        """
+        progress = current_progress.get()
+        if progress is not None:
+            progress.stage_started(stage, model)
+        started = time.perf_counter()
+        with self.metrics.timer(stage, model=model, aspect_ratio=aspect_ratio):
+            yield
+        self.estimator.record(stage, time.perf_counter() - started, model=model, aspect_ratio=aspect_ratio)
+        if progress is not None:
+            progress.stage_finished(stage)
+
+    def _load_prompt_template(self, relative_path):
+        base_dir = os.path.dirname(__file__)
+        path = os.path.join(base_dir, relative_path)
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _extract_json(self, text):
+        return extract_json(text)
+
+    @staticmethod
+    def _analysis_config():
+        from google.genai import types
+
+        return types.GenerateContentConfig(response_mime_type="application/json", response_schema=ANALYSIS_SCHEMA)
+
+    async def _upload_reference_video(self, reference_video_path):
+        """Upload a reference video, wait until it is ACTIVE and return (file, upload strategy)."""
+        with self._stage(LOCAL_COPY):
+            source = await asyncio.to_thread(prepare_upload_source, reference_video_path)
+        async def upload():
+            if hasattr(source.file, "seek"):
+                # A retried stream upload must start from the beginning again.
+                source.file.seek(0)
+            with self._stage(UPLOAD):
+                return await self.client.aio.files.upload(file=source.file, config=source.config)
+
+        try:
+            logger.info(f"Uploading reference video: {reference_video_path} (strategy: {source.strategy})")
+            uploaded = await self.scheduler.call(UPLOAD_KEY, upload)
+        finally:
+            source.close()
+        
+        logger.info(f"Waiting for file to be processed (current state: {uploaded.state})...")
+        try:
+            with self._stage(FILE_WAIT):
+                uploaded = await self.poller.wait_file(uploaded, PollingPolicy.for_files())
+        except PollingTimeoutError as e:
+            raise RuntimeError(f"File processing timeout: {e}") from e
+        
+        logger.info(f"File is ready (state: {uploaded.state})")
+        return uploaded, source.strategy
+
+    async def _get_active_upload(self, reference_video_path):
+        """Return an ACTIVE uploaded file for the video, reusing a cached upload when possible."""
+        sha256 = await asyncio.to_thread(self.upload_cache.content_hash, reference_video_path)
+        entry = self.upload_cache.lookup(sha256)
+        if entry:
+            try:
+                remote = await self.client.aio.files.get(name=entry["name"])
+            except Exception as e:
+                logger.warning(f"Cached upload {entry['name']} is no longer available: {e}")
+                remote = None
+            if remote is not None and remote.state == "ACTIVE":
+                logger.info(f"Reusing previously uploaded reference video: {remote.name}")
+                return remote
+            self.upload_cache.invalidate(sha256)
+
+        uploaded, strategy = await self._upload_reference_video(reference_video_path)
+        self.upload_cache.store(sha256, uploaded, strategy=strategy)
+        return uploaded
+
+    async def analyze_reference_video(
+        self, reference_video_path, user_prompt=None, prompt_language="zh", use_cache=True, on_veo_prompt=None
+    ):
+        """
+        Analyzes a reference video with Gemini and returns the parsed JSON result.
+
+        Set `use_cache` to False to bypass the local analysis cache and force a fresh call.
+        Passing `on_veo_prompt` streams the response and calls it with the Veo prompt as
+        soon as that field is complete, before the rest of the copy has arrived.
+        """
+        request = await self.prepare_reference_analysis(
+            reference_video_path,
+            user_prompt=user_prompt,
+            prompt_language=prompt_language,
+            use_cache=use_cache,
+        )
+        return await self.run_reference_analysis(request, on_veo_prompt=on_veo_prompt)
+
+    async def prepare_reference_analysis(self, reference_video_path, user_prompt=None, prompt_language="zh", use_cache=True):
+        """
+        First half of `analyze_reference_video`: resolve a cached analysis or upload the video.
+
+        Returns a request dict for `run_reference_analysis`. When the analysis is cached,
+        `analysis` is already filled in and nothing is uploaded; otherwise `uploaded` holds
+        the ACTIVE Files API handle.
+        """
+        if not reference_video_path:
+            raise ValueError("reference_video_path is required")
+        if not os.path.exists(reference_video_path):
+            raise FileNotFoundError(reference_video_path)
+
+        model = Config.GEMINI_TEXT_MODEL
+
+        if (prompt_language or "").lower().startswith("en"):
+            template_path = "prompts/reference_video_analysis_en.txt"
+        else:
+            template_path = "prompts/reference_video_analysis.txt"
+
+        template = self._load_prompt_template(template_path)
+        prompt = template.replace("{{user_prompt}}", user_prompt or "")
+
+        video_sha256 = await asyncio.to_thread(self.upload_cache.content_hash, reference_video_path)
+        cache_key = AnalysisCache.make_key(
+            video_sha256,
+            user_prompt,
+            prompt_language,
+            model,
+            # The response schema shapes the output too, so it is part of the key.
+            hashlib.sha256((template + json.dumps(ANALYSIS_SCHEMA, sort_keys=True)).encode("utf-8")).hexdigest(),
+        )
+        request = {"model": model, "prompt": prompt, "cache_key": cache_key, "uploaded": None, "analysis": None}
+        if use_cache:
+            cached = self.analysis_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached analysis for reference video.")
+                request["analysis"] = cached
+                return request
+
+        with self._stage(PREPROCESS):
+            upload_path = await asyncio.to_thread(self.preprocessor.prepare, reference_video_path, video_sha256)
+        request["uploaded"] = await self._get_active_upload(upload_path)
+        return request
+
+    async def run_reference_analysis(self, request, on_veo_prompt=None):
+        """
+        Second half of `analyze_reference_video`: run Gemini on an already uploaded video.
+
+        The response is constrained to ANALYSIS_SCHEMA. A malformed response is repaired
+        with a cheap text-only request instead of re-analyzing (or re-uploading) the video.
+        `on_veo_prompt`, if given, is called exactly once when the Veo prompt is known.
+        """
+        fired = False
+
+        def emit(veo_prompt):
+            nonlocal fired
+            if on_veo_prompt is not None and veo_prompt and not fired:
+                fired = True
+                on_veo_prompt(veo_prompt)
+
+        if request.get("analysis") is not None:
+            emit(request["analysis"].get("veo_prompt"))
+            return request["analysis"]
+
+        model = request["model"]
+        contents = [request["uploaded"], request["prompt"]]
+        config = self._analysis_config()
+
+        async def analyze():
+            with self._stage(ANALYSIS, model=model):
+                response = await self.client.aio.models.generate_content(model=model, contents=contents, config=config)
+            return getattr(response, "text", None)
+
+        async def analyze_stream():
+            parser = StreamingFieldParser()
+            with self._stage(ANALYSIS, model=model):
+                stream = await self.client.aio.models.generate_content_stream(model=model, contents=contents, config=config)
+                async for chunk in stream:
+                    for key, value in parser.feed(getattr(chunk, "text", None) or ""):
+                        if key == "veo_prompt":
+                            emit(value)
+            return parser.text
+
+        logger.info("Analyzing reference video and generating copywriting...")
+        text = await self.scheduler.call(model, analyze_stream if on_veo_prompt is not None else analyze)
+        if not (text or "").strip():
+            # Nothing to repair; ask again with the already uploaded file.
+            logger.warning("Empty analysis response; retrying once without re-uploading.")
+            text = await self.scheduler.call(model, analyze)
+
+        try:
+            data = validate_analysis(extract_json(text))
+        except ValueError as e:
+            logger.warning(f"Malformed analysis response ({e}); requesting a text-only repair.")
+            data = await self._repair_analysis(text, model)
+
+        emit(data["veo_prompt"])
+        self.analysis_cache.put(request["cache_key"], data)
+        return data
+
+    async def _repair_analysis(self, text, model):
+        """Ask the text model to re-emit a malformed analysis as schema-valid JSON."""
+        config = self._analysis_config()
+
+        async def repair():
+            response = await self.client.aio.models.generate_content(
+                model=model,
+                contents=[REPAIR_PROMPT + (text or "")],
+                config=config,
+            )
+            return getattr(response, "text", None)
+
+        return validate_analysis(extract_json(await self.scheduler.call(model, repair)))
+
+    async def generate_video_from_reference(
+        self,
+        reference_video_path,
+        user_prompt,
+        prompt_language="zh",
+        aspect_ratio="16:9",
+        person_generation="allow_adult",
+        negative_prompt=None,
+        seed=None,
+        use_cache=True,
+        model=None,
+        number_of_videos=1,
+    ):
+        generation = None
+        final_prompt = None
+
+        def start_generation(veo_prompt):
+            # Called from the analysis stream as soon as veo_prompt is complete, so Veo
+            # starts rendering while the douyin copy is still being generated.
+            nonlocal generation, final_prompt
+            final_prompt = veo_prompt
+            generation = asyncio.ensure_future(
+                self.generate_video_result(
+                    prompt=veo_prompt,
+                    aspect_ratio=aspect_ratio,
+                    person_generation=person_generation,
+                    negative_prompt=negative_prompt,
+                    seed=seed,
+                    model=model,
+                    number_of_videos=number_of_videos,
+                )
+            )
+
+        try:
+            analysis = await self.analyze_reference_video(
+                reference_video_path,
+                user_prompt=user_prompt,
+                prompt_language=prompt_language,
+                use_cache=use_cache,
+                on_veo_prompt=start_generation,
+            )
+        except Exception as e:
+            if generation is None:
+                raise
+            # The Veo job is already running; keep its result rather than waste it.
+            logger.warning(f"Analysis failed after the Veo prompt was received ({e}); continuing with generation.")
+            analysis = {"veo_prompt": final_prompt}
+
+        result = await generation
+        await self.annotate_outputs(result, reference_video=reference_video_path, analysis=analysis)
+
+        return {
+            **(result or {"video_path": None}),
+            "analysis": analysis,
+            "final_prompt": final_prompt,
+        }
+
+    def generation_cache_stats(self):
+        """Result cache hit/miss counters plus the number of requests coalesced onto an in-flight generation."""
+        return {**self.result_cache.stats(), "coalesced": self.coalesced_requests}
+
+    async def generate_video(self, prompt, aspect_ratio="16:9", person_generation="allow_adult", negative_prompt=None, seed=None, model=None):
+        """
+        Generates a video using the Veo model.
+
+        Returns:
+            str: Path to the saved video file or None if failed.
+        """
+        result = await self.generate_video_result(
+            prompt,
+            aspect_ratio=aspect_ratio,
+            person_generation=person_generation,
+            negative_prompt=negative_prompt,
+            seed=seed,
+            model=model,
+        )
+        return result["video_path"] if result else None
+
+    async def generate_video_result(
+        self,
+        prompt,
+        aspect_ratio="16:9",
+        person_generation="allow_adult",
+        negative_prompt=None,
+        seed=None,
+        model=None,
+        number_of_videos=1,
+    ):
+        """
+        Generates a video using the Veo model and returns details about the saved file.
+        
+        Args:
+            prompt (str): The text prompt for video generation.
+            aspect_ratio (str): Aspect ratio "16:9" or "9:16".
+            person_generation (str): "allow_adult" or "dont_allow".
+            negative_prompt (str): Optional negative prompt.
+            seed (int): Optional seed for generation.
+            model (str): Optional Veo model ID; defaults to the model picked by the routing
+                policy (the current model in config.json unless configured otherwise).
+            number_of_videos (int): Candidates to generate in the one operation.
+            
+        Returns:
+            dict: `video_path`, `sha256`, `size_bytes`, `job_id` and `model` of the first
+            candidate, and `candidates`, a list with `index`, `video_path`, `sha256` and
+            `size_bytes` for every generated video; None if failed.
+            `cached` is True when a seeded request was served from the result cache.
+
+        Identical concurrent requests (same requested model, prompt, negative prompt, aspect
+        ratio, seed, person generation and number of videos) share a single Veo operation,
+        on the model routed for the first of them.
+        """
+        if number_of_videos < 1:
+            raise ValueError("number_of_videos must be at least 1")
+        current_model = self.router.choose(model)
+        key = ResultCache.make_key(
+            current_model, prompt, negative_prompt, aspect_ratio, seed, person_generation, number_of_videos
+        )
+        # The result cache keeps one video per key, so multi-candidate requests bypass it.
+        cacheable = seed is not None and number_of_videos == 1
+        if cacheable:
+            cached = await asyncio.to_thread(self.result_cache.get, key)
+            if cached is not None:
+                logger.info(f"Using cached result for identical seeded request: {cached['video_path']}")
+                candidate = {field: cached[field] for field in ("video_path", "sha256", "size_bytes")}
+                return {**cached, "cached": True, "candidates": [{"index": 0, **candidate}]}
+
+        # Coalesce on the request as made, before routing: the router may pick a different
+        # model for each caller (e.g. while it is still measuring candidates).
+        request_key = ResultCache.make_key(
+            model, prompt, negative_prompt, aspect_ratio, seed, person_generation, number_of_videos
+        )
+        task = self._inflight.get(request_key)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced_requests += 1
+            logger.info("An identical generation is already in flight; waiting for its result.")
+        else:
+            task = asyncio.ensure_future(
+                self._generate_and_cache(
+                    key, prompt, aspect_ratio, person_generation, negative_prompt, seed, current_model, number_of_videos, cacheable
+                )
+            )
+            self._inflight[request_key] = task
+            task.add_done_callback(
+                lambda done: self._inflight.pop(request_key, None) if self._inflight.get(request_key) is done else None
+            )
+
+        # Shielded so one caller giving up does not cancel the generation other callers are waiting on.
+        result = await asyncio.shield(task)
+        return dict(result) if result else result
+
+    async def _generate_and_cache(
+        self, key, prompt, aspect_ratio, person_generation, negative_prompt, seed, model, number_of_videos, cacheable
+    ):
+        result = await self._generate_hedged(
+            prompt, aspect_ratio, person_generation, negative_prompt, seed, model, number_of_videos
+        )
+        # A hedged result comes from another model and must not be cached under this key.
+        if result and cacheable and result.get("model") == model:
+            await asyncio.to_thread(self.result_cache.put, key, result)
+        return result
+
+    async def _generate_hedged(self, prompt, aspect_ratio, person_generation, negative_prompt, seed, model, number_of_videos):
+        """
+        Run the generation on `model`; if it is still running after the router's hedge
+        delay, also submit it to the hedge model and return whichever finishes first.
+        """
+        args = (prompt, aspect_ratio, person_generation, negative_prompt, seed)
+        hedge_model = self.router.hedge_model(model)
+        delay = self.router.hedge_delay(model) if hedge_model else None
+        if delay is None:
+            return await self._generate_uncached(*args, model, number_of_videos)
+
+        tickets = {model: {}, hedge_model: {}}
+        primary = asyncio.ensure_future(self._generate_uncached(*args, model, number_of_videos, ticket=tickets[model]))
+        tasks = {primary: model}
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            logger.info(f"Generation on {model} still running after {delay:.0f}s; hedging with {hedge_model}.")
+            self.router.hedged += 1
+            hedge = asyncio.ensure_future(
+                self._generate_uncached(*args, hedge_model, number_of_videos, ticket=tickets[hedge_model])
+            )
+            tasks[hedge] = hedge_model
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result():
+                        if task is hedge:
+                            self.router.hedge_wins += 1
+                        logger.info(f"Hedged generation won by {tasks[task]}.")
+                        for loser in pending:
+                            loser.cancel()
+                            # The losing operation is abandoned, not interrupted; do not resume it on the next start.
+                            job_id = tickets[tasks[loser]].get("job_id")
+                            if job_id:
+                                self.job_store.update_state(job_id, FAILED, error="Superseded by a hedged request.")
+                        return task.result()
+            # Neither produced a video; surface the primary's outcome.
+            return primary.result()
+        except asyncio.CancelledError:
+            # Interrupted from outside (e.g. shutdown): stop both, but leave their jobs resumable.
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _generate_uncached(
+        self, prompt, aspect_ratio, person_generation, negative_prompt, seed, model, number_of_videos=1, ticket=None
+    ):
+        """
+        Submit one Veo generation, wait for it and download every candidate.
+
+        `ticket`, if given, receives the `job_id` as soon as the job is created.
+        """
+        logger.info(f"Starting video generation with prompt: '{prompt}'")
+        
+        job_id = None
+        current_model = model
+        try:
+            # Configure generation options
+            config_params = {
+                "aspect_ratio": aspect_ratio,
+            }
+            
+            # person_generation is currently not supported by the Veo 3.1 preview API
+            # if person_generation and person_generation != "allow_adult":
+            #     config_params["person_generation"] = person_generation
+                
+            if negative_prompt:
+                config_params["negative_prompt"] = negative_prompt
+            # Note: seed support depends on model version, add if supported by types.GenerateVideosConfig
+            # Checking type definition or assuming kwargs if flexible. 
+            # Based on search, seed is available for Veo 3 models.
+            if seed is not None:
+                config_params["seed"] = seed
+            if number_of_videos > 1:
+                config_params["number_of_videos"] = number_of_videos
+
+            from google.genai import types
+
+            config = types.GenerateVideosConfig(**config_params)
+            
+            # Initiate generation
+            job_id = self.job_store.create_job(
+                "generate",
+                current_model,
+                {
+                    "prompt": prompt,
+                    "aspect_ratio": aspect_ratio,
+                    "person_generation": person_generation,
+                    "negative_prompt": negative_prompt,
+                    "seed": seed,
+                    "number_of_videos": number_of_videos,
+                },
+            )
+            if ticket is not None:
+                ticket["job_id"] = job_id
+            async def submit():
+                with self._stage(VEO_SUBMIT, model=current_model, aspect_ratio=aspect_ratio):
+                    return await self.client.aio.models.generate_videos(
+                        model=current_model,
+                        prompt=prompt,
+                        config=config
+                    )
+
+            operation = await self.scheduler.call(current_model, submit, retryable=is_submit_retryable)
+            self.job_store.update_state(job_id, RUNNING, operation_name=operation.name)
+            
+            logger.info(f"Video generation request submitted (job {job_id}). Waiting for completion...")
+            return await self._finish_operation(job_id, operation, current_model, aspect_ratio=aspect_ratio)
+                
+        except Exception as e:
+            # A failed download or a poll deadline leaves the job resumable: the (possibly still
+            # running) paid operation is not abandoned.
+            if not isinstance(e, DownloadError):
+                # Quota left exhausted after the scheduler's retries says nothing about the model's health.
+                if not is_rate_limited(e):
+                    self.router.record(current_model, None, ok=False)
+                if job_id and not isinstance(e, PollingTimeoutError):
+                    self.job_store.update_state(job_id, FAILED, error=str(e))
+            logger.error(f"An error occurred during video generation: {e}")
+            # Re-raise exception so GUI can catch it and display it
+            raise e
+
+    async def _finish_operation(self, job_id, operation, model, filename=None, aspect_ratio=None, resumed=False):
+        """
+        Wait for a submitted Veo operation, download its videos and record the outcome.
+
+        Every candidate is downloaded, up to MAX_PARALLEL_DOWNLOADS at a time. With more
+        than one, candidate `i` is saved as `<filename stem>_<i>.mp4`.
+
+        Server-side generation time is only recorded for operations submitted by this
+        process; a `resumed` operation was already running for an unknown time.
+        """
+        labels = {"model": model, "aspect_ratio": aspect_ratio}
+        generation_seconds = None
+        # Poll for completion via the shared poller (backoff + jitter + deadline)
+        if not operation.done:
+            started = time.monotonic()
+            timer = self._stage(GENERATION, **labels) if not resumed else contextlib.nullcontext()
+            with timer:
+                operation = await self.poller.wait_operation(operation, PollingPolicy.for_model(model))
+                if operation.error:
+                    raise RuntimeError(f"Video generation failed: {operation.error}")
+            if not resumed:
+                generation_seconds = time.monotonic() - started
+                self.router.record(model, generation_seconds)
+            
+        if operation.error:
+            raise RuntimeError(f"Video generation failed: {operation.error}")
+
+        if not operation.result:
+            logger.error("Operation completed but no result found.")
+            self.job_store.update_state(job_id, FAILED, error="Operation completed but no result found.")
+            return None
+
+        generated_videos = operation.response.generated_videos
+        if not generated_videos:
+            logger.warning("No videos were generated.")
+            self.job_store.update_state(job_id, FAILED, error="No videos were generated.")
+            return None
+
+        if not filename:
+            filename = self.output_store.video_path(job_id)
+
+        # Record the target path first so a resumed job continues the same partial files
+        self.job_store.update_state(job_id, DOWNLOADING, video_path=filename)
+
+        count = len(generated_videos)
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_DOWNLOADS)
+
+        async def download(index, generated):
+            path = candidate_path(filename, index, count)
+            async with semaphore:
+                logger.info(f"Downloading video to {path}...")
+                saved = await self._download_video(generated.video, path, labels)
+            logger.info(f"Video saved successfully: {path} ({saved['size_bytes']} bytes, sha256 {saved['sha256']})")
+            return {"index": index, "video_path": path, "sha256": saved["sha256"], "size_bytes": saved["size_bytes"]}
+
+        download_started = time.monotonic()
+        # Let every download finish (or fail) before raising, so none is left running unobserved.
+        outcomes = await asyncio.gather(
+            *(download(index, generated) for index, generated in enumerate(generated_videos)),
+            return_exceptions=True,
+        )
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        candidates = list(outcomes)
+        download_seconds = time.monotonic() - download_started
+
+        with self._stage(SAVE, **labels):
+            self.job_store.update_state(job_id, SUCCEEDED, video_path=candidates[0]["video_path"])
+            await asyncio.to_thread(
+                self._catalog_outputs, job_id, model, candidates, generation_seconds, download_seconds
+            )
+        return {
+            "video_path": candidates[0]["video_path"],
+            "sha256": candidates[0]["sha256"],
+            "size_bytes": candidates[0]["size_bytes"],
+            "job_id": job_id,
+            "model": model,
+            "candidates": candidates,
+        }
+
+    def _catalog_outputs(self, job_id, model, candidates, generation_seconds, download_seconds):
+        """Write sidecars and catalog rows for a finished job; a failure here never fails the job."""
+        job = self.job_store.get_job(job_id) or {"params": {}, "created_at": None}
+        params = job["params"]
+        now = time.time()
+        try:
+            for candidate in candidates:
+                self.output_store.record(
+                    candidate["video_path"],
+                    job_id,
+                    candidate=candidate["index"],
+                    sha256=candidate["sha256"],
+                    size_bytes=candidate["size_bytes"],
+                    model=model,
+                    prompt=params.get("prompt"),
+                    negative_prompt=params.get("negative_prompt"),
+                    aspect_ratio=params.get("aspect_ratio"),
+                    seed=params.get("seed"),
+                    generation_seconds=generation_seconds,
+                    download_seconds=download_seconds,
+                    total_seconds=now - job["created_at"] if job["created_at"] else None,
+                    created_at=now,
+                )
+        except Exception as e:
+            logger.warning(f"Failed to record outputs of job {job_id} in the catalog: {e}")
+
+    async def annotate_outputs(self, result, **fields):
+        """Attach details such as `reference_video` and `analysis` to the catalog records of a generation result."""
+        if not result or not result.get("job_id") or result.get("cached"):
+            return
+        try:
+            await asyncio.to_thread(self.output_store.annotate, result["job_id"], **fields)
+        except Exception as e:
+            logger.warning(f"Failed to annotate outputs of job {result['job_id']}: {e}")
+
+    async def _download_video(self, video, filename, labels=None):
+        """
+        Save a generated video to `filename` without buffering it in memory when possible.
+
+        Network transfer is timed as `download` and writing in-memory bytes to disk as
+        `save`; a streamed download writes as it receives, so it only counts as `download`.
+        """
+        labels = labels or {}
+        if getattr(video, "video_bytes", None):
+            with self._stage(SAVE, **labels):
+                return await asyncio.to_thread(write_bytes_atomic, video.video_bytes, filename)
+
+        uri = getattr(video, "uri", None)
+        if uri and uri.startswith(("http://", "https://")):
+            with self._stage(DOWNLOAD, **labels):
+                return await stream_download(uri, filename, headers={"x-goog-api-key": Config.GOOGLE_API_KEY})
+
+        # Fall back to the SDK download, which holds the whole file in memory.
+        with self._stage(DOWNLOAD, **labels):
+            data = await self.client.aio.files.download(file=video)
+        with self._stage(SAVE, **labels):
+            return await asyncio.to_thread(write_bytes_atomic, data, filename)
+
+    async def resume_pending_jobs(self):
+        """
+        Re-attach to Veo operations left unfinished by a process that has exited and download their results.
+
+        Returns a list of dicts with `job_id`, `video_path`, `sha256` and `error` for every resumed job.
+        """
+        results = []
+        # Jobs still owned by a live process (another GUI, CLI, batch or serve) are left alone.
+        pending = [job for job in self.job_store.list_unfinished() if self.job_store.claim(job)]
+        if not pending:
+            return results
+
+        logger.info(f"Resuming {len(pending)} unfinished job(s) from the job store...")
+
+        async def resume(job):
+            job_id = job["id"]
+            if not job["operation_name"]:
+                # Crashed before the submit call returned; nothing to re-attach to.
+                error = "Interrupted before the operation was submitted."
+                self.job_store.update_state(job_id, FAILED, error=error)
+                return {"job_id": job_id, "video_path": None, "error": error}
+            try:
+                from google.genai import types
+
+                operation = types.GenerateVideosOperation(name=job["operation_name"])
+                operation = await self.client.aio.operations.get(operation)
+                self.job_store.update_state(job_id, RUNNING, detail="resumed")
+                logger.info(f"Re-attached to operation {job['operation_name']} (job {job_id})")
+                filename = job["video_path"] if job["state"] == DOWNLOADING else None
+                result = await self._finish_operation(
+                    job_id,
+                    operation,
+                    job["model"],
+                    filename=filename,
+                    aspect_ratio=job["params"].get("aspect_ratio"),
+                    resumed=True,
+                )
+                if not result:
+                    return {"job_id": job_id, "video_path": None, "error": "No video was produced."}
+                return {**result, "error": None}
+            except Exception as e:
+                logger.error(f"Failed to resume job {job_id}: {e}")
+                if not isinstance(e, (DownloadError, PollingTimeoutError)):
+                    self.job_store.update_state(job_id, FAILED, error=str(e))
+                return {"job_id": job_id, "video_path": None, "error": str(e)}
+
+        results = await asyncio.gather(*(resume(job) for job in pending))
+        return list(results)
@@ -0,0 +1,176 @@
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import time
+
+from .eta import SHORTEST_FIRST, format_duration
+from .pipeline import ReferencePipeline
+from .utils import setup_logger
+
+logger = setup_logger("Batch")
+
+JOB_FIELDS = (
+    "prompt",
+    "reference_video",
+    "prompt_language",
+    "aspect_ratio",
+    "person_generation",
+    "negative_prompt",
+    "seed",
+    "model",
+    "number_of_videos",
+)
+
+
+def _normalize_job(raw, line_no):
+    job = {}
+    for field in JOB_FIELDS:
+        value = raw.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in ("", None):
+            continue
+        job[field] = value
+
+    if not job.get("prompt") and not job.get("reference_video"):
+        raise ValueError(f"Job on line {line_no} needs a 'prompt' or a 'reference_video'")
+    if "seed" in job:
+        job["seed"] = int(job["seed"])
+    if "number_of_videos" in job:
+        job["number_of_videos"] = int(job["number_of_videos"])
+
+    job_id = str(raw.get("id") or "").strip()
+    if not job_id:
+        # Stable id derived from the job contents so re-runs can skip finished rows.
+        canonical = json.dumps(job, sort_keys=True, ensure_ascii=False)
+        job_id = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+    job["id"] = job_id
+    return job
+
+
+def load_jobs(path):
+    """Load batch jobs from a JSONL or CSV file."""
+    jobs = []
+    if path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                jobs.append(_normalize_job(row, line_no))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                jobs.append(_normalize_job(json.loads(line), line_no))
+
+    seen = set()
+    for job in jobs:
+        if job["id"] in seen:
+            raise ValueError(f"Duplicate job id in {path}: {job['id']}")
+        seen.add(job["id"])
+    return jobs
+
+
+def load_completed_ids(manifest_path):
+    """Return ids of jobs that already succeeded according to the manifest."""
+    completed = set()
+    if not os.path.exists(manifest_path):
+        return completed
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A partially written last line from an interrupted run.
+                continue
+            if record.get("status") == "succeeded":
+                completed.add(record.get("id"))
+    return completed
+
+
+class BatchRunner:
+    """
+    Runs batch jobs on an AsyncVeoClient through a pipelined upload → analysis → generation flow.
+
+    Each finished job is appended to a JSONL manifest immediately, so an interrupted run
+    can be restarted and will skip jobs that already succeeded. Unless the `eta`
+    queue order is "fifo", jobs are started shortest expected duration first (see
+    `DurationEstimator`), which lowers the average time until each job's result.
+    """
+
+    def __init__(self, client, manifest_path, concurrency=4, upload_concurrency=2, analysis_concurrency=4):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.client = client
+        self.manifest_path = manifest_path
+        self.concurrency = concurrency
+        self.pipeline = ReferencePipeline(
+            client,
+            upload_concurrency=upload_concurrency,
+            analysis_concurrency=analysis_concurrency,
+            generation_concurrency=concurrency,
+            on_result=self._record_result,
+        )
+        self._manifest_lock = asyncio.Lock()
+
+    async def run(self, jobs):
+        completed = load_completed_ids(self.manifest_path)
+        pending = [job for job in jobs if job["id"] not in completed]
+        skipped = len(jobs) - len(pending)
+        if skipped:
+            logger.info(f"Skipping {skipped} job(s) already completed in {self.manifest_path}")
+        pending = self._order(pending)
+        limits = self.pipeline.limits
+        logger.info(
+            f"Running {len(pending)} job(s) with concurrency upload={limits['upload']}, "
+            f"analysis={limits['analysis']}, generation={limits['generation']}"
+        )
+
+        manifest_dir = os.path.dirname(os.path.abspath(self.manifest_path))
+        os.makedirs(manifest_dir, exist_ok=True)
+
+        started = time.monotonic()
+        records = await self.pipeline.run(pending)
+        succeeded = sum(1 for record in records if record["status"] == "succeeded")
+        elapsed = time.monotonic() - started
+        logger.info(f"Batch finished: {succeeded}/{len(pending)} succeeded in {elapsed:.1f}s")
+        return {
+            "total": len(jobs),
+            "skipped": skipped,
+            "succeeded": succeeded,
+            "failed": len(pending) - succeeded,
+            "stages": self.pipeline.stats(),
+        }
+
+    def _order(self, jobs):
+        estimator = self.client.estimator
+        expected = {
+            job["id"]: estimator.expected_job_seconds(
+                reference=bool(job.get("reference_video")),
+                model=job.get("model"),
+                aspect_ratio=job.get("aspect_ratio", "16:9"),
+            )
+            for job in jobs
+        }
+        if jobs:
+            # Rough figure assuming the generation slots, the usual bottleneck, stay busy.
+            total = sum(expected.values()) / min(self.concurrency, len(jobs))
+            logger.info(f"Expected run time: about {format_duration(total)} for {len(jobs)} job(s)")
+        if estimator.queue_order != SHORTEST_FIRST:
+            return jobs
+        # Stable sort, so jobs with equal estimates keep their file order.
+        return sorted(jobs, key=lambda job: expected[job["id"]])
+
+    async def _record_result(self, record):
+        await self._append_manifest(record)
+        logger.info(f"[{record['id']}] Job {record['status']} in {record['duration_s']:.1f}s")
+
+    async def _append_manifest(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        async with self._manifest_lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
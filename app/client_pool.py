@@ -0,0 +1,102 @@
+import atexit
+import os
+import threading
+
+from .config import Config
+from .utils import BackgroundLoop, setup_logger
+
+logger = setup_logger("VeoClient")
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of long-lived GenAI clients.
+
+    `genai.Client` instances are keyed by (API key, base URL, proxy) and reused by every
+    caller, so their HTTP connection pools and TLS sessions stay warm across jobs.
+    A shared blocking VeoClient is also kept for the GUI worker threads.
+    """
+
+    _clients = {}
+    _veo_client = None
+    _lock = threading.Lock()
+    _veo_lock = threading.Lock()
+    _atexit_registered = False
+
+    @staticmethod
+    def _normalize(api_key, base_url, proxy):
+        return (
+            api_key if api_key is not None else Config.GOOGLE_API_KEY,
+            (base_url if base_url is not None else Config.GOOGLE_GENAI_BASE_URL or "").strip() or None,
+            (proxy if proxy is not None else Config.HTTPS_PROXY or "").strip() or None,
+        )
+
+    @classmethod
+    def get_client(cls, api_key=None, base_url=None, proxy=None):
+        """Return the shared genai.Client for the given settings, creating it on first use."""
+        key = cls._normalize(api_key, base_url, proxy)
+        with cls._lock:
+            client = cls._clients.get(key)
+            if client is None:
+                client = cls._create_client(*key)
+                cls._clients[key] = client
+                if not cls._atexit_registered:
+                    atexit.register(cls.shutdown)
+                    cls._atexit_registered = True
+            return client
+
+    @staticmethod
+    def _create_client(api_key, base_url, proxy):
+        from google import genai
+        from google.genai import types
+
+        if proxy:
+            logger.info(f"Using proxy: {proxy}")
+            # Ensure it's set in os.environ for underlying libraries (done once per client)
+            os.environ["HTTPS_PROXY"] = proxy
+            os.environ["HTTP_PROXY"] = proxy
+
+        client_kwargs = {"api_key": api_key}
+        if base_url:
+            logger.info(f"Using custom GenAI base URL: {base_url}")
+            client_kwargs["http_options"] = types.HttpOptions(base_url=base_url)
+        return genai.Client(**client_kwargs)
+
+    @classmethod
+    def get_veo_client(cls):
+        """Return the process-wide blocking VeoClient shared by GUI workers."""
+        from .veo_client import VeoClient
+
+        # Separate lock: VeoClient() calls back into get_client(), which takes _lock
+        with cls._veo_lock:
+            if cls._veo_client is None:
+                cls._veo_client = VeoClient()
+            return cls._veo_client
+
+    @classmethod
+    def shutdown(cls):
+        """Close every shared client and release its connections."""
+        with cls._veo_lock:
+            veo_client = cls._veo_client
+            cls._veo_client = None
+        with cls._lock:
+            clients = list(cls._clients.values())
+            cls._clients.clear()
+
+        if veo_client is not None:
+            veo_client.async_client.job_store.close()
+
+        loop = BackgroundLoop._instance
+        for client in clients:
+            aio_close = getattr(client.aio, "aclose", None)
+            if aio_close is not None and loop is not None:
+                try:
+                    loop.submit(aio_close()).result(timeout=5)
+                except Exception as e:
+                    logger.warning(f"Failed to close async GenAI client: {e}")
+            close = getattr(client, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning(f"Failed to close GenAI client: {e}")
@@ -1,6 +1,9 @@
 import os
 import json
+import threading
+import time
 from dotenv import load_dotenv
+from .utils import atomic_write_json
 
 load_dotenv()
 
@@ -18,24 +21,88 @@ class Config:
         "models": []
     }
 
+    # (mtime_ns, size) of config.json when it was last parsed
+    _config_signature = None
+    _last_checked = None
+    _lock = threading.RLock()
+    _watcher = None
+    _watcher_stop = None
+
+    # Minimum seconds between stat() checks on the read path when no watcher is running
+    RELOAD_CHECK_INTERVAL = 1.0
+
+    @staticmethod
+    def _file_signature():
+        try:
+            stat = os.stat(CONFIG_FILE)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
     @classmethod
-    def load_config(cls):
-        """Load configuration from JSON file."""
-        if os.path.exists(CONFIG_FILE):
+    def load_config(cls, force=False):
+        """
+        Load configuration from JSON file if it changed since the last load.
+
+        Reads are served from an in-memory snapshot; config.json is only re-parsed when
+        its mtime or size changes. While a watcher thread is running the read path does
+        no I/O at all, otherwise the file is stat()ed at most once per
+        RELOAD_CHECK_INTERVAL seconds.
+        """
+        if not force and cls._last_checked is not None:
+            if cls._watcher is not None:
+                return
+            if time.monotonic() - cls._last_checked < cls.RELOAD_CHECK_INTERVAL:
+                return
+
+        with cls._lock:
+            cls._last_checked = time.monotonic()
+            signature = cls._file_signature()
+            if signature is None or (signature == cls._config_signature and not force):
+                return
             try:
                 with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
                     cls._config_data = json.load(f)
+                cls._config_signature = signature
             except Exception as e:
                 print(f"Error loading config.json: {e}")
 
     @classmethod
     def save_config(cls):
-        """Save current configuration to JSON file."""
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(cls._config_data, f, indent=4)
-        except Exception as e:
-            print(f"Error saving config.json: {e}")
+        """Save current configuration to JSON file atomically (temp file + rename)."""
+        with cls._lock:
+            try:
+                atomic_write_json(CONFIG_FILE, cls._config_data, indent=4)
+                cls._config_signature = cls._file_signature()
+            except Exception as e:
+                print(f"Error saving config.json: {e}")
+
+    @classmethod
+    def start_watcher(cls, interval=1.0):
+        """Reload config.json in a background thread so reads never touch the filesystem."""
+        with cls._lock:
+            if cls._watcher is not None:
+                return
+            cls.load_config(force=True)
+            stop = threading.Event()
+
+            def watch():
+                while not stop.wait(interval):
+                    if cls._file_signature() != cls._config_signature:
+                        cls.load_config(force=True)
+
+            cls._watcher_stop = stop
+            cls._watcher = threading.Thread(target=watch, name="ConfigWatcher", daemon=True)
+            cls._watcher.start()
+
+    @classmethod
+    def stop_watcher(cls):
+        with cls._lock:
+            if cls._watcher is None:
+                return
+            cls._watcher_stop.set()
+            cls._watcher = None
+            cls._watcher_stop = None
 
     @classmethod
     def get_models(cls):
@@ -49,11 +116,23 @@ class Config:
         cls.load_config()
         return cls._config_data.get("current_model", "veo-3.1-generate-preview")
 
+    @classmethod
+    def get_setting(cls, key, default=None):
+        """Return an optional top-level section/value from config.json."""
+        cls.load_config()
+        value = cls._config_data.get(key)
+        return default if value is None else value
+
     @classmethod
     def set_current_model(cls, model_id):
         """Set the current model and save to file."""
-        cls._config_data["current_model"] = model_id
-        cls.save_config()
+        with cls._lock:
+            cls.load_config(force=True)
+            # Swap in a new snapshot so concurrent readers never see a half-updated dict
+            data = dict(cls._config_data)
+            data["current_model"] = model_id
+            cls._config_data = data
+            cls.save_config()
 
     @classmethod
     def validate(cls):
@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import os
+
+from .utils import setup_logger
+
+logger = setup_logger("VeoClient")
+
+CHUNK_SIZE = 1024 * 1024
+MAX_RETRIES = 5
+# Candidates of one operation downloaded at the same time.
+MAX_PARALLEL_DOWNLOADS = 4
+MAX_REDIRECTS = 10
+
+
+class DownloadError(RuntimeError):
+    """Raised when a video cannot be downloaded after all retries."""
+
+
+def _hash_existing(path, digest):
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return size
+
+
+def _write_chunk(f, digest, chunk):
+    f.write(chunk)
+    digest.update(chunk)
+
+
+async def _send_get(http, url, headers):
+    """
+    Send a streaming GET for `url`, following redirects by hand.
+
+    `headers` may carry credentials (the API key), so they are only sent to the origin of
+    `url`; once a redirect leaves it (e.g. to the storage host serving the video) only the
+    Range header is kept.
+    """
+    import httpx
+
+    url = httpx.URL(url)
+    origin = (url.scheme, url.host, url.port)
+    for _ in range(MAX_REDIRECTS + 1):
+        response = await http.send(http.build_request("GET", url, headers=headers), stream=True)
+        if not response.is_redirect:
+            return response
+        await response.aclose()
+        url = response.url.join(response.headers["location"])
+        if (url.scheme, url.host, url.port) != origin:
+            headers = {key: value for key, value in headers.items() if key.lower() == "range"}
+    raise DownloadError(f"Download failed: more than {MAX_REDIRECTS} redirects")
+
+
+async def stream_download(url, dest_path, headers=None, max_retries=MAX_RETRIES, chunk_size=CHUNK_SIZE):
+    """
+    Stream `url` to `dest_path` in chunks, resuming after network errors.
+
+    Data is written to `<dest_path>.part` and renamed into place only once complete, so a
+    reader never sees a truncated file. Writing and hashing run in a worker thread so a
+    slow disk does not stall the event loop. A partial file left by an earlier attempt is
+    resumed with an HTTP Range request when the server supports it.
+
+    Returns a dict with `path`, `sha256` and `size_bytes`.
+    """
+    import httpx
+
+    part_path = dest_path + ".part"
+    timeout = httpx.Timeout(60.0, read=120.0)
+    attempt = 0
+
+    async with httpx.AsyncClient(timeout=timeout) as http:
+        while True:
+            digest = hashlib.sha256()
+            offset = 0
+            if os.path.exists(part_path):
+                offset = await asyncio.to_thread(_hash_existing, part_path, digest)
+
+            request_headers = dict(headers or {})
+            if offset:
+                request_headers["Range"] = f"bytes={offset}-"
+
+            try:
+                response = await _send_get(http, url, request_headers)
+                try:
+                    if offset and response.status_code == 200:
+                        # Server ignored the Range header; start over.
+                        logger.info("Server does not support resume; restarting download.")
+                        digest = hashlib.sha256()
+                        offset = 0
+                        mode = "wb"
+                    elif response.status_code == 416:
+                        # Our partial file is unusable (e.g. the remote object changed).
+                        os.remove(part_path)
+                        raise httpx.HTTPError("Requested range not satisfiable")
+                    else:
+                        response.raise_for_status()
+                        mode = "ab" if offset else "wb"
+
+                    f = await asyncio.to_thread(open, part_path, mode)
+                    try:
+                        async for chunk in response.aiter_bytes(chunk_size):
+                            await asyncio.to_thread(_write_chunk, f, digest, chunk)
+                            offset += len(chunk)
+                    finally:
+                        await asyncio.to_thread(f.close)
+                finally:
+                    await response.aclose()
+                break
+            except (httpx.HTTPError, OSError) as e:
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                if status is not None and 400 <= status < 500 and status not in (408, 429):
+                    raise DownloadError(f"Download failed with HTTP {status}: {e}") from e
+                attempt += 1
+                if attempt > max_retries:
+                    raise DownloadError(f"Download failed after {max_retries} retries: {e}") from e
+                delay = min(2 ** attempt, 30)
+                logger.warning(
+                    f"Download interrupted at {offset} bytes (attempt {attempt}/{max_retries}): {e}. "
+                    f"Resuming in {delay}s..."
+                )
+                await asyncio.sleep(delay)
+
+    os.replace(part_path, dest_path)
+    return {"path": dest_path, "sha256": digest.hexdigest(), "size_bytes": offset}
+
+
+def write_bytes_atomic(data, dest_path):
+    """Write in-memory video bytes via a temp file + rename and return the same dict as stream_download."""
+    part_path = dest_path + ".part"
+    with open(part_path, "wb") as f:
+        f.write(data)
+    os.replace(part_path, dest_path)
+    return {"path": dest_path, "sha256": hashlib.sha256(data).hexdigest(), "size_bytes": len(data)}
@@ -0,0 +1,226 @@
+import contextvars
+import os
+import threading
+import time
+
+from .config import Config
+from .history import RollingHistory, nearest_rank
+from .metrics import ANALYSIS, DOWNLOAD, FILE_WAIT, GENERATION, LOCAL_COPY, PREPROCESS, SAVE, UPLOAD, VEO_SUBMIT
+from .utils import get_data_dir, setup_logger
+
+logger = setup_logger("VeoClient")
+
+# Stages a job passes through, in order. Stages skipped at run time (e.g. on an analysis
+# cache hit) are dropped from the estimate as soon as a later stage starts.
+ANALYZE_STAGES = (LOCAL_COPY, PREPROCESS, UPLOAD, FILE_WAIT, ANALYSIS)
+GENERATE_STAGES = (VEO_SUBMIT, GENERATION, DOWNLOAD, SAVE)
+
+# Seconds assumed for a stage before any run has been recorded for it.
+DEFAULT_STAGE_SECONDS = {
+    LOCAL_COPY: 1,
+    PREPROCESS: 1,
+    UPLOAD: 10,
+    FILE_WAIT: 10,
+    ANALYSIS: 30,
+    VEO_SUBMIT: 2,
+    GENERATION: 120,
+    DOWNLOAD: 10,
+    SAVE: 1,
+}
+
+FIFO = "fifo"
+SHORTEST_FIRST = "shortest_first"
+QUEUE_ORDERS = (FIFO, SHORTEST_FIRST)
+
+# Progress tracker of the job the current task works for; see `with_progress`.
+current_progress = contextvars.ContextVar("veo_job_progress", default=None)
+
+
+def job_stages(reference=False, generate=True):
+    """Stages of a job: reference analysis, generation, or analysis followed by generation."""
+    return (ANALYZE_STAGES if reference else ()) + (GENERATE_STAGES if generate else ())
+
+
+def format_duration(seconds):
+    """Short human-readable duration, e.g. "45s", "3m 20s" or "1h 05m"."""
+    seconds = max(int(round(seconds)), 0)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+async def with_progress(coro, progress):
+    """Await `coro` with `progress` receiving the stage updates of every API call it makes."""
+    token = current_progress.set(progress)
+    try:
+        return await coro
+    finally:
+        current_progress.reset(token)
+
+
+class DurationEstimator:
+    """
+    Predicts how long job stages take from the durations of earlier runs.
+
+    Successful stage durations are kept in a rolling window per (stage, model, aspect
+    ratio) and persisted to `.data/stage_durations.json`, so predictions survive
+    restarts. An estimate is the rolling median (or another quantile) of the most
+    specific key with samples, falling back to the same stage on any aspect ratio, then
+    on any model, then to `DEFAULT_STAGE_SECONDS`. Configured under `eta` in config.json:
+    `window` (samples kept per key) and `queue_order` ("shortest_first", the default,
+    or "fifo") for the GUI job queue and batch runs.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, settings=None, path=None):
+        self.settings = settings if settings is not None else Config.get_setting("eta", {})
+        self.window = self.settings.get("window", 50)
+        self.queue_order = self.settings.get("queue_order", SHORTEST_FIRST)
+        if self.queue_order not in QUEUE_ORDERS:
+            logger.warning(f"Unknown eta queue_order {self.queue_order!r}; using {SHORTEST_FIRST!r}.")
+            self.queue_order = SHORTEST_FIRST
+        self.path = path or os.path.join(get_data_dir(), "stage_durations.json")
+        self.history = RollingHistory(self.path, self.window, "stage duration history")
+
+    @classmethod
+    def get(cls):
+        """Return the estimator shared by every client in this process."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def _key(stage, model=None, aspect_ratio=None):
+        return f"{stage}|{model or ''}|{aspect_ratio or ''}"
+
+    def record(self, stage, seconds, model=None, aspect_ratio=None):
+        """Record the duration of a stage that completed successfully."""
+        self.history.record(self._key(stage, model, aspect_ratio), seconds=round(seconds, 3))
+
+    def _pooled(self, prefix):
+        history = self.history
+        return [value for key in history.keys() if key.startswith(prefix) for value in history.values(key, "seconds")]
+
+    def estimate(self, stage, model=None, aspect_ratio=None, q=0.5):
+        """Predicted seconds for `stage` (the q-quantile of its history), with fallbacks as described above."""
+        samples = self.history.values(self._key(stage, model, aspect_ratio), "seconds")
+        if not samples and model:
+            samples = self._pooled(f"{stage}|{model}|")
+        if not samples:
+            samples = self._pooled(f"{stage}|")
+        if not samples:
+            return float(DEFAULT_STAGE_SECONDS.get(stage, 0))
+        return nearest_rank(samples, q)
+
+    def expected_seconds(self, stages, model=None, aspect_ratio=None):
+        """Predicted total duration of a job going through `stages`."""
+        return sum(self.estimate(stage, model, aspect_ratio) for stage in stages)
+
+    def expected_job_seconds(self, reference=False, generate=True, model=None, aspect_ratio=None):
+        """Predicted duration of a job; `model` defaults to the model selected in config.json."""
+        return self.expected_seconds(job_stages(reference, generate), model or Config.get_current_model(), aspect_ratio)
+
+
+class JobProgress:
+    """
+    Live progress of one job, predicted from its stages.
+
+    The client reports each stage as it starts and finishes (see `with_progress`). The
+    remaining time is the estimate of every stage still ahead plus what is left of the
+    current one, and `fraction` relates it to the time already spent. A stage that runs
+    past its estimate keeps the bar just short of its end instead of going backwards.
+    Safe to read from another thread (e.g. a GUI timer). `on_change(progress)`, if set,
+    is called whenever a stage starts.
+    """
+
+    def __init__(self, estimator, stages, model=None, aspect_ratio=None, on_change=None):
+        self.estimator = estimator
+        self.stages = list(stages)
+        self.model = model or Config.get_current_model()
+        self.aspect_ratio = aspect_ratio
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self._done = set()
+        self._current = {}
+        self._lock = threading.Lock()
+        self.on_change = on_change
+
+    @classmethod
+    def for_job(cls, reference=False, generate=True, model=None, aspect_ratio=None, estimator=None, on_change=None):
+        return cls(estimator or DurationEstimator.get(), job_stages(reference, generate), model, aspect_ratio, on_change)
+
+    def stage_started(self, stage, model=None):
+        with self._lock:
+            if model and stage in GENERATE_STAGES:
+                # The router may have picked a different model than the one predicted at submit time.
+                self.model = model
+            if stage in self.stages:
+                # Anything before this stage was skipped or already done.
+                self._done.update(self.stages[:self.stages.index(stage)])
+            self._current[stage] = time.monotonic()
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def stage_finished(self, stage):
+        with self._lock:
+            self._current.pop(stage, None)
+            self._done.add(stage)
+
+    def finish(self):
+        with self._lock:
+            self.finished_at = time.monotonic()
+            self._done.update(self.stages)
+            self._current.clear()
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def remaining_seconds(self):
+        """Predicted seconds until the job finishes (0 once it has)."""
+        with self._lock:
+            if self.finished_at is not None:
+                return 0.0
+            now = time.monotonic()
+            remaining = 0.0
+            for stage in self.stages:
+                if stage in self._done:
+                    continue
+                estimate = self.estimator.estimate(stage, self.model, self.aspect_ratio)
+                started = self._current.get(stage)
+                if started is not None:
+                    estimate = max(estimate - (now - started), 0.0)
+                remaining += estimate
+            return remaining
+
+    def fraction(self):
+        """Share of the job done, between 0 and 1; only 1 once `finish()` was called."""
+        if self.finished_at is not None:
+            return 1.0
+        elapsed = self.elapsed
+        remaining = self.remaining_seconds()
+        if elapsed + remaining <= 0:
+            return 0.0
+        return min(elapsed / (elapsed + remaining), 0.99)
+
+    def describe(self):
+        """One-line summary such as "42%, ~1m 10s left"."""
+        if self.finished_at is not None:
+            return f"100%, done in {format_duration(self.elapsed)}"
+        remaining = self.remaining_seconds()
+        eta = f"~{format_duration(remaining)} left" if remaining >= 1 else "finishing..."
+        return f"{self.fraction() * 100:.0f}%, {eta}"
+
+    def as_dict(self):
+        return {
+            "fraction": round(self.fraction(), 3),
+            "elapsed_s": round(self.elapsed, 1),
+            "eta_s": round(self.remaining_seconds(), 1),
+        }
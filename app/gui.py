@@ -1,31 +1,53 @@
 import sys
+import time
 import logging
+from collections import deque
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QLabel, QTextEdit, QLineEdit, 
                                QComboBox, QPushButton, QProgressBar, QSpinBox, 
-                               QGroupBox, QTextBrowser, QMessageBox, QCheckBox, QFileDialog)
-from PySide6.QtCore import Qt, QThread, Signal
+                               QGroupBox, QTextBrowser, QPlainTextEdit, QMessageBox, QCheckBox, QFileDialog,
+                               QTableWidget, QTableWidgetItem, QAbstractItemView)
+from PySide6.QtCore import Qt, QThread, QTimer, Signal
 from PySide6.QtGui import QFont
 
 from .config import Config
-from .veo_client import VeoClient
+from .eta import SHORTEST_FIRST, DurationEstimator, JobProgress, format_duration
+from .utils import add_log_handler, remove_log_handler
 
-# Configure Logging to emit signal to GUI
-class SignallingLogHandler(logging.Handler):
-    def __init__(self, signal):
+def create_veo_client():
+    """Return the shared VeoClient; imported lazily so the window can show before google-genai loads."""
+    from .client_pool import ClientRegistry
+    return ClientRegistry.get_veo_client()
+
+# Collects log lines from any thread; the window drains them on a timer
+class BufferedLogHandler(logging.Handler):
+    def __init__(self, max_pending=10000):
         super().__init__()
-        self.signal = signal
+        # Bounded so a log storm while the UI is busy cannot grow memory without limit
+        self._pending = deque(maxlen=max_pending)
 
     def emit(self, record):
-        msg = self.format(record)
-        self.signal.emit(msg)
+        try:
+            self._pending.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def append_line(self, line):
+        self._pending.append(line)
+
+    def drain(self):
+        lines = []
+        while True:
+            try:
+                lines.append(self._pending.popleft())
+            except IndexError:
+                return lines
 
 class GenerationWorker(QThread):
-    log_signal = Signal(str)
     finished_signal = Signal(object)
     error_signal = Signal(str)
 
-    def __init__(self, prompt, reference_video_path, prompt_language, aspect_ratio, person_generation, negative_prompt, seed):
+    def __init__(self, prompt, reference_video_path, prompt_language, aspect_ratio, person_generation, negative_prompt, seed, use_cache=True, model=None, number_of_videos=1, progress=None):
         super().__init__()
         self.prompt = prompt
         self.reference_video_path = reference_video_path
@@ -34,19 +56,14 @@ class GenerationWorker(QThread):
         self.person_generation = person_generation
         self.negative_prompt = negative_prompt
         self.seed = seed
+        self.use_cache = use_cache
+        self.model = model
+        self.number_of_videos = number_of_videos
+        self.progress = progress
 
     def run(self):
-        # Redirect logger to this thread's signal
-        handler = SignallingLogHandler(self.log_signal)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        
-        # Get root logger or specific logger
-        logger = logging.getLogger("VeoClient")
-        logger.addHandler(handler)
-        
         try:
-            client = VeoClient()
+            client = create_veo_client()
             if self.reference_video_path:
                 result = client.generate_video_from_reference(
                     reference_video_path=self.reference_video_path,
@@ -56,65 +73,125 @@ class GenerationWorker(QThread):
                     person_generation=self.person_generation,
                     negative_prompt=self.negative_prompt,
                     seed=self.seed,
+                    use_cache=self.use_cache,
+                    model=self.model,
+                    number_of_videos=self.number_of_videos,
+                    progress=self.progress,
                 )
-                if result and result.get("video_path"):
-                    self.finished_signal.emit(result)
-                else:
-                    self.error_signal.emit("Generation completed but no file returned.")
             else:
-                result_path = client.generate_video(
+                result = client.generate_video_result(
                     prompt=self.prompt,
                     aspect_ratio=self.aspect_ratio,
                     person_generation=self.person_generation,
                     negative_prompt=self.negative_prompt,
-                    seed=self.seed
+                    seed=self.seed,
+                    model=self.model,
+                    number_of_videos=self.number_of_videos,
+                    progress=self.progress,
                 )
-                if result_path:
-                    self.finished_signal.emit({"video_path": result_path})
-                else:
-                    self.error_signal.emit("Generation completed but no file returned.")
+            if result and result.get("video_path"):
+                self.finished_signal.emit(result)
+            else:
+                self.error_signal.emit("Generation completed but no file returned.")
         except Exception as e:
             self.error_signal.emit(str(e))
-        finally:
-            logger.removeHandler(handler)
 
 class AnalysisWorker(QThread):
-    log_signal = Signal(str)
     finished_signal = Signal(object)
     error_signal = Signal(str)
 
-    def __init__(self, prompt, reference_video_path, prompt_language):
+    def __init__(self, prompt, reference_video_path, prompt_language, use_cache=True, progress=None):
         super().__init__()
         self.prompt = prompt
         self.reference_video_path = reference_video_path
         self.prompt_language = prompt_language
+        self.use_cache = use_cache
+        self.progress = progress
 
     def run(self):
-        handler = SignallingLogHandler(self.log_signal)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-
-        logger = logging.getLogger("VeoClient")
-        logger.addHandler(handler)
-
         try:
-            client = VeoClient()
+            client = create_veo_client()
             analysis = client.analyze_reference_video(
                 reference_video_path=self.reference_video_path,
                 user_prompt=self.prompt,
                 prompt_language=self.prompt_language,
+                use_cache=self.use_cache,
+                progress=self.progress,
             )
             self.finished_signal.emit({"analysis": analysis, "final_prompt": (analysis or {}).get("veo_prompt")})
         except Exception as e:
             self.error_signal.emit(str(e))
-        finally:
-            logger.removeHandler(handler)
+
+class ResumeWorker(QThread):
+    finished_signal = Signal(object)
+    error_signal = Signal(str)
+
+    def run(self):
+        try:
+            client = create_veo_client()
+            self.finished_signal.emit(client.resume_pending_jobs())
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+class QueuedJob:
+    """A generation or analysis request waiting in, or run by, the GUI job queue."""
+
+    def __init__(self, number, kind, worker_kwargs, summary, estimator):
+        self.number = number
+        self.kind = kind
+        self.worker_kwargs = worker_kwargs
+        self.summary = summary
+        self.estimator = estimator
+        self.status = "Queued"
+        self.enqueued_at = time.monotonic()
+        self.expected_seconds = estimator.expected_job_seconds(**self._plan())
+        self.progress = None
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.worker = None
+
+    def _plan(self):
+        if self.kind == "Analyze":
+            return {"reference": True, "generate": False}
+        return {
+            "reference": bool(self.worker_kwargs.get("reference_video_path")),
+            "model": self.worker_kwargs.get("model"),
+            "aspect_ratio": self.worker_kwargs.get("aspect_ratio"),
+        }
+
+    def create_worker(self):
+        self.progress = JobProgress.for_job(estimator=self.estimator, **self._plan())
+        if self.kind == "Analyze":
+            return AnalysisWorker(progress=self.progress, **self.worker_kwargs)
+        return GenerationWorker(progress=self.progress, **self.worker_kwargs)
+
+    def eta_text(self):
+        if self.status == "Queued":
+            return f"~{format_duration(self.expected_seconds)}"
+        if self.status == "Running" and self.progress is not None:
+            return self.progress.describe()
+        return ""
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def is_active(self):
+        return self.status in ("Queued", "Running")
 
 class VeoStudioWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, resume_jobs=True):
         super().__init__()
+        self.resume_jobs = resume_jobs
         self.setWindowTitle("Google Veo Studio")
         self.resize(1000, 800)
+
+        # Keep the config snapshot fresh without re-reading config.json on every access
+        Config.start_watcher()
         
         # Main Layout
         central_widget = QWidget()
@@ -215,6 +292,21 @@ class VeoStudioWindow(QMainWindow):
         config_layout.addLayout(seed_layout)
         
         self.use_seed_cb.stateChanged.connect(lambda state: self.seed_spin.setEnabled(state == Qt.CheckState.Checked.value))
+
+        # Candidates per operation
+        candidates_layout = QHBoxLayout()
+        candidates_layout.addWidget(QLabel("Candidates:"))
+        self.candidates_spin = QSpinBox()
+        self.candidates_spin.setRange(1, 4)
+        self.candidates_spin.setToolTip("Number of videos generated from one request; each is saved with its index.")
+        candidates_layout.addWidget(self.candidates_spin)
+        config_layout.addLayout(candidates_layout)
+        
+        # Analysis Cache
+        self.use_cache_cb = QCheckBox("Use Cached Analysis")
+        self.use_cache_cb.setChecked(True)
+        self.use_cache_cb.setToolTip("Reuse previous analysis results for the same video, prompt and language.")
+        config_layout.addWidget(self.use_cache_cb)
         
         config_group.setLayout(config_layout)
         left_layout.addWidget(config_group)
@@ -234,20 +326,75 @@ class VeoStudioWindow(QMainWindow):
         
         # Progress Bar
         self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setValue(0)
         self.progress_bar.setTextVisible(False)
         left_layout.addWidget(self.progress_bar)
         
         # --- Right Panel Content ---
+
+        # Job Queue
+        gui_settings = Config.get_setting("gui", {})
+        self.jobs = []
+        self.job_counter = 0
+        self.estimator = DurationEstimator.get()
+        queue_group = QGroupBox("Job Queue")
+        queue_layout = QVBoxLayout()
+        queue_controls = QHBoxLayout()
+        queue_controls.addWidget(QLabel("Parallel Jobs:"))
+        self.parallel_spin = QSpinBox()
+        self.parallel_spin.setRange(1, 16)
+        self.parallel_spin.setValue(gui_settings.get("max_parallel_jobs", 2))
+        self.parallel_spin.valueChanged.connect(lambda _: self.dispatch_jobs())
+        queue_controls.addWidget(self.parallel_spin)
+        queue_controls.addStretch(1)
+        self.clear_jobs_btn = QPushButton("Clear Finished")
+        self.clear_jobs_btn.clicked.connect(self.clear_finished_jobs)
+        queue_controls.addWidget(self.clear_jobs_btn)
+        queue_layout.addLayout(queue_controls)
+
+        self.job_table = QTableWidget(0, 6)
+        self.job_table.setHorizontalHeaderLabels(["#", "Type", "Status", "Elapsed", "ETA", "Output"])
+        self.job_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.job_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.job_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.job_table.verticalHeader().setVisible(False)
+        self.job_table.horizontalHeader().setStretchLastSection(True)
+        self.job_table.itemSelectionChanged.connect(self.on_job_selected)
+        queue_layout.addWidget(self.job_table)
+        queue_group.setLayout(queue_layout)
+        right_layout.addWidget(queue_group)
+
+        # Refresh elapsed times, ETAs and the progress bar of running jobs
+        self.job_timer = QTimer(self)
+        self.job_timer.setInterval(1000)
+        self.job_timer.timeout.connect(self.refresh_job_table)
+        self.job_timer.timeout.connect(self._update_progress)
+        self.job_timer.start()
         
         # Log Output
         log_group = QGroupBox("Console Output")
         log_layout = QVBoxLayout()
-        self.log_browser = QTextBrowser()
+        self.log_browser = QPlainTextEdit()
+        self.log_browser.setReadOnly(True)
         self.log_browser.setStyleSheet("background-color: #1e1e1e; color: #d4d4d4; font-family: monospace;")
+        # Ring buffer: Qt drops the oldest lines once the limit is reached
+        self.log_browser.setMaximumBlockCount(gui_settings.get("log_max_lines", 5000))
         log_layout.addWidget(self.log_browser)
         log_group.setLayout(log_layout)
         right_layout.addWidget(log_group)
 
+        # Log records from worker threads and the client event loop are buffered and
+        # appended in one batch per timer tick instead of one widget update per record.
+        # Attached to every app logger (client, caches, transcoder, output store, ...).
+        self.log_handler = BufferedLogHandler()
+        self.log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        add_log_handler(self.log_handler)
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(gui_settings.get("log_flush_interval_ms", 100))
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start()
+
         meta_group = QGroupBox("Generated Copywriting")
         meta_layout = QVBoxLayout()
         self.meta_browser = QTextBrowser()
@@ -265,12 +412,46 @@ class VeoStudioWindow(QMainWindow):
             self.log_message(f"CONFIGURATION ERROR: {e}")
             QMessageBox.critical(self, "Configuration Error", str(e))
             self.generate_btn.setEnabled(False)
+            return
+
+        if not self.resume_jobs:
+            return
+
+        # Re-attach to generations left running when the app last exited
+        self.resume_worker = ResumeWorker()
+        self.resume_worker.finished_signal.connect(self.on_resume_finished)
+        self.resume_worker.error_signal.connect(lambda msg: self.log_message(f"ERROR: Failed to resume jobs: {msg}"))
+        self.resume_worker.start()
+
+    def on_resume_finished(self, results):
+        for result in results or []:
+            if result.get("video_path"):
+                self.log_message(f"RECOVERED: Job {result['job_id']} video saved at {result['video_path']}")
+            else:
+                self.log_message(f"ERROR: Could not recover job {result['job_id']}: {result.get('error')}")
 
     def log_message(self, message):
-        self.log_browser.append(message)
-        # Auto scroll to bottom
+        self.log_handler.append_line(message)
+
+    def flush_log(self):
+        lines = self.log_handler.drain()
+        if not lines:
+            return
         scrollbar = self.log_browser.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+        self.log_browser.appendPlainText("\n".join(lines))
+        # Auto scroll to bottom unless the user scrolled up to read older output
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def closeEvent(self, event):
+        self.log_timer.stop()
+        remove_log_handler(self.log_handler)
+        Config.stop_watcher()
+        # Also reached when app/gui.py runs as __main__, which has no launcher to close the pool
+        from .client_pool import ClientRegistry
+        ClientRegistry.shutdown()
+        super().closeEvent(event)
 
     def load_models(self):
         """Load models from config into the combobox."""
@@ -278,23 +459,32 @@ class VeoStudioWindow(QMainWindow):
         current_model_id = Config.get_current_model()
         
         self.model_combo.clear()
+        auto_routing = Config.get_setting("routing", {}).get("policy") == "fastest_healthy"
+        if auto_routing:
+            # No model id: the router picks the fastest healthy model per job
+            self.model_combo.addItem("Auto (fastest healthy)", None)
+            self.model_combo.setItemData(0, "Route each job to the configured model with the lowest recent latency.", Qt.ItemDataRole.ToolTipRole)
+        offset = self.model_combo.count()
         for i, model in enumerate(models):
             # Display Name (ID)
             display_text = f"{model['name']} ({model['id']})"
             self.model_combo.addItem(display_text, model['id'])
             
             # Set tooltip for description
-            self.model_combo.setItemData(i, model['description'], Qt.ItemDataRole.ToolTipRole)
+            self.model_combo.setItemData(offset + i, model['description'], Qt.ItemDataRole.ToolTipRole)
             
             # Select if it's the current model
-            if model['id'] == current_model_id:
-                self.model_combo.setCurrentIndex(i)
+            if model['id'] == current_model_id and not auto_routing:
+                self.model_combo.setCurrentIndex(offset + i)
 
     def on_model_changed(self, index):
         """Update config when model selection changes."""
         if index >= 0:
             model_id = self.model_combo.itemData(index) # itemData(index, Qt.UserRole) by default gets the second arg of addItem
             # PySide6 addItem(text, userData) stores userData in UserRole
+            if model_id is None:
+                self.log_message("Selected Model: Auto (fastest healthy)")
+                return
             Config.set_current_model(model_id)
             self.log_message(f"Selected Model: {model_id}")
 
@@ -304,11 +494,6 @@ class VeoStudioWindow(QMainWindow):
             QMessageBox.warning(self, "Input Error", "Please enter a prompt.")
             return
 
-        # Disable UI
-        self.generate_btn.setEnabled(False)
-        self.analyze_btn.setEnabled(False)
-        self.progress_bar.setRange(0, 0) # Indeterminate mode
-        
         # Get Params
         aspect_ratio = self.ar_combo.currentText()
         person_generation = self.pg_combo.currentText()
@@ -316,13 +501,27 @@ class VeoStudioWindow(QMainWindow):
         seed = self.seed_spin.value() if self.use_seed_cb.isChecked() else None
         reference_video_path = self.ref_video_edit.text().strip() or None
         prompt_language = self.lang_combo.currentData() or "zh"
+        use_cache = self.use_cache_cb.isChecked()
+        model = self.model_combo.currentData()
+        number_of_videos = self.candidates_spin.value()
         
-        # Start Worker
-        self.worker = GenerationWorker(prompt, reference_video_path, prompt_language, aspect_ratio, person_generation, negative_prompt, seed)
-        self.worker.log_signal.connect(self.log_message)
-        self.worker.finished_signal.connect(self.on_generation_finished)
-        self.worker.error_signal.connect(self.on_generation_error)
-        self.worker.start()
+        # Queue the job; it starts as soon as a worker slot is free
+        self.enqueue_job(
+            "Generate",
+            {
+                "prompt": prompt,
+                "reference_video_path": reference_video_path,
+                "prompt_language": prompt_language,
+                "aspect_ratio": aspect_ratio,
+                "person_generation": person_generation,
+                "negative_prompt": negative_prompt,
+                "seed": seed,
+                "use_cache": use_cache,
+                "model": model,
+                "number_of_videos": number_of_videos,
+            },
+            prompt,
+        )
 
     def start_analysis(self):
         reference_video_path = self.ref_video_edit.text().strip() or None
@@ -333,15 +532,139 @@ class VeoStudioWindow(QMainWindow):
         prompt = self.prompt_edit.toPlainText().strip()
         prompt_language = self.lang_combo.currentData() or "zh"
 
-        self.generate_btn.setEnabled(False)
-        self.analyze_btn.setEnabled(False)
-        self.progress_bar.setRange(0, 0)
+        self.enqueue_job(
+            "Analyze",
+            {
+                "prompt": prompt,
+                "reference_video_path": reference_video_path,
+                "prompt_language": prompt_language,
+                "use_cache": self.use_cache_cb.isChecked(),
+            },
+            prompt or reference_video_path,
+        )
+
+    def enqueue_job(self, kind, worker_kwargs, summary):
+        self.job_counter += 1
+        job = QueuedJob(self.job_counter, kind, worker_kwargs, summary, self.estimator)
+        self.jobs.append(job)
+        row = self.job_table.rowCount()
+        self.job_table.insertRow(row)
+        for column in range(self.job_table.columnCount()):
+            self.job_table.setItem(row, column, QTableWidgetItem())
+        self.job_table.item(row, 1).setToolTip(summary)
+        self._update_job_row(row, job)
+        self.log_message(f"Queued job #{job.number} ({kind}, expected ~{format_duration(job.expected_seconds)})")
+        self.dispatch_jobs()
+
+    def dispatch_jobs(self):
+        """
+        Start queued jobs until the parallel worker limit is reached.
+
+        With the `shortest_first` queue order, the job expected to finish soonest goes
+        next. Its key is the enqueue time plus the expected duration, so a long job
+        still moves up as it waits instead of being overtaken forever.
+        """
+        running = sum(1 for job in self.jobs if job.status == "Running")
+        queued = [job for job in self.jobs if job.status == "Queued"]
+        if self.estimator.queue_order == SHORTEST_FIRST:
+            queued.sort(key=lambda job: job.enqueued_at + job.expected_seconds)
+        for job in queued:
+            if running >= self.parallel_spin.value():
+                break
+            job.status = "Running"
+            job.started_at = time.monotonic()
+            job.worker = job.create_worker()
+            job.worker.finished_signal.connect(lambda result, job=job: self.on_job_finished(job, result))
+            job.worker.error_signal.connect(lambda error_msg, job=job: self.on_job_error(job, error_msg))
+            # Drop the QThread only after run() has returned, never from the result slot
+            job.worker.finished.connect(lambda job=job: setattr(job, "worker", None))
+            job.worker.start()
+            running += 1
+        self._update_progress()
+        self.refresh_job_table()
+
+    def _update_progress(self):
+        """Show the combined predicted progress of the running jobs and when the last one should finish."""
+        running = [job.progress for job in self.jobs if job.status == "Running" and job.progress is not None]
+        if running:
+            elapsed = sum(progress.elapsed for progress in running)
+            remaining = [progress.remaining_seconds() for progress in running]
+            total = elapsed + sum(remaining)
+            fraction = min(elapsed / total, 0.99) if total > 0 else 0.0
+            eta = max(remaining)
+            eta_text = f"~{format_duration(eta)} left" if eta >= 1 else "finishing..."
+            self.progress_bar.setValue(int(fraction * 1000))
+            self.progress_bar.setFormat(f"{len(running)} running - {fraction * 100:.0f}%, {eta_text}")
+            self.progress_bar.setTextVisible(True)
+        else:
+            self.progress_bar.setValue(1000 if self.jobs else 0)
+            self.progress_bar.setTextVisible(False)
+
+    def _update_job_row(self, row, job):
+        output = ""
+        if job.result:
+            output = job.result.get("video_path") or (job.result.get("final_prompt") or "")
+            extra = len(job.result.get("candidates") or []) - 1
+            if extra > 0:
+                output = f"{output} (+{extra} more)"
+        elif job.error:
+            output = job.error
+        values = [str(job.number), job.kind, job.status, f"{job.elapsed():.0f}s", job.eta_text(), output]
+        for column, value in enumerate(values):
+            item = self.job_table.item(row, column)
+            if item.text() != value:
+                item.setText(value)
+        self.job_table.item(row, 5).setToolTip(output)
+
+    def refresh_job_table(self):
+        for row, job in enumerate(self.jobs):
+            if job.is_active or self.job_table.item(row, 2).text() != job.status:
+                self._update_job_row(row, job)
+
+    def clear_finished_jobs(self):
+        for row in reversed(range(len(self.jobs))):
+            if not self.jobs[row].is_active and self.jobs[row].worker is None:
+                self.job_table.removeRow(row)
+                del self.jobs[row]
+
+    def selected_job(self):
+        rows = self.job_table.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return self.jobs[rows[0].row()]
+
+    def on_job_selected(self):
+        job = self.selected_job()
+        if job is not None and job.result:
+            self._render_metadata(job.result)
+
+    def _finish_job(self, job, status):
+        job.status = status
+        job.finished_at = time.monotonic()
+        if job.progress is not None:
+            job.progress.finish()
+        self.dispatch_jobs()
+
+    def on_job_finished(self, job, result):
+        job.result = result if isinstance(result, dict) else {"video_path": str(result)}
+        self._finish_job(job, "Done")
+        selected = self.selected_job()
+        if selected is None or selected is job:
+            self._render_metadata(job.result)
+        if job.kind == "Analyze":
+            self.log_message(f"SUCCESS: Analysis completed (job #{job.number}).")
+        else:
+            candidates = job.result.get("candidates") or []
+            if len(candidates) > 1:
+                paths = ", ".join(f"[{candidate['index']}] {candidate['video_path']}" for candidate in candidates)
+                self.log_message(f"SUCCESS: {len(candidates)} candidates generated (job #{job.number}): {paths}")
+            else:
+                self.log_message(f"SUCCESS: Video generated at {job.result.get('video_path')} (job #{job.number})")
 
-        self.analysis_worker = AnalysisWorker(prompt, reference_video_path, prompt_language)
-        self.analysis_worker.log_signal.connect(self.log_message)
-        self.analysis_worker.finished_signal.connect(self.on_analysis_finished)
-        self.analysis_worker.error_signal.connect(self.on_generation_error)
-        self.analysis_worker.start()
+    def on_job_error(self, job, error_msg):
+        job.error = error_msg
+        self._finish_job(job, "Failed")
+        self.log_message(f"ERROR: Job #{job.number} failed: {error_msg}")
 
     def choose_reference_video(self):
         file_path, _ = QFileDialog.getOpenFileName(
@@ -374,42 +697,12 @@ class VeoStudioWindow(QMainWindow):
             lines.append(f"Style Notes: {style_notes}")
         if final_prompt:
             lines.append(f"Final Prompt: {final_prompt}")
+        candidates = (result or {}).get("candidates") or []
+        if len(candidates) > 1:
+            lines.append("Candidates:\n" + "\n".join(f"[{candidate['index']}] {candidate['video_path']}" for candidate in candidates))
 
         self.meta_browser.setPlainText("\n\n".join(lines) if lines else "")
 
-    def on_generation_finished(self, result):
-        self.generate_btn.setEnabled(True)
-        self.analyze_btn.setEnabled(True)
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(100)
-
-        if isinstance(result, dict):
-            result_path = result.get("video_path")
-            self._render_metadata(result)
-        else:
-            result_path = str(result)
-
-        self.log_message(f"SUCCESS: Video generated at {result_path}")
-        QMessageBox.information(self, "Success", f"Video generated successfully!\nSaved to: {result_path}")
-
-    def on_analysis_finished(self, result):
-        self.generate_btn.setEnabled(True)
-        self.analyze_btn.setEnabled(True)
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(100)
-
-        if isinstance(result, dict):
-            self._render_metadata(result)
-        self.log_message("SUCCESS: Analysis completed.")
-
-    def on_generation_error(self, error_msg):
-        self.generate_btn.setEnabled(True)
-        self.analyze_btn.setEnabled(True)
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(0)
-        self.log_message(f"ERROR: {error_msg}")
-        QMessageBox.critical(self, "Generation Failed", f"An error occurred:\n{error_msg}")
-
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = VeoStudioWindow()
@@ -0,0 +1,120 @@
+import atexit
+import json
+import math
+import os
+import threading
+from collections import deque
+
+from .utils import atomic_write_json, setup_logger
+
+logger = setup_logger("VeoClient")
+
+# Samples recorded within this many seconds are written to disk together.
+SAVE_DELAY_SECONDS = 5
+
+
+def nearest_rank(values, q):
+    """Nearest-rank q-quantile of `values`, or None when there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+class RollingHistory:
+    """
+    Rolling windows of recent samples, grouped by key and series, persisted as JSON.
+
+    Backs the model latency history of `ModelRouter` and the stage durations of
+    `DurationEstimator`. `record(key, series=value, ...)` appends to each named series
+    of `key`, keeping the newest `window` values; the file maps every key to its series:
+    `{"<key>": {"<series>": [values, ...]}}`.
+
+    Recording never touches the disk: new samples are written by a timer thread at most
+    `save_delay` seconds later (and at interpreter exit), merged into what the file
+    holds by then, so the event loop is not blocked and processes sharing the file
+    (CLI, GUI, `serve`) do not overwrite each other's samples.
+    """
+
+    def __init__(self, path, window=50, description="history", save_delay=SAVE_DELAY_SECONDS):
+        self.path = path
+        self.window = window
+        self.description = description
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._data = self._read()
+        self._pending = {}
+        self._timer = None
+        atexit.register(self.flush)
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {
+                key: {series: deque(values, maxlen=self.window) for series, values in entry.items()}
+                for key, entry in data.items()
+            }
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable {self.description} {self.path}: {e}")
+            return {}
+
+    def record(self, key, **values):
+        """Append one value to each given series of `key`; it is saved shortly after."""
+        with self._lock:
+            entry = self._data.setdefault(key, {})
+            pending = self._pending.setdefault(key, {})
+            for series, value in values.items():
+                entry.setdefault(series, deque(maxlen=self.window)).append(value)
+                pending.setdefault(series, []).append(value)
+            if self._timer is None:
+                self._timer = threading.Timer(self.save_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write the samples recorded since the last save, merged with the file on disk."""
+        with self._save_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            merged = self._read()
+            self._merge(merged, pending)
+            try:
+                atomic_write_json(
+                    self.path,
+                    {key: {series: list(values) for series, values in entry.items()} for key, entry in merged.items()},
+                )
+            except Exception as e:
+                logger.warning(f"Failed to persist {self.description}: {e}")
+                with self._lock:
+                    # Keep the samples for the next save, ahead of anything recorded since.
+                    self._merge(pending, self._pending)
+                    self._pending = pending
+                return
+            with self._lock:
+                # Pick up samples other processes saved; ones recorded meanwhile are still pending.
+                self._merge(merged, self._pending)
+                self._data = merged
+
+    def _merge(self, data, samples):
+        for key, entry in samples.items():
+            target = data.setdefault(key, {})
+            for series, values in entry.items():
+                target.setdefault(series, deque(maxlen=self.window)).extend(values)
+
+    def values(self, key, series):
+        """Recorded values of one series of `key`, oldest first."""
+        with self._lock:
+            return list(self._data.get(key, {}).get(series, ()))
+
+    def keys(self):
+        with self._lock:
+            return list(self._data)
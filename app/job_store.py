@@ -0,0 +1,216 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from .utils import get_data_dir
+
+# Job states, in the order a successful job passes through them.
+SUBMITTING = "submitting"
+RUNNING = "running"
+DOWNLOADING = "downloading"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+UNFINISHED_STATES = (SUBMITTING, RUNNING, DOWNLOADING)
+
+# A process refreshes the lease on the unfinished jobs it owns every HEARTBEAT_SECONDS;
+# a job whose lease is older than LEASE_SECONDS may be claimed by another process.
+HEARTBEAT_SECONDS = 30
+LEASE_SECONDS = 120
+
+HOST = socket.gethostname()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    model TEXT,
+    params TEXT NOT NULL,
+    operation_name TEXT,
+    state TEXT NOT NULL,
+    video_path TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT,
+    owner_seen_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs (owner);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL REFERENCES jobs (id),
+    state TEXT NOT NULL,
+    detail TEXT,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job_id ON job_events (job_id);
+"""
+
+
+class JobStore:
+    """
+    SQLite-backed record of submitted Veo jobs and their state transitions.
+
+    Every submitted operation name is persisted before polling starts, so a restarted
+    process can re-attach to unfinished operations instead of paying to generate again.
+
+    Each job records its owner (host and pid) and a lease the owner keeps refreshing
+    while the job is unfinished. Several GUI, CLI, batch and serve processes can share
+    the store: a process only resumes a job after `claim()` took it over from an owner
+    that has exited or stopped refreshing its lease.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_data_dir(), "jobs.sqlite3")
+        self.owner = f"{HOST}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._heartbeat = None
+        self._stopped = threading.Event()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if columns and "owner" not in columns:
+                # Stores created before job ownership was tracked.
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner_seen_at REAL")
+            self._conn.executescript(SCHEMA)
+
+    def _start_heartbeat(self):
+        if self._heartbeat is None:
+            self._heartbeat = threading.Thread(target=self._renew_leases, name="JobStoreHeartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def _renew_leases(self):
+        placeholders = ", ".join("?" for _ in UNFINISHED_STATES)
+        while not self._stopped.wait(HEARTBEAT_SECONDS):
+            try:
+                with self._lock, self._conn:
+                    self._conn.execute(
+                        f"UPDATE jobs SET owner_seen_at = ? WHERE owner = ? AND state IN ({placeholders})",
+                        (time.time(), self.owner, *UNFINISHED_STATES),
+                    )
+            except sqlite3.Error:
+                # Closed or locked for longer than the timeout; try again on the next beat.
+                continue
+
+    @staticmethod
+    def _owner_alive(owner, seen_at, now):
+        if not owner:
+            return False
+        if seen_at is None or now - seen_at > LEASE_SECONDS:
+            return False
+        host, _, pid = owner.rpartition(":")
+        if host == HOST and os.name == "posix":
+            # Same machine: a crashed owner can be detected without waiting for its lease to expire.
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                return False
+            except (PermissionError, ValueError):
+                return True
+        return True
+
+    def claim(self, job):
+        """
+        Take ownership of an unfinished job (a row from `list_unfinished`) if its owner is gone.
+
+        Returns False when the owner is still alive or another process claimed it first;
+        the update only succeeds if the owner is unchanged since `job` was read.
+        """
+        now = time.time()
+        if self._owner_alive(job["owner"], job["owner_seen_at"], now):
+            return False
+        placeholders = ", ".join("?" for _ in UNFINISHED_STATES)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET owner = ?, owner_seen_at = ? "
+                f"WHERE id = ? AND owner IS ? AND owner_seen_at IS ? AND state IN ({placeholders})",
+                (self.owner, now, job["id"], job["owner"], job["owner_seen_at"], *UNFINISHED_STATES),
+            )
+        if cursor.rowcount != 1:
+            return False
+        self._start_heartbeat()
+        return True
+
+    def create_job(self, kind, model, params):
+        """Insert a new job in the SUBMITTING state and return its id."""
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, model, params, state, created_at, updated_at, owner, owner_seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, model, json.dumps(params, ensure_ascii=False), SUBMITTING, now, now, self.owner, now),
+            )
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, state, at) VALUES (?, ?, ?)",
+                (job_id, SUBMITTING, now),
+            )
+        self._start_heartbeat()
+        return job_id
+
+    def update_state(self, job_id, state, detail=None, **fields):
+        """Move a job to `state`, updating any of operation_name/video_path/error/model."""
+        allowed = {"operation_name", "video_path", "error", "model"}
+        unknown = set(fields) - allowed
+        if unknown:
+            raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+
+        now = time.time()
+        assignments = ["state = ?", "updated_at = ?"] + [f"{name} = ?" for name in fields]
+        values = [state, now] + list(fields.values()) + [job_id]
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {', '.join(assignments)} WHERE id = ?", values)
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, state, detail, at) VALUES (?, ?, ?, ?)",
+                (job_id, state, detail, now),
+            )
+
+    def get_job(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list_unfinished(self):
+        """Return unfinished jobs of every process; use `claim()` before resuming one."""
+        placeholders = ", ".join("?" for _ in UNFINISHED_STATES)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM jobs WHERE state IN ({placeholders}) ORDER BY created_at",
+                UNFINISHED_STATES,
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def list_jobs(self, limit=50):
+        """Return the most recent jobs, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def get_events(self, job_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, detail, at FROM job_events WHERE job_id = ? ORDER BY id", (job_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        self._stopped.set()
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_to_dict(row):
+        job = dict(row)
+        job["params"] = json.loads(job["params"] or "{}")
+        return job
@@ -0,0 +1,228 @@
+import contextlib
+import os
+import threading
+import time
+
+from .utils import setup_logger
+
+logger = setup_logger("Metrics")
+
+# Stages recorded by AsyncVeoClient, in pipeline order.
+LOCAL_COPY = "local_copy"
+PREPROCESS = "preprocess"
+UPLOAD = "upload"
+FILE_WAIT = "file_wait"
+ANALYSIS = "analysis"
+VEO_SUBMIT = "veo_submit"
+GENERATION = "generation"
+DOWNLOAD = "download"
+SAVE = "save"
+
+SUCCESS = "success"
+ERROR = "error"
+TIMEOUT = "timeout"
+CANCELLED = "cancelled"
+
+# Seconds; spans sub-second file ops up to the 30 minute Veo deadline.
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 180, 300, 600, 900, 1800)
+
+LABEL_NAMES = ("stage", "model", "aspect_ratio", "outcome")
+METRIC_NAME = "veo_stage_duration_seconds"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds, plus min/max for the JSON summary."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def cumulative_counts(self):
+        total = 0
+        cumulative = []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+    def quantile(self, q):
+        """Estimate the q-quantile by linear interpolation inside the matching bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower = 0.0
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                fraction = (rank - seen) / count
+                estimate = lower + (bound - lower) * fraction
+                return min(max(estimate, self.min), self.max)
+            seen += count
+            lower = bound
+        # Rank falls in the +Inf bucket; the observed maximum is the best estimate.
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum_s": round(self.sum, 3),
+            "mean_s": round(self.sum / self.count, 3) if self.count else None,
+            "min_s": round(self.min, 3) if self.min is not None else None,
+            "max_s": round(self.max, 3) if self.max is not None else None,
+            "p50_s": _round(self.quantile(0.5)),
+            "p90_s": _round(self.quantile(0.9)),
+            "p99_s": _round(self.quantile(0.99)),
+        }
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """
+    Process-wide store of per-stage latency histograms.
+
+    Every observation is labelled with stage, model, aspect ratio and outcome, so runs
+    of different models can be compared side by side. Export with `summary()` (JSON),
+    `to_prometheus()` / `write_prometheus()` (text exposition format) or
+    `serve_prometheus()` (HTTP `/metrics` endpoint).
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    @classmethod
+    def get(cls):
+        """Return the shared registry used by all clients in this process."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def observe(self, stage, seconds, model=None, aspect_ratio=None, outcome=SUCCESS):
+        key = (stage, model or "", aspect_ratio or "", outcome)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, stage, model=None, aspect_ratio=None):
+        """Time the enclosed block and record it with an outcome derived from how it exited."""
+        import asyncio
+
+        started = time.perf_counter()
+        outcome = SUCCESS
+        try:
+            yield
+        except asyncio.CancelledError:
+            outcome = CANCELLED
+            raise
+        except TimeoutError:
+            outcome = TIMEOUT
+            raise
+        except BaseException:
+            outcome = ERROR
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - started, model=model, aspect_ratio=aspect_ratio, outcome=outcome)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def _snapshot(self):
+        with self._lock:
+            return sorted(
+                (key, histogram.as_dict(), histogram.cumulative_counts(), histogram.sum, histogram.count)
+                for key, histogram in self._histograms.items()
+            )
+
+    def summary(self):
+        """Return all histograms as JSON-serializable dicts, one per label combination."""
+        series = []
+        for key, stats, _, _, _ in self._snapshot():
+            series.append({**dict(zip(LABEL_NAMES, key)), **stats})
+        return {
+            "started_at": self.started_at,
+            "generated_at": time.time(),
+            "buckets_s": list(self.buckets),
+            "series": series,
+        }
+
+    def to_prometheus(self):
+        """Render all histograms in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {METRIC_NAME} Duration of VeoClient stages (upload, analysis, generation, download, ...).",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        for key, _, cumulative, total, count in self._snapshot():
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(LABEL_NAMES, key))
+            for bound, value in zip(self.buckets, cumulative):
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {value}')
+            lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{METRIC_NAME}_sum{{{labels}}} {total}")
+            lines.append(f"{METRIC_NAME}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write the Prometheus text atomically, e.g. for node_exporter's textfile collector."""
+        part_path = f"{path}.tmp"
+        with open(part_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(part_path, path)
+
+    def serve_prometheus(self, port, host="127.0.0.1"):
+        """Serve `/metrics` from a daemon thread and return the HTTP server (call `shutdown()` to stop)."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        thread = threading.Thread(target=server.serve_forever, name="MetricsServer", daemon=True)
+        thread.start()
+        logger.info(f"Serving Prometheus metrics on http://{host}:{server.server_address[1]}/metrics")
+        return server
@@ -0,0 +1,223 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .utils import PROJECT_DIR, atomic_write_json, get_data_dir, setup_logger
+
+logger = setup_logger("OutputStore")
+
+# Anchored to the project like `.data`, so the catalog and the videos it indexes never disagree.
+OUTPUT_DIR = os.path.join(PROJECT_DIR, "output")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    path TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    candidate INTEGER NOT NULL DEFAULT 0,
+    sha256 TEXT,
+    size_bytes INTEGER,
+    model TEXT,
+    prompt TEXT,
+    negative_prompt TEXT,
+    aspect_ratio TEXT,
+    seed INTEGER,
+    reference_video TEXT,
+    analysis TEXT,
+    generation_seconds REAL,
+    download_seconds REAL,
+    total_seconds REAL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outputs_created_at ON outputs (created_at);
+CREATE INDEX IF NOT EXISTS idx_outputs_model_created_at ON outputs (model, created_at);
+CREATE INDEX IF NOT EXISTS idx_outputs_aspect_ratio_created_at ON outputs (aspect_ratio, created_at);
+CREATE INDEX IF NOT EXISTS idx_outputs_seed ON outputs (seed);
+CREATE INDEX IF NOT EXISTS idx_outputs_sha256 ON outputs (sha256);
+CREATE INDEX IF NOT EXISTS idx_outputs_job_id ON outputs (job_id);
+"""
+
+COLUMNS = (
+    "path",
+    "job_id",
+    "candidate",
+    "sha256",
+    "size_bytes",
+    "model",
+    "prompt",
+    "negative_prompt",
+    "aspect_ratio",
+    "seed",
+    "reference_video",
+    "analysis",
+    "generation_seconds",
+    "download_seconds",
+    "total_seconds",
+    "created_at",
+)
+
+
+def candidate_path(video_path, index, count):
+    """Path of candidate `index` of an operation; single-video operations keep `video_path` as is."""
+    if count == 1:
+        return video_path
+    root, ext = os.path.splitext(video_path)
+    return f"{root}_{index}{ext}"
+
+
+def sidecar_path(video_path):
+    """Path of the JSON record kept next to a generated video."""
+    return os.path.splitext(video_path)[0] + ".json"
+
+
+class OutputStore:
+    """
+    Names generated videos and keeps a searchable record of each one.
+
+    Files are named by job id (plus the candidate index when an operation returns
+    several videos), so two jobs can never overwrite each other. Every saved video gets
+    a sidecar JSON file with the prompt, parameters, analysis, hash and timings behind
+    it, and a row in a SQLite catalog (`.data/outputs.sqlite3`) indexed by time, model,
+    aspect ratio, seed, hash and job, so queries never walk the output directory. The
+    sidecars are the source of truth; `rebuild()` re-creates the catalog from them.
+    """
+
+    def __init__(self, path=None, directory=None):
+        self.path = path or os.path.join(get_data_dir(), "outputs.sqlite3")
+        self.directory = directory or OUTPUT_DIR
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def video_path(self, job_id):
+        """Output path for a job's video; see `candidate_path` for operations with several."""
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"generated_video_{job_id}.mp4")
+
+    def record(self, video_path, job_id, candidate=0, **fields):
+        """Write the sidecar for a saved video and upsert its catalog row; returns the record."""
+        record = {column: None for column in COLUMNS}
+        record.update(fields)
+        record.update({"path": video_path, "job_id": job_id, "candidate": candidate})
+        if record["created_at"] is None:
+            record["created_at"] = time.time()
+        atomic_write_json(sidecar_path(video_path), record, indent=2)
+        self._upsert(record)
+        return record
+
+    def annotate(self, job_id, **fields):
+        """Add details known only after the video was saved (e.g. the reference analysis) to a job's outputs."""
+        unknown = set(fields) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown output fields: {', '.join(sorted(unknown))}")
+        for record in self.query(job_id=job_id, limit=None):
+            record.update(fields)
+            atomic_write_json(sidecar_path(record["path"]), record, indent=2)
+            self._upsert(record)
+
+    def _upsert(self, record):
+        row = dict(record)
+        if row["analysis"] is not None and not isinstance(row["analysis"], str):
+            row["analysis"] = json.dumps(row["analysis"], ensure_ascii=False)
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO outputs ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                [row[column] for column in COLUMNS],
+            )
+
+    def query(self, model=None, aspect_ratio=None, seed=None, sha256=None, job_id=None, prompt=None, since=None, until=None, limit=50):
+        """
+        Return catalog records matching every given filter, newest first.
+
+        `since` / `until` are epoch seconds; `prompt` is a case-insensitive substring.
+        """
+        conditions = []
+        values = []
+        for column, value in (
+            ("model", model),
+            ("aspect_ratio", aspect_ratio),
+            ("seed", seed),
+            ("sha256", sha256),
+            ("job_id", job_id),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                values.append(value)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            values.append(since)
+        if until is not None:
+            conditions.append("created_at < ?")
+            values.append(until)
+        if prompt:
+            conditions.append("prompt LIKE ? ESCAPE '\\'")
+            escaped = prompt.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            values.append(f"%{escaped}%")
+
+        sql = "SELECT * FROM outputs"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created_at DESC, candidate"
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, values).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def rebuild(self):
+        """
+        Re-create the catalog entries of the output directory from its sidecar files; returns the row count.
+
+        Rows for videos outside the directory are left alone.
+        """
+        records = []
+        directory = os.path.abspath(self.directory)
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        record = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable sidecar {entry.path}: {e}")
+                    continue
+                if not record.get("path") or not record.get("job_id"):
+                    continue
+                if not os.path.exists(record["path"]):
+                    # Recorded relative to another working directory; the video sits next to its sidecar.
+                    record["path"] = os.path.join(self.directory, os.path.basename(record["path"]))
+                if os.path.exists(record["path"]):
+                    records.append({column: record.get(column) for column in COLUMNS})
+        with self._lock, self._conn:
+            rebuilt_jobs = {record["job_id"] for record in records}
+            stale = [
+                row["path"]
+                for row in self._conn.execute("SELECT path, job_id FROM outputs")
+                if os.path.dirname(os.path.abspath(row["path"])) == directory or row["job_id"] in rebuilt_jobs
+            ]
+            self._conn.executemany("DELETE FROM outputs WHERE path = ?", [(path,) for path in stale])
+        for record in records:
+            if record["created_at"] is None:
+                record["created_at"] = os.path.getmtime(record["path"])
+            if record["candidate"] is None:
+                record["candidate"] = 0
+            self._upsert(record)
+        return len(records)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_to_dict(row):
+        record = dict(row)
+        if record["analysis"]:
+            record["analysis"] = json.loads(record["analysis"])
+        return record
@@ -0,0 +1,254 @@
+import asyncio
+import time
+
+from .utils import setup_logger
+
+logger = setup_logger("Pipeline")
+
+UPLOAD = "upload"
+ANALYSIS = "analysis"
+GENERATION = "generation"
+STAGES = (UPLOAD, ANALYSIS, GENERATION)
+
+# Tells a stage worker that no more items will arrive on its queue.
+_DONE = object()
+
+
+class StageStats:
+    """Counters for one pipeline stage, used for progress logging and `ReferencePipeline.stats()`."""
+
+    def __init__(self, name, concurrency):
+        self.name = name
+        self.concurrency = concurrency
+        self.processed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.busy_seconds = 0.0
+        self.started_at = None
+
+    def throughput_per_min(self):
+        if self.started_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self.started_at
+        return self.processed * 60.0 / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self, queue_depth):
+        return {
+            "concurrency": self.concurrency,
+            "processed": self.processed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "queue_depth": queue_depth,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "throughput_per_min": round(self.throughput_per_min(), 2),
+        }
+
+
+class ReferencePipeline:
+    """
+    Runs batch jobs as three overlapping stages: upload, analysis and generation.
+
+    Each stage has its own worker count and hands items to the next through a bounded
+    queue, so while one job is still rendering on Veo the next reference video is
+    already being analyzed and the one after that uploaded. The bounded queues apply
+    backpressure: a stage that runs ahead simply blocks until downstream catches up.
+
+    Jobs without a `reference_video` pass straight through the first two stages.
+    `on_result(record)` is awaited once per job, in completion order.
+    """
+
+    def __init__(
+        self,
+        client,
+        upload_concurrency=2,
+        analysis_concurrency=4,
+        generation_concurrency=4,
+        queue_size=None,
+        on_result=None,
+        report_interval=30.0,
+    ):
+        limits = {UPLOAD: upload_concurrency, ANALYSIS: analysis_concurrency, GENERATION: generation_concurrency}
+        for stage, limit in limits.items():
+            if limit < 1:
+                raise ValueError(f"{stage} concurrency must be at least 1")
+        self.client = client
+        self.limits = limits
+        self.queue_size = queue_size
+        self.on_result = on_result
+        self.report_interval = report_interval
+        self._stats = {stage: StageStats(stage, limit) for stage, limit in limits.items()}
+        self._queues = {}
+
+    def stats(self):
+        """Return per-stage counters, queue depths and throughput (jobs/min) for the current run."""
+        return {
+            stage: self._stats[stage].as_dict(self._queues[stage].qsize() if stage in self._queues else 0)
+            for stage in STAGES
+        }
+
+    def format_stats(self):
+        parts = []
+        for stage, s in self.stats().items():
+            parts.append(
+                f"{stage}: {s['processed']} done, {s['in_flight']}/{s['concurrency']} busy, "
+                f"{s['queue_depth']} queued, {s['throughput_per_min']:.1f}/min"
+            )
+        return " | ".join(parts)
+
+    async def run(self, jobs):
+        """Push `jobs` through all stages and return their records in completion order."""
+        # By default each queue holds one item per worker of the stage that consumes it, which keeps
+        # every stage busy without reading far ahead of the slowest one.
+        self._queues = {
+            stage: asyncio.Queue(maxsize=self.queue_size or self.limits[stage]) for stage in STAGES
+        }
+        self._stats = {stage: StageStats(stage, limit) for stage, limit in self.limits.items()}
+        records = []
+
+        handlers = {UPLOAD: self._upload, ANALYSIS: self._analyze, GENERATION: self._generate}
+        next_stage = {UPLOAD: ANALYSIS, ANALYSIS: GENERATION, GENERATION: None}
+
+        async def feed():
+            for job in jobs:
+                await self._queues[UPLOAD].put({"job": job, "started_at": time.time(), "timings": {}})
+
+        async def run_stage(stage):
+            workers = [
+                asyncio.create_task(self._worker(stage, handlers[stage], next_stage[stage], records))
+                for _ in range(self.limits[stage])
+            ]
+            await asyncio.gather(*workers)
+
+        async def drive():
+            # Each stage is told to stop only once every item from the stage before it has been handed over.
+            await feed()
+            for stage in STAGES:
+                for _ in range(self.limits[stage]):
+                    await self._queues[stage].put(_DONE)
+                await stage_tasks[stage]
+
+        stage_tasks = {stage: asyncio.create_task(run_stage(stage)) for stage in STAGES}
+        driver = asyncio.create_task(drive())
+        reporter = asyncio.create_task(self._report())
+        tasks = [driver, *stage_tasks.values()]
+        try:
+            # A stage that dies (e.g. on_result raised) would otherwise leave the driver blocked on a full queue.
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in tasks:
+                if task.done() and task.exception() is not None:
+                    raise task.exception()
+            await driver
+        finally:
+            for task in (reporter, *tasks):
+                task.cancel()
+            await asyncio.gather(reporter, *tasks, return_exceptions=True)
+
+        logger.info(f"Pipeline finished. {self.format_stats()}")
+        return records
+
+    async def _report(self):
+        if not self.report_interval:
+            return
+        while True:
+            await asyncio.sleep(self.report_interval)
+            logger.info(f"Pipeline progress. {self.format_stats()}")
+
+    async def _worker(self, stage, handler, next_stage, records):
+        queue = self._queues[stage]
+        stats = self._stats[stage]
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if stats.started_at is None:
+                stats.started_at = time.monotonic()
+
+            stats.in_flight += 1
+            started = time.monotonic()
+            try:
+                await handler(item)
+            except Exception as e:
+                logger.error(f"[{item['job']['id']}] {stage} failed: {e}")
+                item["error"] = str(e)
+                item["failed_stage"] = stage
+                stats.failed += 1
+            finally:
+                elapsed = time.monotonic() - started
+                item["timings"][stage] = round(elapsed, 3)
+                stats.busy_seconds += elapsed
+                stats.in_flight -= 1
+                stats.processed += 1
+
+            if next_stage is not None and "error" not in item:
+                await self._queues[next_stage].put(item)
+            else:
+                record = self._finish(item)
+                records.append(record)
+                if self.on_result is not None:
+                    await self.on_result(record)
+
+    async def _upload(self, item):
+        job = item["job"]
+        if not job.get("reference_video"):
+            return
+        item["analysis_request"] = await self.client.prepare_reference_analysis(
+            job["reference_video"],
+            user_prompt=job.get("prompt"),
+            prompt_language=job.get("prompt_language", "zh"),
+        )
+
+    async def _analyze(self, item):
+        request = item.get("analysis_request")
+        if request is None:
+            return
+        analysis = await self.client.run_reference_analysis(request)
+        veo_prompt = analysis.get("veo_prompt")
+        if not veo_prompt:
+            raise ValueError("Model response missing 'veo_prompt'")
+        item["analysis"] = analysis
+        item["final_prompt"] = veo_prompt
+
+    async def _generate(self, item):
+        job = item["job"]
+        item["result"] = await self.client.generate_video_result(
+            item.get("final_prompt") or job["prompt"],
+            aspect_ratio=job.get("aspect_ratio", "16:9"),
+            person_generation=job.get("person_generation", "allow_adult"),
+            negative_prompt=job.get("negative_prompt"),
+            seed=job.get("seed"),
+            model=job.get("model"),
+            number_of_videos=job.get("number_of_videos", 1),
+        )
+        if "analysis" in item:
+            await self.client.annotate_outputs(
+                item["result"], reference_video=job.get("reference_video"), analysis=item["analysis"]
+            )
+
+    def _finish(self, item):
+        job = item["job"]
+        record = {"id": job["id"], "job": job, "started_at": item["started_at"]}
+        if "analysis" in item:
+            record["final_prompt"] = item["final_prompt"]
+            record["analysis"] = item["analysis"]
+
+        result = item.get("result") or {}
+        video_path = result.get("video_path")
+        record["video_path"] = video_path
+        record["sha256"] = result.get("sha256")
+        record["size_bytes"] = result.get("size_bytes")
+        if len(result.get("candidates") or []) > 1:
+            record["candidates"] = result["candidates"]
+        if "error" in item:
+            record["status"] = "failed"
+            record["error"] = item["error"]
+            record["failed_stage"] = item["failed_stage"]
+        elif video_path:
+            record["status"] = "succeeded"
+        else:
+            record["status"] = "failed"
+            record["error"] = "Generation completed but no file returned."
+
+        record["finished_at"] = time.time()
+        record["duration_s"] = round(record["finished_at"] - item["started_at"], 3)
+        record["stage_timings"] = item["timings"]
+        return record
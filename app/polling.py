@@ -0,0 +1,231 @@
+import asyncio
+import contextvars
+import random
+import time
+
+from .config import Config
+from .scheduler import is_rate_limited, retry_after_seconds
+from .utils import setup_logger
+
+logger = setup_logger("VeoClient")
+
+# Defaults per workload. Fast Veo models usually finish in well under a minute, standard
+# models take several minutes, and uploaded files typically become ACTIVE in seconds.
+DEFAULT_POLICIES = {
+    "fast": {"initial_delay": 10, "multiplier": 1.5, "max_interval": 15, "jitter": 0.2, "deadline": 900},
+    "standard": {"initial_delay": 30, "multiplier": 1.5, "max_interval": 30, "jitter": 0.2, "deadline": 1800},
+    "files": {"initial_delay": 1, "multiplier": 1.6, "max_interval": 10, "jitter": 0.2, "deadline": 600},
+}
+
+
+class PollingTimeoutError(TimeoutError):
+    """Raised when a polled resource does not finish before the policy deadline."""
+
+
+class PollingPolicy:
+    """
+    Exponential backoff with jitter and an overall deadline.
+
+    The n-th delay is `initial_delay * multiplier ** n`, capped at `max_interval` and
+    randomized by +/- `jitter` (a fraction) so many jobs do not poll in lockstep.
+    """
+
+    def __init__(self, initial_delay=5, multiplier=1.5, max_interval=30, jitter=0.2, deadline=None, max_consecutive_errors=5):
+        self.initial_delay = initial_delay
+        self.multiplier = multiplier
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.deadline = deadline
+        self.max_consecutive_errors = max_consecutive_errors
+
+    @classmethod
+    def from_settings(cls, kind):
+        """Build the policy for `kind` ("fast", "standard" or "files"), applying config.json overrides."""
+        params = dict(DEFAULT_POLICIES[kind])
+        params.update(Config.get_setting("polling", {}).get(kind, {}))
+        return cls(**params)
+
+    @classmethod
+    def for_model(cls, model):
+        """Return the operation polling policy for a Veo model ID."""
+        return cls.from_settings("fast" if "fast" in (model or "") else "standard")
+
+    @classmethod
+    def for_files(cls):
+        """Return the policy for waiting on uploaded files to become ACTIVE."""
+        return cls.from_settings("files")
+
+    def delay(self, attempt):
+        """Return the delay in seconds before poll number `attempt` (0-based)."""
+        base = min(self.initial_delay * (self.multiplier ** attempt), self.max_interval)
+        if self.jitter:
+            base *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(base, 0.0)
+
+    def error_delay(self, errors):
+        """Return the delay after `errors` consecutive polling failures."""
+        return self.delay(errors)
+
+
+class _Pending:
+    def __init__(self, kind, resource, policy, future, label):
+        self.kind = kind
+        self.resource = resource
+        self.policy = policy
+        self.future = future
+        self.label = label
+        # Context of the waiter, so log lines about this item are attributed to the job that asked for it.
+        self.context = contextvars.copy_context()
+        self.attempt = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self.next_poll = self.started + policy.delay(0)
+
+
+class OperationPoller:
+    """
+    Central poller that refreshes every pending Veo operation and uploaded file from one loop.
+
+    Callers `await wait_operation(...)` or `await wait_file(...)`; a single background task
+    sleeps until the earliest item is due, refreshes all due items concurrently and
+    resolves each waiter when its resource is finished.
+    """
+
+    def __init__(self, client, max_concurrent_polls=16):
+        self.client = client
+        self.max_concurrent_polls = max_concurrent_polls
+        self.api_calls = 0
+        self._pending = set()
+        self._loop = None
+        self._task = None
+        self._wakeup = None
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the client is now driven by a different event loop.
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._task = None
+            self._pending = set()
+        if self._task is None or self._task.done():
+            # The shared task serves every waiter, so it must not inherit the context of the first one.
+            self._task = contextvars.Context().run(loop.create_task, self._run())
+
+    async def wait_operation(self, operation, policy, label=None):
+        """Wait until a long-running operation is done and return its final state."""
+        return await self._wait("operation", operation, policy, label or getattr(operation, "name", "operation"))
+
+    async def wait_file(self, file, policy, label=None):
+        """Wait until an uploaded file is ACTIVE and return it."""
+        if file.state == "ACTIVE":
+            return file
+        return await self._wait("file", file, policy, label or file.name)
+
+    async def _wait(self, kind, resource, policy, label):
+        self._ensure_running()
+        future = self._loop.create_future()
+        item = _Pending(kind, resource, policy, future, label)
+        self._pending.add(item)
+        self._wakeup.set()
+        try:
+            return await future
+        finally:
+            self._pending.discard(item)
+
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    async def _run(self):
+        semaphore = asyncio.Semaphore(self.max_concurrent_polls)
+        while True:
+            self._pending = {item for item in self._pending if not item.future.done()}
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            next_due = min(item.next_poll for item in self._pending)
+            if next_due > now:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=next_due - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = [item for item in self._pending if item.next_poll <= now]
+
+            async def refresh(item):
+                async with semaphore:
+                    try:
+                        await self._refresh(item)
+                    except Exception as e:
+                        # One bad item must not take down the loop every other waiter depends on.
+                        if not item.future.done():
+                            item.future.set_exception(e)
+
+            await asyncio.gather(*(refresh(item) for item in due))
+
+    async def _refresh(self, item):
+        if item.future.done():
+            # The waiter gave up (e.g. a cancelled hedge) while this item was queued for a poll.
+            return
+        policy = item.policy
+        elapsed = time.monotonic() - item.started
+        if policy.deadline is not None and elapsed > policy.deadline:
+            item.future.set_exception(
+                PollingTimeoutError(f"Timed out after {elapsed:.0f}s waiting for {item.kind} {item.label}")
+            )
+            return
+
+        try:
+            self.api_calls += 1
+            if item.kind == "operation":
+                item.resource = await self.client.aio.operations.get(item.resource)
+            else:
+                item.resource = await self.client.aio.files.get(name=item.resource.name)
+        except Exception as e:
+            if is_rate_limited(e):
+                # Quota pressure is not a failure of the operation; back off until the deadline instead of giving up.
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = policy.error_delay(item.errors + 1)
+                item.context.run(logger.warning, f"Polling rate-limited for {item.kind} {item.label}; retrying in {delay:.1f}s")
+                item.next_poll = time.monotonic() + delay
+                return
+            item.errors += 1
+            item.context.run(
+                logger.warning,
+                f"Polling error for {item.kind} {item.label} "
+                f"(attempt {item.errors}/{policy.max_consecutive_errors}): {e}"
+            )
+            if item.errors >= policy.max_consecutive_errors:
+                if not item.future.done():
+                    item.future.set_exception(e)
+                return
+            item.next_poll = time.monotonic() + policy.error_delay(item.errors)
+            return
+
+        item.errors = 0
+        if item.future.done():
+            return
+        if item.kind == "operation":
+            if item.resource.done:
+                item.future.set_result(item.resource)
+                return
+            item.context.run(logger.info, f"Status: Processing... ({item.label}, {elapsed:.0f}s elapsed)")
+        else:
+            state = item.resource.state
+            if state == "ACTIVE":
+                item.future.set_result(item.resource)
+                return
+            if state == "FAILED":
+                item.future.set_exception(RuntimeError(f"File processing failed for {item.label}"))
+                return
+            item.context.run(logger.info, f"File state: {state}")
+
+        item.attempt += 1
+        item.next_poll = time.monotonic() + policy.delay(item.attempt)
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+from .config import Config
+from .utils import atomic_write_json, get_cache_dir, setup_logger
+
+logger = setup_logger("ResultCache")
+
+DEFAULT_TTL_HOURS = 24 * 7
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def _normalize_text(value):
+    return " ".join((value or "").split())
+
+
+class ResultCache:
+    """
+    On-disk cache of finished generations for seeded requests.
+
+    Veo is only reproducible when a seed is fixed, so only seeded requests are cached.
+    Each hit is served from a hardlink (or copy) of the original output kept in
+    `.cache/results/`, so deleting or moving files in `output/` does not invalidate it.
+    Entries expire after `ttl_hours`; least recently used videos are evicted once the
+    total size exceeds `max_bytes`. Disabled unless `result_cache.enabled` is set.
+    """
+
+    def __init__(self, directory=None, ttl_hours=None, max_bytes=None, enabled=None):
+        settings = Config.get_setting("result_cache", {})
+        self.enabled = settings.get("enabled", False) if enabled is None else enabled
+        self.directory = directory or get_cache_dir("results")
+        self.ttl_hours = ttl_hours or settings.get("ttl_hours", DEFAULT_TTL_HOURS)
+        self.max_bytes = max_bytes or settings.get("max_bytes", DEFAULT_MAX_BYTES)
+        self.index_path = os.path.join(self.directory, "index.json")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = None
+
+    @staticmethod
+    def make_key(model, prompt, negative_prompt, aspect_ratio, seed, person_generation=None, number_of_videos=1):
+        """Build the key for a generation request; whitespace-only prompt differences do not matter."""
+        fields = {
+            "model": model or "",
+            "prompt": _normalize_text(prompt),
+            "negative_prompt": _normalize_text(negative_prompt),
+            "aspect_ratio": aspect_ratio or "",
+            "seed": seed,
+            "person_generation": person_generation or "",
+        }
+        if number_of_videos != 1:
+            # Only added when set, so keys of single-video requests are unchanged.
+            fields["number_of_videos"] = number_of_videos
+        raw = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _load(self):
+        if self._index is not None:
+            return self._index
+        index = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable result cache index {self.index_path}: {e}")
+        self._index = index
+        return index
+
+    def _save(self):
+        try:
+            atomic_write_json(self.index_path, self._index, indent=2)
+        except Exception as e:
+            logger.warning(f"Failed to persist result cache index: {e}")
+
+    def _drop(self, key):
+        entry = self._index.pop(key, None)
+        if entry:
+            try:
+                os.remove(entry["cache_path"])
+            except OSError:
+                pass
+
+    def get(self, key):
+        """Return the cached result dict for `key` (with `video_path` pointing into the cache), or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._load().get(key)
+            if entry and (
+                time.time() - entry["created_at"] > self.ttl_hours * 3600
+                or not os.path.exists(entry["cache_path"])
+            ):
+                self._drop(key)
+                self._save()
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry["last_used"] = time.time()
+            self._save()
+            return {
+                "video_path": entry["cache_path"],
+                "sha256": entry["sha256"],
+                "size_bytes": entry["size_bytes"],
+                "job_id": entry.get("job_id"),
+                "model": entry.get("model"),
+            }
+
+    def put(self, key, result):
+        """Keep a link to a freshly generated video and evict old entries if over budget."""
+        if not self.enabled or not result or not result.get("video_path"):
+            return
+        source = result["video_path"]
+        cache_path = os.path.join(self.directory, f"{key}.mp4")
+        with self._lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                if os.path.exists(cache_path):
+                    os.remove(cache_path)
+                try:
+                    os.link(source, cache_path)
+                except OSError:
+                    shutil.copy2(source, cache_path)
+            except OSError as e:
+                logger.warning(f"Failed to cache generated video {source}: {e}")
+                return
+            now = time.time()
+            self._load()[key] = {
+                "cache_path": cache_path,
+                "sha256": result.get("sha256"),
+                "size_bytes": result.get("size_bytes") or os.path.getsize(cache_path),
+                "job_id": result.get("job_id"),
+                "model": result.get("model"),
+                "created_at": now,
+                "last_used": now,
+            }
+            self._evict()
+            self._save()
+
+    def _evict(self):
+        entries = sorted(self._index.items(), key=lambda item: item[1].get("last_used", 0))
+        total_bytes = sum(entry.get("size_bytes") or 0 for _, entry in entries)
+        while entries and total_bytes > self.max_bytes:
+            key, entry = entries.pop(0)
+            self._drop(key)
+            total_bytes -= entry.get("size_bytes") or 0
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current size of the cache."""
+        with self._lock:
+            index = self._load()
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(index),
+                "bytes": sum(entry.get("size_bytes") or 0 for entry in index.values()),
+            }
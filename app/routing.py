@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+
+from .config import Config
+from .history import RollingHistory, nearest_rank
+from .scheduler import INTERACTIVE, current_priority
+from .utils import get_data_dir, setup_logger
+
+logger = setup_logger("VeoClient")
+
+CURRENT_MODEL = "current_model"
+FASTEST_HEALTHY = "fastest_healthy"
+POLICIES = (CURRENT_MODEL, FASTEST_HEALTHY)
+
+DEFAULT_HEDGE_MODEL = "veo-3.1-fast-generate-preview"
+DEFAULT_HEDGE = {
+    "enabled": False,
+    "model": DEFAULT_HEDGE_MODEL,
+    "percentile": 0.9,
+    "min_delay": 60,
+    "fallback_delay": None,
+    "interactive_only": True,
+}
+
+
+class ModelStats:
+    """Snapshot of one model's rolling generation latencies and outcomes."""
+
+    def __init__(self, latencies=(), outcomes=(), failures=()):
+        self.latencies = list(latencies)
+        self.outcomes = list(outcomes)
+        self.last_failure_at = max(failures) if failures else None
+
+    @property
+    def failure_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def quantile(self, q):
+        """Nearest-rank quantile of the recorded latencies, or None without samples."""
+        return nearest_rank(self.latencies, q)
+
+
+class ModelRouter:
+    """
+    Picks the Veo model for a request and decides when to hedge it.
+
+    Generation latency and failures are tracked per model over a rolling window and
+    persisted to `.data/model_latency.json`, so short CLI and GUI sessions start with
+    the history of earlier runs. Configured under `routing` in config.json:
+
+    - `policy`: "current_model" (default) uses the model selected in config.json;
+      "fastest_healthy" picks the model from `models` with the lowest median latency
+      whose failure rate is at most `max_failure_rate`. Models with fewer than
+      `min_samples` results are tried first so every candidate gets measured, and an
+      unhealthy model is probed again after `cooldown_seconds`.
+    - `hedge`: when enabled, a request still running after the `percentile` latency of
+      its model (at least `min_delay` seconds; `fallback_delay` until there are enough
+      samples) is also submitted to the hedge `model`, and the first result wins. By
+      default only interactive requests are hedged. A hedged request may be billed twice.
+
+    A model passed explicitly by the caller is always used as is.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, settings=None, path=None):
+        self.settings = settings if settings is not None else Config.get_setting("routing", {})
+        self.policy = self.settings.get("policy", CURRENT_MODEL)
+        if self.policy not in POLICIES:
+            logger.warning(f"Unknown routing policy {self.policy!r}; using {CURRENT_MODEL!r}.")
+            self.policy = CURRENT_MODEL
+        self.max_failure_rate = self.settings.get("max_failure_rate", 0.3)
+        self.min_samples = self.settings.get("min_samples", 3)
+        self.window = self.settings.get("window", 50)
+        self.cooldown_seconds = self.settings.get("cooldown_seconds", 600)
+        self.hedge = dict(DEFAULT_HEDGE)
+        self.hedge.update(self.settings.get("hedge", {}))
+        self.path = path or os.path.join(get_data_dir(), "model_latency.json")
+        self.history = RollingHistory(self.path, self.window, "model latency history")
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def get(cls):
+        """Return the router shared by every client in this process."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _model_stats(self, model):
+        history = self.history
+        return ModelStats(
+            history.values(model, "latencies"),
+            history.values(model, "outcomes"),
+            history.values(model, "failures"),
+        )
+
+    def record(self, model, seconds, ok=True):
+        """Record a finished generation (`seconds` from submit to done) or a failure (`ok=False`)."""
+        values = {"outcomes": 1 if ok else 0}
+        if ok and seconds is not None:
+            values["latencies"] = seconds
+        if not ok:
+            values["failures"] = time.time()
+        self.history.record(model, **values)
+
+    @property
+    def candidates(self):
+        models = self.settings.get("models")
+        if models:
+            return list(models)
+        return list(dict.fromkeys([Config.get_current_model(), self.hedge["model"]]))
+
+    def is_healthy(self, model):
+        stats = self._model_stats(model)
+        if len(stats.outcomes) < self.min_samples:
+            return True
+        if stats.failure_rate <= self.max_failure_rate:
+            return True
+        return stats.last_failure_at is not None and time.time() - stats.last_failure_at > self.cooldown_seconds
+
+    def choose(self, model=None):
+        """Return `model` if given, otherwise the model selected by the routing policy."""
+        if model:
+            return model
+        if self.policy != FASTEST_HEALTHY:
+            return Config.get_current_model()
+
+        candidates = self.candidates
+        healthy = [m for m in candidates if self.is_healthy(m)]
+        if not healthy:
+            # Everything is failing; fall back to the least bad model.
+            return min(candidates, key=lambda m: self._model_stats(m).failure_rate)
+        for m in healthy:
+            if len(self._model_stats(m).latencies) < self.min_samples:
+                return m
+        return min(healthy, key=lambda m: self._model_stats(m).quantile(0.5))
+
+    def hedge_model(self, model):
+        """Model to hedge `model` with, or None when hedging does not apply to this request."""
+        hedge = self.hedge
+        if not hedge["enabled"] or not hedge["model"] or model == hedge["model"]:
+            return None
+        if hedge["interactive_only"] and current_priority.get() != INTERACTIVE:
+            return None
+        return hedge["model"]
+
+    def hedge_delay(self, model):
+        """Seconds to wait on `model` before hedging, or None if there is not enough history yet."""
+        stats = self._model_stats(model)
+        if len(stats.latencies) >= self.min_samples:
+            delay = stats.quantile(self.hedge["percentile"])
+        else:
+            delay = self.hedge["fallback_delay"]
+        if delay is None:
+            return None
+        return max(delay, self.hedge["min_delay"])
+
+    def stats(self):
+        """Per-model sample count, p50/p90 latency, failure rate and health, plus hedge counters."""
+        models = {}
+        for model in self.history.keys():
+            stats = self._model_stats(model)
+            models[model] = {
+                "samples": len(stats.latencies),
+                "p50_s": stats.quantile(0.5),
+                "p90_s": stats.quantile(0.9),
+                "failure_rate": round(stats.failure_rate, 3),
+                "healthy": self.is_healthy(model),
+            }
+        return {"policy": self.policy, "models": models, "hedged": self.hedged, "hedge_wins": self.hedge_wins}
@@ -0,0 +1,284 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+
+from .config import Config
+from .utils import setup_logger
+
+logger = setup_logger("VeoClient")
+
+# Priority classes; lower runs first.
+INTERACTIVE = 0
+BATCH = 1
+
+# Priority of API calls made from the current task. VeoClient (GUI and interactive CLI)
+# sets INTERACTIVE; batch runs keep the default.
+current_priority = contextvars.ContextVar("veo_request_priority", default=BATCH)
+
+UPLOAD_KEY = "files.upload"
+
+DEFAULT_RETRY = {"max_retries": 6, "base_delay": 2.0, "max_delay": 120.0, "jitter": 0.2}
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+RETRYABLE_STATUSES = {"RESOURCE_EXHAUSTED", "UNAVAILABLE", "INTERNAL", "DEADLINE_EXCEEDED"}
+# A `generate_videos` submit that failed with a 500 or timed out may still have started a
+# (billed) operation, so submits are only retried when the server surely rejected them.
+SUBMIT_RETRYABLE_CODES = {429, 503}
+SUBMIT_RETRYABLE_STATUSES = {"RESOURCE_EXHAUSTED", "UNAVAILABLE"}
+
+
+def _error_code(error):
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_rate_limited(error):
+    """True for HTTP 429 / RESOURCE_EXHAUSTED errors from the API."""
+    return _error_code(error) == 429 or getattr(error, "status", None) == "RESOURCE_EXHAUSTED" or (
+        "RESOURCE_EXHAUSTED" in str(error)
+    )
+
+
+def is_retryable(error):
+    """True for rate limits and transient server errors that are safe to retry."""
+    return (
+        is_rate_limited(error)
+        or _error_code(error) in RETRYABLE_CODES
+        or getattr(error, "status", None) in RETRYABLE_STATUSES
+    )
+
+
+def is_submit_retryable(error):
+    """True for errors after which resubmitting a video generation cannot start a duplicate."""
+    return (
+        is_rate_limited(error)
+        or _error_code(error) in SUBMIT_RETRYABLE_CODES
+        or getattr(error, "status", None) in SUBMIT_RETRYABLE_STATUSES
+    )
+
+
+def retry_after_seconds(error):
+    """
+    Return the server-requested delay for a rate-limited error, or None.
+
+    Looks at the HTTP `Retry-After` header first, then a `google.rpc.RetryInfo`
+    `retryDelay` (e.g. "17s") in the error details.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        if value:
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                pass
+
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        details = details.get("error", details).get("details")
+    for detail in details or []:
+        if isinstance(detail, dict) and str(detail.get("@type", "")).endswith("RetryInfo"):
+            match = re.match(r"^([\d.]+)s$", str(detail.get("retryDelay", "")))
+            if match:
+                return float(match.group(1))
+    return None
+
+
+class TokenBucket:
+    """
+    Async token bucket with priority-ordered waiters and a shared cool-down.
+
+    Tokens refill at `rate` per second up to `burst`. Waiters are served strictly by
+    (priority, arrival), so interactive requests overtake queued batch requests. After
+    a rate-limit response `pause(delay)` empties the bucket and holds every caller
+    until the delay has passed, instead of letting each one hit the limit again.
+    """
+
+    def __init__(self, rate=None, burst=1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._loop = None
+        self._wakeup = None
+
+    def _refill(self, now):
+        if now <= self.updated:
+            # Still inside a pause; the bucket starts refilling once it ends.
+            return
+        if self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        else:
+            self.tokens = float(self.burst)
+        self.updated = now
+
+    def _ensure_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._waiters = []
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    async def acquire(self, priority=BATCH):
+        """Wait for a token; returns the seconds spent waiting."""
+        self._ensure_loop()
+        started = time.monotonic()
+        entry = (priority, next(self._seq))
+        heapq.heappush(self._waiters, entry)
+        try:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self._waiters[0] == entry and self.tokens >= 1:
+                    heapq.heappop(self._waiters)
+                    self.tokens -= 1
+                    # Let the next waiter re-check right away in case tokens remain.
+                    self._wakeup.set()
+                    return now - started
+
+                if now < self.paused_until:
+                    timeout = self.paused_until - now
+                elif self._waiters[0] == entry and self.rate:
+                    timeout = (1 - self.tokens) / self.rate
+                else:
+                    timeout = None
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._wakeup.set()
+
+    def pause(self, delay):
+        """Hold all callers for `delay` seconds and restart from an empty bucket."""
+        until = time.monotonic() + delay
+        if until > self.paused_until:
+            self.paused_until = until
+            self.tokens = 0.0
+            self.updated = until
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+
+class RequestScheduler:
+    """
+    Rate limiter and retry policy in front of `generate_videos`, `generate_content` and `files.upload`.
+
+    Each model (and file uploads) gets its own token bucket sized from the `quota`
+    section of config.json. Calls that fail with 429 / RESOURCE_EXHAUSTED pause that
+    bucket for the server's Retry-After (or an exponential backoff) and are retried, as
+    are transient 5xx errors (for video submits only 429 and 503, see
+    `is_submit_retryable`). Waiting callers are served by priority class.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, settings=None):
+        self.settings = settings if settings is not None else Config.get_setting("quota", {})
+        retry = dict(DEFAULT_RETRY)
+        retry.update(self.settings.get("retry", {}))
+        self.max_retries = retry["max_retries"]
+        self.base_delay = retry["base_delay"]
+        self.max_delay = retry["max_delay"]
+        self.jitter = retry["jitter"]
+        self._buckets = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        """Return the scheduler shared by every client in this process (quotas are per API key)."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _limits_for(self, key):
+        limits = self.settings.get("limits", {})
+        if key in limits:
+            return limits[key]
+        return self.settings.get("default", {})
+
+    def bucket(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                limits = self._limits_for(key)
+                per_minute = limits.get("requests_per_minute")
+                bucket = TokenBucket(
+                    rate=per_minute / 60.0 if per_minute else None,
+                    burst=limits.get("burst", 1 if per_minute else 1000),
+                )
+                self._buckets[key] = bucket
+                self._stats[key] = {"calls": 0, "rate_limited": 0, "retries": 0, "wait_seconds": 0.0}
+            return bucket
+
+    def stats(self):
+        """Per-bucket counters: calls, rate-limited responses, retries, total seconds queued."""
+        with self._lock:
+            return {
+                key: {**stats, "queued": self._buckets[key].queued, "wait_seconds": round(stats["wait_seconds"], 3)}
+                for key, stats in self._stats.items()
+            }
+
+    def _backoff(self, attempt):
+        delay = min(self.base_delay * (2 ** attempt), self.max_delay)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def call(self, key, fn, priority=None, retryable=is_retryable):
+        """
+        Run `await fn()` under the quota for `key` (a model id or UPLOAD_KEY), retrying throttled calls.
+
+        `fn` is called again on every retry, so it must build a fresh request each time.
+        `retryable(error)` decides which failures are retried.
+        """
+        priority = current_priority.get() if priority is None else priority
+        bucket = self.bucket(key)
+        stats = self._stats[key]
+        attempt = 0
+        while True:
+            stats["wait_seconds"] += await bucket.acquire(priority)
+            stats["calls"] += 1
+            try:
+                return await fn()
+            except Exception as e:
+                if not retryable(e) or attempt >= self.max_retries:
+                    raise
+                rate_limited = is_rate_limited(e)
+                delay = retry_after_seconds(e) if rate_limited else None
+                if delay is None:
+                    delay = self._backoff(attempt)
+                if rate_limited:
+                    stats["rate_limited"] += 1
+                    bucket.pause(delay)
+                attempt += 1
+                stats["retries"] += 1
+                logger.warning(f"{key} request throttled or failed ({e}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+
+async def with_priority(coro, priority):
+    """Await `coro` with `current_priority` set for it and every task it spawns."""
+    token = current_priority.set(priority)
+    try:
+        return await coro
+    finally:
+        current_priority.reset(token)
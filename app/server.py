@@ -0,0 +1,444 @@
+import asyncio
+import contextvars
+import ipaddress
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .eta import JobProgress, with_progress
+from .metrics import PROMETHEUS_CONTENT_TYPE, MetricsRegistry
+from .scheduler import BATCH, INTERACTIVE, with_priority
+from .utils import BackgroundLoop, add_log_handler, remove_log_handler, setup_logger
+
+logger = setup_logger("Server")
+
+# Service job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+KINDS = ("generate", "analyze")
+PRIORITIES = {"interactive": INTERACTIVE, "batch": BATCH}
+
+# Accepted request fields and their types
+JOB_FIELDS = {
+    "prompt": str,
+    "reference_video": str,
+    "prompt_language": str,
+    "aspect_ratio": str,
+    "person_generation": str,
+    "negative_prompt": str,
+    "seed": int,
+    "model": str,
+    "number_of_videos": int,
+    "use_cache": bool,
+}
+
+MAX_BODY_BYTES = 1024 * 1024
+SSE_KEEPALIVE_SECONDS = 15
+CHUNK_SIZE = 1024 * 1024
+
+# Service job whose task is currently running; lets log records be routed to its event stream.
+current_service_job = contextvars.ContextVar("veo_service_job", default=None)
+
+
+class ServiceJob:
+    """A generate or analyze request submitted over HTTP, with its event history."""
+
+    def __init__(self, kind, params, priority):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.priority = priority
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.progress = None
+        self.events = []
+        self._condition = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in (SUCCEEDED, FAILED)
+
+    def emit(self, event, data=None, status=None):
+        with self._condition:
+            # Status and its event change together, so a follower never sees one without the other.
+            if status is not None:
+                self.status = status
+            self.events.append({"id": len(self.events), "event": event, "data": data or {}, "at": time.time()})
+            self._condition.notify_all()
+
+    def set_status(self, status, **data):
+        self.emit("status", {"status": status, **data}, status=status)
+
+    def wait_events(self, after, timeout):
+        """Return events with an id greater than `after`, waiting up to `timeout` seconds for one."""
+        with self._condition:
+            if len(self.events) <= after + 1 and not self.done:
+                self._condition.wait(timeout)
+            return self.events[after + 1:]
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+            "progress": self.progress.as_dict() if self.progress is not None else None,
+        }
+
+
+class _JobLogHandler(logging.Handler):
+    """Copies client log records into the event stream of the service job that produced them."""
+
+    def emit(self, record):
+        job = current_service_job.get()
+        if job is not None:
+            try:
+                job.emit("log", {"level": record.levelname, "message": record.getMessage()})
+            except Exception:
+                self.handleError(record)
+
+
+def _parse_job(payload):
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    kind = payload.get("kind", "generate")
+    if kind not in KINDS:
+        raise ValueError(f"'kind' must be one of {', '.join(KINDS)}")
+    priority = payload.get("priority", "interactive")
+    if priority not in PRIORITIES:
+        raise ValueError(f"'priority' must be one of {', '.join(PRIORITIES)}")
+
+    params = {}
+    for field, expected in JOB_FIELDS.items():
+        value = payload.get(field)
+        if value is None:
+            continue
+        if expected is int and isinstance(value, str) and value.strip().lstrip("-").isdigit():
+            value = int(value)
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            raise ValueError(f"'{field}' must be of type {expected.__name__}")
+        params[field] = value
+
+    if kind == "analyze" and not params.get("reference_video"):
+        raise ValueError("An analyze job needs a 'reference_video'")
+    if not params.get("prompt") and not params.get("reference_video"):
+        raise ValueError("A generate job needs a 'prompt' or a 'reference_video'")
+    if params.get("reference_video") and not os.path.exists(params["reference_video"]):
+        raise ValueError(f"Reference video not found: {params['reference_video']}")
+    return kind, params, PRIORITIES[priority]
+
+
+class JobService:
+    """
+    Runs generate and analyze jobs for every HTTP caller on one shared client.
+
+    Jobs execute on the process-wide background event loop through a single
+    AsyncVeoClient, so callers share the client pool, request scheduler, upload,
+    analysis and result caches, and at most `workers` jobs run at once. Finished jobs
+    are kept in memory (the newest `max_jobs`) for listing and result lookups.
+    """
+
+    def __init__(self, client=None, workers=4, max_jobs=1000):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if client is None:
+            from .client_pool import ClientRegistry
+
+            client = ClientRegistry.get_veo_client().async_client
+        self.client = client
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._loop = BackgroundLoop.get()
+        self._semaphore = None
+        # On every app logger, so upload, cache, transcode and output store logs reach the job too.
+        self._log_handler = _JobLogHandler()
+        add_log_handler(self._log_handler)
+
+    def close(self):
+        remove_log_handler(self._log_handler)
+
+    def submit(self, payload):
+        """Validate a request body, queue the job and return it; raises ValueError for bad input."""
+        kind, params, priority = _parse_job(payload)
+        job = ServiceJob(kind, params, priority)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.set_status(QUEUED)
+        self._loop.submit(self._run(job))
+        return job
+
+    def _prune(self):
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, status=None, limit=50):
+        """Return jobs, newest first, optionally only those in `status`."""
+        with self._lock:
+            jobs = [job for job in reversed(self._jobs.values()) if status is None or job.status == status]
+        return jobs[:limit]
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {state: 0 for state in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+        for job in jobs:
+            counts[job.status] += 1
+        return {"workers": self.workers, "jobs": counts}
+
+    async def _run(self, job):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+        async with self._semaphore:
+            token = current_service_job.set(job)
+            job.started_at = time.time()
+            job.progress = JobProgress.for_job(
+                reference=bool(job.params.get("reference_video")),
+                generate=job.kind == "generate",
+                model=job.params.get("model"),
+                aspect_ratio=job.params.get("aspect_ratio", "16:9"),
+                estimator=self.client.estimator,
+                on_change=lambda progress: job.emit("progress", progress.as_dict()),
+            )
+            job.set_status(RUNNING)
+            job.emit("progress", job.progress.as_dict())
+            try:
+                job.result = await with_priority(with_progress(self._execute(job), job.progress), job.priority)
+                if job.kind == "generate" and not (job.result or {}).get("video_path"):
+                    raise RuntimeError("Generation completed but no file returned.")
+                job.finished_at = time.time()
+                job.set_status(SUCCEEDED, result=job.result)
+            except Exception as e:
+                logger.error(f"Service job {job.id} failed: {e}")
+                job.error = str(e)
+                job.finished_at = time.time()
+                job.set_status(FAILED, error=job.error)
+            finally:
+                job.progress.finish()
+                current_service_job.reset(token)
+
+    async def _execute(self, job):
+        params = job.params
+        client = self.client
+        if job.kind == "analyze":
+            analysis = await client.analyze_reference_video(
+                params["reference_video"],
+                user_prompt=params.get("prompt"),
+                prompt_language=params.get("prompt_language", "zh"),
+                use_cache=params.get("use_cache", True),
+                on_veo_prompt=lambda veo_prompt: job.emit("veo_prompt", {"veo_prompt": veo_prompt}),
+            )
+            return {"analysis": analysis, "final_prompt": analysis.get("veo_prompt")}
+
+        options = {
+            "aspect_ratio": params.get("aspect_ratio", "16:9"),
+            "person_generation": params.get("person_generation", "allow_adult"),
+            "negative_prompt": params.get("negative_prompt"),
+            "seed": params.get("seed"),
+            "model": params.get("model"),
+            "number_of_videos": params.get("number_of_videos", 1),
+        }
+        if params.get("reference_video"):
+            return await client.generate_video_from_reference(
+                params["reference_video"],
+                params.get("prompt"),
+                prompt_language=params.get("prompt_language", "zh"),
+                use_cache=params.get("use_cache", True),
+                **options,
+            )
+        return await client.generate_video_result(params["prompt"], **options)
+
+
+def _make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, data):
+            body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_error(self, status, message):
+            self._send_json(status, {"error": message})
+
+        def _route(self):
+            url = urlparse(self.path)
+            parts = [part for part in url.path.split("/") if part]
+            return parts, parse_qs(url.query)
+
+        def do_POST(self):
+            parts, _ = self._route()
+            if parts != ["jobs"]:
+                self._send_error(404, "Not found")
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                # The body cannot be skipped without a usable length; drop the connection after replying.
+                self.close_connection = True
+                self._send_error(400, "Invalid Content-Length")
+                return
+            if length > MAX_BODY_BYTES:
+                self.close_connection = True
+                self._send_error(413, "Request body too large")
+                return
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                job = service.submit(payload)
+            except ValueError as e:
+                self._send_error(400, str(e))
+                return
+            self._send_json(202, job.as_dict())
+
+        def do_GET(self):
+            parts, query = self._route()
+            if parts == ["health"]:
+                self._send_json(200, {"status": "ok", **service.stats()})
+            elif parts == ["metrics"]:
+                self._send_metrics()
+            elif parts == ["jobs"]:
+                status = query.get("status", [None])[0]
+                try:
+                    limit = int(query.get("limit", ["50"])[0])
+                except ValueError:
+                    self._send_error(400, "'limit' must be an integer")
+                    return
+                self._send_json(200, {"jobs": [job.as_dict() for job in service.list(status=status, limit=limit)]})
+            elif len(parts) in (2, 3) and parts[0] == "jobs":
+                job = service.get(parts[1])
+                if job is None:
+                    self._send_error(404, f"Unknown job {parts[1]}")
+                elif len(parts) == 2:
+                    self._send_json(200, job.as_dict())
+                elif parts[2] == "events":
+                    self._stream_events(job)
+                elif parts[2] == "video":
+                    self._send_video(job, query)
+                else:
+                    self._send_error(404, "Not found")
+            else:
+                self._send_error(404, "Not found")
+
+        def _send_metrics(self):
+            body = MetricsRegistry.get().to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream_events(self, job):
+            """Server-sent events: replay the job's history, then follow it until it finishes."""
+            try:
+                last = int(self.headers.get("Last-Event-ID", -1))
+            except ValueError:
+                last = -1
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            try:
+                while True:
+                    events = job.wait_events(last, SSE_KEEPALIVE_SECONDS)
+                    if not events:
+                        if job.done:
+                            return
+                        self.wfile.write(b": keepalive\n\n")
+                    for event in events:
+                        data = json.dumps({**event["data"], "at": event["at"]}, ensure_ascii=False)
+                        self.wfile.write(f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n".encode("utf-8"))
+                        last = event["id"]
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def _send_video(self, job, query):
+            candidates = (job.result or {}).get("candidates") or []
+            try:
+                index = int(query.get("candidate", ["0"])[0])
+            except ValueError:
+                self._send_error(400, "'candidate' must be an integer")
+                return
+            path = candidates[index]["video_path"] if 0 <= index < len(candidates) else None
+            if path is None and index == 0:
+                path = (job.result or {}).get("video_path")
+            if not path or not os.path.exists(path):
+                self._send_error(404, "No video for this job")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Content-Length", str(os.path.getsize(path)))
+            self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(path)}"')
+            self.end_headers()
+            try:
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                        self.wfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class VeoHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def create_server(host="127.0.0.1", port=8765, workers=4, client=None):
+    """
+    Build the local REST service (not yet serving; call `serve_forever()`).
+
+    Endpoints:
+        POST /jobs                  submit {"kind": "generate"|"analyze", "prompt": ..., ...}
+        GET  /jobs[?status=&limit=] list jobs, newest first
+        GET  /jobs/<id>             job status, result and predicted progress (ETA)
+        GET  /jobs/<id>/events      server-sent status, progress (ETA) and log events
+        GET  /jobs/<id>/video       download a generated video (`?candidate=N`)
+        GET  /health                worker and job counts
+        GET  /metrics               stage latency histograms in the Prometheus text format
+    """
+    try:
+        loopback = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = host == "localhost"
+    if not loopback:
+        logger.warning(f"Serving on {host}: the API has no authentication and accepts local file paths.")
+    service = JobService(client=client, workers=workers)
+    server = VeoHTTPServer((host, port), _make_handler(service))
+    server.service = service
+    return server
@@ -0,0 +1,301 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from .config import Config
+from .utils import get_cache_dir, setup_logger
+
+logger = setup_logger("Transcode")
+
+DEFAULT_MAX_WIDTH = 1280
+DEFAULT_MAX_HEIGHT = 720
+DEFAULT_MAX_FPS = 15
+DEFAULT_VIDEO_BITRATE = "1500k"
+DEFAULT_MAX_DURATION = 120
+# Budget of `.cache/transcoded`; least recently used outputs are evicted first.
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+DEFAULT_CACHE_MAX_AGE_DAYS = 30
+
+
+class TranscodeError(RuntimeError):
+    """Raised when a transcoder backend fails to produce an output file."""
+
+
+class TranscodeOptions:
+    """Limits applied to a reference video before it is uploaded for analysis."""
+
+    def __init__(
+        self,
+        max_width=DEFAULT_MAX_WIDTH,
+        max_height=DEFAULT_MAX_HEIGHT,
+        max_fps=DEFAULT_MAX_FPS,
+        video_bitrate=DEFAULT_VIDEO_BITRATE,
+        max_duration=DEFAULT_MAX_DURATION,
+        keep_audio=True,
+    ):
+        self.max_width = max_width
+        self.max_height = max_height
+        self.max_fps = max_fps
+        self.video_bitrate = video_bitrate
+        self.max_duration = max_duration
+        self.keep_audio = keep_audio
+
+    @classmethod
+    def from_settings(cls):
+        """Build options from the `reference_preprocess` section of config.json."""
+        settings = Config.get_setting("reference_preprocess", {})
+        defaults = cls()
+        return cls(
+            max_width=settings.get("max_width", defaults.max_width),
+            max_height=settings.get("max_height", defaults.max_height),
+            max_fps=settings.get("max_fps", defaults.max_fps),
+            video_bitrate=settings.get("video_bitrate", defaults.video_bitrate),
+            max_duration=settings.get("max_duration", defaults.max_duration),
+            keep_audio=settings.get("keep_audio", defaults.keep_audio),
+        )
+
+    def as_dict(self):
+        return {
+            "max_width": self.max_width,
+            "max_height": self.max_height,
+            "max_fps": self.max_fps,
+            "video_bitrate": self.video_bitrate,
+            "max_duration": self.max_duration,
+            "keep_audio": self.keep_audio,
+        }
+
+    def fingerprint(self):
+        """Short hash of the options, so changing a limit produces a new cache entry."""
+        raw = json.dumps(self.as_dict(), sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+
+class Transcoder(ABC):
+    """
+    Backend interface for reference video preprocessing.
+
+    Subclasses implement `available()` and `transcode(src_path, dest_path, options)`;
+    `transcode` must write a complete file to `dest_path` or raise TranscodeError.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def available(self):
+        """True if the backend can run on this machine."""
+
+    @abstractmethod
+    def transcode(self, src_path, dest_path, options):
+        """Write `src_path` limited to `options` to `dest_path`."""
+
+
+class FFmpegTranscoder(Transcoder):
+    """Transcodes with the `ffmpeg` binary found on PATH (or at `binary`)."""
+
+    name = "ffmpeg"
+
+    def __init__(self, binary=None, timeout=600):
+        self.binary = binary or shutil.which("ffmpeg")
+        self.timeout = timeout
+
+    def available(self):
+        return bool(self.binary)
+
+    def build_command(self, src_path, dest_path, options):
+        # Scale down (never up) to fit max_width x max_height, swapping the box for portrait sources
+        # and keeping even dimensions for libx264.
+        long_edge = max(options.max_width, options.max_height)
+        short_edge = min(options.max_width, options.max_height)
+        scale = (
+            f"scale='if(gte(iw,ih),min({long_edge},iw),min({short_edge},iw))'"
+            f":'if(gte(iw,ih),min({short_edge},ih),min({long_edge},ih))'"
+            ":force_original_aspect_ratio=decrease:force_divisible_by=2"
+        )
+        filters = [scale]
+        if options.max_fps:
+            filters.append(f"fps={options.max_fps}")
+
+        command = [self.binary, "-hide_banner", "-loglevel", "error", "-y", "-i", src_path]
+        if options.max_duration:
+            command += ["-t", str(options.max_duration)]
+        command += [
+            "-vf", ",".join(filters),
+            "-c:v", "libx264",
+            "-preset", "veryfast",
+            "-pix_fmt", "yuv420p",
+        ]
+        if options.video_bitrate:
+            command += ["-b:v", str(options.video_bitrate), "-maxrate", str(options.video_bitrate), "-bufsize", str(options.video_bitrate)]
+        if options.keep_audio:
+            command += ["-c:a", "aac", "-b:a", "96k", "-ac", "1"]
+        else:
+            command += ["-an"]
+        command += ["-movflags", "+faststart", "-f", "mp4", dest_path]
+        return command
+
+    def transcode(self, src_path, dest_path, options):
+        command = self.build_command(src_path, dest_path, options)
+        try:
+            completed = subprocess.run(command, capture_output=True, text=True, timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise TranscodeError(f"ffmpeg could not be run: {e}") from e
+        if completed.returncode != 0:
+            raise TranscodeError(f"ffmpeg exited with {completed.returncode}: {completed.stderr.strip()[-500:]}")
+
+
+class StubTranscoder(Transcoder):
+    """
+    Transcoder that copies the source (optionally truncated) instead of re-encoding.
+
+    Used in tests and on machines without ffmpeg when exercising the preprocessing path;
+    every call is recorded in `calls`.
+    """
+
+    name = "stub"
+
+    def __init__(self, output_bytes=None, fail=False):
+        self.output_bytes = output_bytes
+        self.fail = fail
+        self.calls = []
+
+    def available(self):
+        return True
+
+    def transcode(self, src_path, dest_path, options):
+        self.calls.append((src_path, dest_path, options.as_dict()))
+        if self.fail:
+            raise TranscodeError("stub transcoder configured to fail")
+        with open(src_path, "rb") as src, open(dest_path, "wb") as dest:
+            if self.output_bytes is None:
+                shutil.copyfileobj(src, dest)
+            else:
+                dest.write(src.read(self.output_bytes))
+
+
+class ReferencePreprocessor:
+    """
+    Shrinks reference videos before upload and caches the result by source hash.
+
+    Gemini only needs enough resolution and framerate to judge style and pacing, so a
+    4K or ProRes source is transcoded down to the configured limits first. Outputs live
+    in `.cache/transcoded/<source sha256>-<options fingerprint>.mp4`; when the transcoded
+    file would not be smaller than the source, a marker is cached instead and the
+    original is uploaded. Any backend failure also falls back to the original file.
+
+    Like the analysis cache, a hit bumps the file mtime and every new output evicts the
+    least recently used entries beyond `cache_max_bytes`, and anything older than
+    `cache_max_age_days` (both under `reference_preprocess` in config.json).
+    """
+
+    def __init__(self, transcoder=None, options=None, directory=None, enabled=None, max_bytes=None, max_age_days=None):
+        settings = Config.get_setting("reference_preprocess", {})
+        self.enabled = settings.get("enabled", False) if enabled is None else enabled
+        self.transcoder = transcoder or FFmpegTranscoder(binary=settings.get("ffmpeg_path"))
+        self.options = options or TranscodeOptions.from_settings()
+        self.directory = directory or get_cache_dir("transcoded")
+        self.max_bytes = max_bytes or settings.get("cache_max_bytes", DEFAULT_CACHE_MAX_BYTES)
+        self.max_age_days = max_age_days or settings.get("cache_max_age_days", DEFAULT_CACHE_MAX_AGE_DAYS)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._warned_unavailable = False
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def prepare(self, path, source_sha256):
+        """Return the path to upload for `path`: a cached/fresh transcode, or `path` itself."""
+        if not self.enabled:
+            return path
+        if not self.transcoder.available():
+            if not self._warned_unavailable:
+                logger.warning(
+                    f"Reference preprocessing is enabled but the {self.transcoder.name} backend "
+                    "is unavailable; uploading originals."
+                )
+                self._warned_unavailable = True
+            return path
+
+        key = f"{source_sha256}-{self.options.fingerprint()}"
+        output_path = os.path.join(self.directory, f"{key}.mp4")
+        keep_marker = os.path.join(self.directory, f"{key}.original")
+
+        # One transcode per source at a time; concurrent requests for the same video wait and reuse it.
+        with self._key_lock(key):
+            if os.path.exists(output_path):
+                self._touch(output_path)
+                return output_path
+            if os.path.exists(keep_marker):
+                self._touch(keep_marker)
+                return path
+
+            os.makedirs(self.directory, exist_ok=True)
+            part_path = output_path + ".part"
+            try:
+                self.transcoder.transcode(path, part_path, self.options)
+                if not os.path.exists(part_path) or os.path.getsize(part_path) == 0:
+                    raise TranscodeError("transcoder produced no output")
+            except Exception as e:
+                logger.warning(f"Reference preprocessing failed, uploading original: {e}")
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                return path
+
+            source_size = os.path.getsize(path)
+            output_size = os.path.getsize(part_path)
+            if output_size >= source_size:
+                os.remove(part_path)
+                open(keep_marker, "w").close()
+                logger.info("Reference video is already within preprocessing limits; uploading original.")
+                self._evict()
+                return path
+
+            os.replace(part_path, output_path)
+            logger.info(
+                f"Preprocessed reference video with {self.transcoder.name}: "
+                f"{source_size / 1e6:.1f} MB -> {output_size / 1e6:.1f} MB"
+            )
+            self._evict()
+            return output_path
+
+    def _touch(self, path):
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            now = time.time()
+            for name in os.listdir(self.directory):
+                if not name.endswith((".mp4", ".original")):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.max_age_days * 86400:
+                    self._remove(path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            entries.sort()
+            total_bytes = sum(size for _, size, _ in entries)
+            # The newest entry is the one just written for the caller; never evict it.
+            while len(entries) > 1 and total_bytes > self.max_bytes:
+                _, size, path = entries.pop(0)
+                self._remove(path)
+                total_bytes -= size
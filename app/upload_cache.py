@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from .utils import atomic_write_json, file_sha256, get_cache_dir, setup_logger
+
+logger = setup_logger("UploadCache")
+
+# Gemini Files API keeps uploads for 48 hours; used when the server omits expiration_time.
+DEFAULT_FILE_TTL = timedelta(hours=48)
+# Treat entries as expired a little early so a reused file cannot vanish mid-analysis.
+EXPIRY_MARGIN = timedelta(minutes=10)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class UploadCache:
+    """
+    Persistent, content-addressed cache of reference videos uploaded to the Files API.
+
+    Entries are keyed by the SHA-256 of the file contents. A secondary index keyed by
+    (absolute path, size, mtime) lets repeat lookups skip re-hashing unchanged files; it
+    is pruned on every save to paths that still exist and whose upload is still cached
+    (or was hashed by this process, so may be uploading right now).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_cache_dir(), "uploads.json")
+        self._lock = threading.Lock()
+        self._data = None
+        # Paths hashed by this process; their upload may still be in progress.
+        self._hashed = set()
+
+    def _load(self):
+        if self._data is not None:
+            return self._data
+        data = {"files": {}, "paths": {}}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                data["files"] = loaded.get("files") or {}
+                data["paths"] = loaded.get("paths") or {}
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable upload cache {self.path}: {e}")
+        self._data = data
+        return data
+
+    def _prune_paths(self):
+        files = self._data["files"]
+        paths = self._data["paths"]
+        for path, known in list(paths.items()):
+            uploaded = known.get("sha256") in files
+            if not os.path.exists(path) or not (uploaded or path in self._hashed):
+                del paths[path]
+                self._hashed.discard(path)
+
+    def _save(self):
+        self._prune_paths()
+        try:
+            atomic_write_json(self.path, self._data, indent=2)
+        except Exception as e:
+            logger.warning(f"Failed to persist upload cache: {e}")
+
+    def content_hash(self, path):
+        """Return the SHA-256 of `path`, reusing the stored digest if size and mtime are unchanged."""
+        abs_path = os.path.abspath(path)
+        stat = os.stat(abs_path)
+        with self._lock:
+            known = self._load()["paths"].get(abs_path)
+            if known and known.get("size") == stat.st_size and known.get("mtime_ns") == stat.st_mtime_ns:
+                self._hashed.add(abs_path)
+                return known["sha256"]
+
+        sha256 = file_sha256(abs_path)
+        with self._lock:
+            self._load()["paths"][abs_path] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": sha256,
+            }
+            self._hashed.add(abs_path)
+            self._save()
+        return sha256
+
+    def lookup(self, sha256):
+        """Return the cached upload entry for `sha256`, or None if missing or about to expire."""
+        with self._lock:
+            entry = self._load()["files"].get(sha256)
+            if not entry:
+                return None
+            expires_at = _parse_time(entry.get("expiration_time"))
+            if expires_at is None or expires_at - EXPIRY_MARGIN <= _utcnow():
+                self._data["files"].pop(sha256, None)
+                self._save()
+                return None
+            return dict(entry)
+
+    def store(self, sha256, uploaded, strategy=None):
+        """Remember an ACTIVE uploaded file for the given content hash and how it was uploaded."""
+        expires_at = getattr(uploaded, "expiration_time", None)
+        if expires_at is None:
+            expires_at = _utcnow() + DEFAULT_FILE_TTL
+        elif expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+
+        entry = {
+            "name": uploaded.name,
+            "uri": getattr(uploaded, "uri", None),
+            "mime_type": getattr(uploaded, "mime_type", None),
+            "size_bytes": getattr(uploaded, "size_bytes", None),
+            "expiration_time": expires_at.isoformat(),
+            "uploaded_at": _utcnow().isoformat(),
+            "upload_strategy": strategy,
+        }
+        with self._lock:
+            self._load()["files"][sha256] = entry
+            self._save()
+
+    def invalidate(self, sha256):
+        """Forget the upload for `sha256` (e.g. the remote file was deleted or failed)."""
+        with self._lock:
+            if self._load()["files"].pop(sha256, None) is not None:
+                self._save()
@@ -0,0 +1,92 @@
+import mimetypes
+import os
+import shutil
+import tempfile
+
+from .utils import PROJECT_DIR
+
+# Strategies, from cheapest to most expensive.
+DIRECT = "direct"
+HARDLINK = "hardlink"
+SYMLINK = "symlink"
+STREAM = "stream"
+COPY = "copy"
+
+
+class UploadSource:
+    """
+    What to hand to `files.upload` for a reference video, plus how it was prepared.
+
+    `file` is either an ASCII path or an open binary file object; `config` carries the
+    explicit mime type and display name that file-object uploads require.
+    """
+
+    def __init__(self, file, strategy, config=None, temp_dir=None):
+        self.file = file
+        self.strategy = strategy
+        self.config = config
+        self._temp_dir = temp_dir
+
+    def close(self):
+        if hasattr(self.file, "close"):
+            self.file.close()
+        if self._temp_dir:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _is_ascii(path):
+    try:
+        path.encode("ascii")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _make_temp_dir():
+    project_temp_dir = os.path.join(PROJECT_DIR, ".temp")
+    os.makedirs(project_temp_dir, exist_ok=True)
+    return tempfile.mkdtemp(prefix="veo_reference_", dir=project_temp_dir)
+
+
+def prepare_upload_source(path):
+    """
+    Return an UploadSource for `path` that avoids copying the video where possible.
+
+    Non-ASCII paths are tried, in order, as an ASCII-named hardlink, an ASCII-named
+    symlink, and an open file object with an explicit display name. A full copy into
+    `.temp` is only made when none of those work.
+    """
+    if _is_ascii(path):
+        return UploadSource(path, DIRECT)
+
+    _, ext = os.path.splitext(path)
+    if not ext or not _is_ascii(ext):
+        ext = ".mp4"
+    ascii_name = f"reference_video{ext}"
+
+    temp_dir = _make_temp_dir()
+    link_path = os.path.join(temp_dir, ascii_name)
+    if _is_ascii(link_path):
+        for strategy, make_link in ((HARDLINK, os.link), (SYMLINK, os.symlink)):
+            try:
+                make_link(os.path.abspath(path), link_path)
+                return UploadSource(link_path, strategy, temp_dir=temp_dir)
+            except (OSError, NotImplementedError):
+                continue
+
+    mime_type, _ = mimetypes.guess_type(ascii_name)
+    if mime_type:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        stream = open(path, "rb")
+        return UploadSource(stream, STREAM, config={"mime_type": mime_type, "display_name": ascii_name})
+
+    copy_path = os.path.join(temp_dir, ascii_name)
+    shutil.copy2(path, copy_path)
+    return UploadSource(copy_path, COPY, temp_dir=temp_dir)
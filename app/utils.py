@@ -1,5 +1,17 @@
+import hashlib
+import json
 import logging
+import os
 import sys
+import tempfile
+import threading
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loggers created by setup_logger, and handlers attached to all of them (see add_log_handler).
+_app_loggers = {}
+_shared_handlers = []
+_loggers_lock = threading.Lock()
 
 def setup_logger(name="VeoStudio"):
     """Sets up a logger that outputs to the console."""
@@ -14,4 +26,103 @@ def setup_logger(name="VeoStudio"):
     if not logger.handlers:
         logger.addHandler(handler)
 
+    with _loggers_lock:
+        _app_loggers[name] = logger
+        for shared in _shared_handlers:
+            if shared not in logger.handlers:
+                logger.addHandler(shared)
+
     return logger
+
+def add_log_handler(handler):
+    """Attach `handler` to every logger from setup_logger, including ones set up later."""
+    with _loggers_lock:
+        _shared_handlers.append(handler)
+        for logger in _app_loggers.values():
+            logger.addHandler(handler)
+
+def remove_log_handler(handler):
+    """Detach a handler added with add_log_handler."""
+    with _loggers_lock:
+        if handler in _shared_handlers:
+            _shared_handlers.remove(handler)
+        for logger in _app_loggers.values():
+            logger.removeHandler(handler)
+
+def get_cache_dir(*parts):
+    """Return (and create) a directory under the project's `.cache` folder."""
+    path = os.path.join(PROJECT_DIR, ".cache", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def get_data_dir(*parts):
+    """Return (and create) a directory under the project's `.data` folder for persistent state."""
+    path = os.path.join(PROJECT_DIR, ".data", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Compute the SHA-256 hex digest of a file without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def atomic_write_json(path, data, indent=None):
+    """Write JSON to `path` via a temp file + rename so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class BackgroundLoop:
+    """A single asyncio event loop running in a daemon thread, shared by blocking callers."""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        import asyncio
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="VeoStudioLoop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        import asyncio
+
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @classmethod
+    def get(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def submit(self, coro):
+        """Schedule `coro` on the loop and return a concurrent.futures.Future."""
+        import asyncio
+
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro):
+        """Run `coro` on the loop and block the calling thread until it finishes."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("BackgroundLoop.run() cannot be called from the loop thread")
+        return self.submit(coro).result()
+
+def run_coroutine(coro):
+    """Run a coroutine on the shared background loop from synchronous code."""
+    return BackgroundLoop.get().run(coro)
@@ -0,0 +1,264 @@
+"""
+Offline client benchmark against the in-process fake genai backend.
+
+Runs a batch through AsyncVeoClient + BatchRunner with `fake_genai.FakeGenAIClient`
+standing in for the API and measures jobs/minute and API calls per job, then the CPU
+time spent polling a set of operations and the peak traced memory while downloading
+one video in each download mode. Polling delays are scaled down with `--poll-scale`
+so a run takes seconds instead of minutes. Results are written to
+`benchmarks/results/` and can be compared against a previous run:
+
+    python benchmarks/client.py --jobs 40 --concurrency 8
+    python benchmarks/client.py --baseline benchmarks/results/client-20260101-120000.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_DIR, "benchmarks", "results")
+
+# Metrics where a larger value is better; every other metric regresses when it grows.
+HIGHER_IS_BETTER = {"jobs_per_min"}
+
+
+def _setup_environment(poll_scale):
+    # The fake backend never checks the key, but Config and the download headers expect one.
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-dummy-key")
+    os.environ.setdefault("GEMINI_TEXT_MODEL", "gemini-2.5-flash")
+    sys.path.insert(0, PROJECT_DIR)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from app.polling import PollingPolicy
+
+    original = PollingPolicy.from_settings.__func__
+
+    def scaled(cls, kind):
+        policy = original(cls, kind)
+        policy.initial_delay *= poll_scale
+        policy.max_interval *= poll_scale
+        return policy
+
+    PollingPolicy.from_settings = classmethod(scaled)
+
+
+def _make_client(fake, workdir):
+    from app.analysis_cache import AnalysisCache
+    from app.async_veo_client import AsyncVeoClient
+    from app.eta import DurationEstimator
+    from app.job_store import JobStore
+    from app.output_store import OutputStore
+    from app.result_cache import ResultCache
+    from app.routing import ModelRouter
+    from app.transcode import ReferencePreprocessor
+    from app.upload_cache import UploadCache
+
+    # Every store lives in the scratch directory, so a run never touches the project's .cache/.data.
+    return AsyncVeoClient(
+        client=fake,
+        upload_cache=UploadCache(path=os.path.join(workdir, "uploads.json")),
+        analysis_cache=AnalysisCache(directory=os.path.join(workdir, "analysis")),
+        preprocessor=ReferencePreprocessor(directory=os.path.join(workdir, "transcoded")),
+        job_store=JobStore(path=os.path.join(workdir, "jobs.sqlite3")),
+        router=ModelRouter(path=os.path.join(workdir, "model_latency.json")),
+        estimator=DurationEstimator(path=os.path.join(workdir, "stage_durations.json")),
+        result_cache=ResultCache(directory=os.path.join(workdir, "results")),
+        output_store=OutputStore(path=os.path.join(workdir, "outputs.sqlite3"), directory=os.path.join(workdir, "output")),
+    )
+
+
+def _make_jobs(count, reference_ratio, reference_bytes, workdir):
+    jobs = []
+    reference_every = round(1 / reference_ratio) if reference_ratio > 0 else 0
+    for i in range(count):
+        job = {"id": f"bench-{i:04d}", "prompt": f"Benchmark prompt {i}", "aspect_ratio": "16:9", "seed": i}
+        if reference_every and i % reference_every == 0:
+            path = os.path.join(workdir, f"reference_{i:04d}.mp4")
+            with open(path, "wb") as f:
+                # Distinct content per job so the upload and analysis caches do not short-circuit.
+                f.write(i.to_bytes(4, "big") * (reference_bytes // 4))
+            job["reference_video"] = path
+        jobs.append(job)
+    return jobs
+
+
+def run_throughput(args, workdir):
+    """Run a full batch and return jobs/min and API calls per job."""
+    from app.batch import BatchRunner
+    from fake_genai import FakeGenAIClient, FakeSettings
+
+    settings = FakeSettings(
+        call_latency=args.call_latency,
+        generation_seconds=args.generation_seconds,
+        video_size_bytes=args.video_mb * 1024 * 1024,
+        download_mode=args.download_mode,
+        failure_rates={"operations_get": args.failure_rate, "generate_content": args.failure_rate},
+    )
+    fake = FakeGenAIClient(settings)
+    try:
+        client = _make_client(fake, workdir)
+        jobs = _make_jobs(args.jobs, args.reference_ratio, args.reference_mb * 1024 * 1024, workdir)
+        runner = BatchRunner(client, os.path.join(workdir, "manifest.jsonl"), concurrency=args.concurrency)
+
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        summary = asyncio.run(runner.run(jobs))
+        elapsed = time.perf_counter() - started
+        cpu_total = time.process_time() - cpu_started
+        # Write the routing and ETA history now, while the scratch directory still exists.
+        client.router.history.flush()
+        client.estimator.history.flush()
+    finally:
+        fake.close()
+
+    polls = fake.calls["operations_get"] + fake.calls["files_get"]
+    return {
+        "metrics": {
+            "jobs_per_min": summary["succeeded"] * 60.0 / elapsed if elapsed else None,
+            "api_calls_per_job": fake.total_calls / len(jobs) if jobs else None,
+            "polls_per_job": polls / len(jobs) if jobs else None,
+            "process_cpu_ms": cpu_total * 1000,
+        },
+        "summary": {key: value for key, value in summary.items() if key != "stages"},
+        "stages": summary["stages"],
+        "api_calls": dict(fake.calls),
+        "elapsed_s": elapsed,
+    }
+
+
+def run_polling_cpu(args, workdir):
+    """
+    Wait on many operations at once with nothing else running and return the CPU cost of polling.
+
+    Downloads and uploads are left out so process CPU time is dominated by the poller
+    (plus the fake's own negligible bookkeeping).
+    """
+    from app.polling import PollingPolicy
+    from fake_genai import FakeGenAIClient, FakeSettings
+
+    fake = FakeGenAIClient(FakeSettings(call_latency=args.call_latency, generation_seconds=args.generation_seconds, download_mode="inline"))
+    try:
+        client = _make_client(fake, workdir)
+        model = "veo-3.1-generate-preview"
+
+        async def run():
+            operations = [await fake.aio.models.generate_videos(model=model, prompt="poll") for _ in range(args.jobs)]
+            policy = PollingPolicy.for_model(model)
+            await asyncio.gather(*(client.poller.wait_operation(op, policy) for op in operations))
+
+        cpu_started = time.process_time()
+        asyncio.run(run())
+        cpu = time.process_time() - cpu_started
+    finally:
+        fake.close()
+
+    polls = fake.calls["operations_get"]
+    return {
+        "poll_cpu_ms": cpu * 1000,
+        "poll_cpu_us_per_call": cpu * 1e6 / polls if polls else None,
+    }
+
+
+def run_download_memory(args, workdir):
+    """Download one video per download mode and return the peak traced memory of each (MB)."""
+    from fake_genai import DOWNLOAD_MODES, FakeGenAIClient, FakeSettings
+
+    results = {}
+    for mode in DOWNLOAD_MODES:
+        fake = FakeGenAIClient(FakeSettings(call_latency=0, video_size_bytes=args.video_mb * 1024 * 1024, download_mode=mode))
+        try:
+            client = _make_client(fake, workdir)
+            video = fake._video_for(f"operations/download-{mode}")
+            target = os.path.join(workdir, f"download-{mode}.mp4")
+
+            # Inline payloads are allocated before tracing starts; only the copies made while saving count.
+            tracemalloc.start()
+            try:
+                asyncio.run(client._download_video(video, target))
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            results[f"download_peak_mb_{mode}"] = peak / (1024 * 1024)
+        finally:
+            fake.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return regression messages for metrics worse than baseline by more than `tolerance`."""
+    regressions = []
+    for key, value in results["metrics"].items():
+        previous = baseline.get("metrics", {}).get(key)
+        if not previous or value is None:
+            continue
+        if key in HIGHER_IS_BETTER:
+            worse = value < previous * (1 - tolerance)
+        else:
+            worse = value > previous * (1 + tolerance)
+        if worse:
+            regressions.append(f"{key}: {value:.2f} vs baseline {previous:.2f} ({(value / previous - 1) * 100:+.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20, help="Number of batch jobs (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Generation concurrency (default: 8)")
+    parser.add_argument("--reference-ratio", type=float, default=0.5, help="Fraction of jobs with a reference video (default: 0.5)")
+    parser.add_argument("--reference-mb", type=int, default=4, help="Size of each reference video in MB (default: 4)")
+    parser.add_argument("--video-mb", type=int, default=8, help="Size of each generated video in MB (default: 8)")
+    parser.add_argument("--download-mode", choices=("http", "sdk", "inline"), default="http", help="How the fake returns videos (default: http)")
+    parser.add_argument("--generation-seconds", type=float, default=2.0, help="Fake server-side generation time (default: 2.0)")
+    parser.add_argument("--call-latency", type=float, default=0.02, help="Fake per-call latency in seconds (default: 0.02)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Injected failure rate for polling and analysis calls")
+    parser.add_argument("--poll-scale", type=float, default=0.02, help="Multiplier applied to polling delays (default: 0.02)")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression vs baseline (default: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    _setup_environment(args.poll_scale)
+
+    with tempfile.TemporaryDirectory(prefix="veo-bench-") as workdir:
+        throughput = run_throughput(args, workdir)
+        polling = run_polling_cpu(args, workdir)
+        memory = run_download_memory(args, workdir)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "params": vars(args),
+        "metrics": {**throughput["metrics"], **polling, **memory},
+        "summary": throughput["summary"],
+        "stages": throughput["stages"],
+        "api_calls": throughput["api_calls"],
+        "elapsed_s": throughput["elapsed_s"],
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"client-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    for key, value in results["metrics"].items():
+        print(f"{key:<32} {value:10.2f}" if value is not None else f"{key:<32} {'n/a':>10}")
+    print(f"\nResults written to {out_path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nClient regressions detected:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print("\nNo client regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
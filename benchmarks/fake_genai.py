@@ -0,0 +1,316 @@
+"""
+In-process stand-in for the parts of `google.genai.Client` that VeoClient uses.
+
+Covers `aio.files.upload/get/download`, `aio.models.generate_content` (and its
+streaming variant), `aio.models.generate_videos` and `aio.operations.get`, with configurable latency,
+failure rates and payload sizes, so the client can be exercised and benchmarked
+without a network connection or API key:
+
+    fake = FakeGenAIClient(FakeSettings(generation_seconds=2.0, failure_rates={"generate_videos": 0.1}))
+    client = AsyncVeoClient(client=fake)
+
+Generated videos are returned inline (`video_bytes`), through the SDK download path
+(`files.download`) or from a local HTTP server (`uri`), depending on `download_mode`.
+"""
+import asyncio
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DOWNLOAD_MODES = ("http", "sdk", "inline")
+
+ANALYSIS_RESPONSE = {
+    "style_notes": "Handheld tracking shots, warm golden-hour grading, fast cuts on the beat.",
+    "veo_prompt": "A cinematic handheld tracking shot through a busy night market, warm lights, shallow depth of field.",
+    "douyin": {"title": "夜市漫游", "description": "跟着镜头逛一逛", "tags": ["#夜市", "#vlog"]},
+}
+
+
+class FakeAPIError(Exception):
+    """Mimics `google.genai.errors.APIError` closely enough for retry and logging code."""
+
+    def __init__(self, code, status, message):
+        super().__init__(f"{code} {status}. {message}")
+        self.code = code
+        self.status = status
+        self.message = message
+
+
+class FakeSettings:
+    """
+    Behaviour of the fake backend. Latencies are in seconds; `failure_rates` maps a
+    method name (`upload`, `files_get`, `download`, `generate_content`,
+    `generate_videos`, `operations_get`, or `generation` for operations that finish
+    with an error) to a probability.
+    """
+
+    def __init__(
+        self,
+        call_latency=0.02,
+        upload_bytes_per_second=50 * 1024 * 1024,
+        file_processing_seconds=0.5,
+        analysis_seconds=0.3,
+        generation_seconds=2.0,
+        fast_generation_seconds=1.0,
+        video_size_bytes=8 * 1024 * 1024,
+        download_mode="http",
+        failure_rates=None,
+        seed=0,
+    ):
+        if download_mode not in DOWNLOAD_MODES:
+            raise ValueError(f"download_mode must be one of {DOWNLOAD_MODES}")
+        self.call_latency = call_latency
+        self.upload_bytes_per_second = upload_bytes_per_second
+        self.file_processing_seconds = file_processing_seconds
+        self.analysis_seconds = analysis_seconds
+        self.generation_seconds = generation_seconds
+        self.fast_generation_seconds = fast_generation_seconds
+        self.video_size_bytes = video_size_bytes
+        self.download_mode = download_mode
+        self.failure_rates = dict(failure_rates or {})
+        self.seed = seed
+
+
+class FakeObject:
+    """Attribute bag used for files, operations and responses."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __repr__(self):
+        return f"FakeObject({self.__dict__!r})"
+
+
+def _payload_chunks(size, chunk_size=1024 * 1024):
+    """Deterministic video payload, generated chunk by chunk so the server never holds it whole."""
+    block = bytes(range(256)) * (chunk_size // 256)
+    remaining = size
+    while remaining > 0:
+        chunk = block[: min(chunk_size, remaining)]
+        remaining -= len(chunk)
+        yield chunk
+
+
+class FakeVideoServer:
+    """Local HTTP server that streams generated video payloads (with Range support)."""
+
+    def __init__(self, host="127.0.0.1"):
+        self._sizes = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                video_id = self.path.rsplit("/", 1)[-1].split("?", 1)[0]
+                size = server._sizes.get(video_id)
+                if size is None:
+                    self.send_error(404)
+                    return
+                start = 0
+                range_header = self.headers.get("Range")
+                if range_header and range_header.startswith("bytes="):
+                    start = int(range_header[len("bytes="):].split("-", 1)[0] or 0)
+                    if start >= size:
+                        self.send_error(416)
+                        return
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", "video/mp4")
+                self.send_header("Content-Length", str(size - start))
+                self.end_headers()
+                skipped = 0
+                for chunk in _payload_chunks(size):
+                    if skipped + len(chunk) <= start:
+                        skipped += len(chunk)
+                        continue
+                    offset = max(start - skipped, 0)
+                    skipped += len(chunk)
+                    self.wfile.write(chunk[offset:])
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, 0), Handler)
+        self.base_url = f"http://{host}:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="FakeVideoServer", daemon=True)
+        self._thread.start()
+
+    def register(self, video_id, size):
+        self._sizes[video_id] = size
+        return f"{self.base_url}/videos/{video_id}"
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class _FakeFiles:
+    def __init__(self, backend):
+        self._backend = backend
+
+    async def upload(self, file, config=None):
+        backend = self._backend
+        await backend._call("upload")
+        if isinstance(file, (str, os.PathLike)):
+            size = os.path.getsize(file)
+            name = os.path.basename(file)
+        else:
+            size = os.fstat(file.fileno()).st_size
+            name = (config or {}).get("display_name", "upload.mp4")
+        await asyncio.sleep(size / backend.settings.upload_bytes_per_second)
+        file_id = f"files/fake-{next(backend._ids)}"
+        backend._files[file_id] = {"created": time.monotonic(), "size": size, "display_name": name}
+        return backend._file_view(file_id)
+
+    async def get(self, name):
+        backend = self._backend
+        await backend._call("files_get")
+        if name not in backend._files:
+            raise FakeAPIError(404, "NOT_FOUND", f"File {name} not found")
+        return backend._file_view(name)
+
+    async def download(self, file, config=None):
+        backend = self._backend
+        await backend._call("download")
+        return b"".join(_payload_chunks(backend.settings.video_size_bytes))
+
+
+class _FakeModels:
+    def __init__(self, backend):
+        self._backend = backend
+
+    async def generate_content(self, model, contents, config=None):
+        backend = self._backend
+        await backend._call("generate_content")
+        await asyncio.sleep(backend.settings.analysis_seconds)
+        return FakeObject(text=json.dumps(ANALYSIS_RESPONSE, ensure_ascii=False))
+
+    async def generate_content_stream(self, model, contents, config=None):
+        backend = self._backend
+        await backend._call("generate_content")
+        text = json.dumps(ANALYSIS_RESPONSE, ensure_ascii=False)
+        chunk_count = 8
+        chunk_size = -(-len(text) // chunk_count)
+
+        async def chunks():
+            for start in range(0, len(text), chunk_size):
+                await asyncio.sleep(backend.settings.analysis_seconds / chunk_count)
+                yield FakeObject(text=text[start:start + chunk_size])
+
+        return chunks()
+
+    async def generate_videos(self, model, prompt=None, config=None, **kwargs):
+        backend = self._backend
+        await backend._call("generate_videos")
+        duration = backend.settings.fast_generation_seconds if "fast" in (model or "") else backend.settings.generation_seconds
+        operation_id = f"models/{model}/operations/fake-{next(backend._ids)}"
+        backend._operations[operation_id] = {
+            "created": time.monotonic(),
+            "duration": duration,
+            "fails": backend._should_fail("generation"),
+            "count": getattr(config, "number_of_videos", None) or 1,
+        }
+        return FakeObject(name=operation_id, done=False, error=None, result=None, response=None)
+
+
+class _FakeOperations:
+    def __init__(self, backend):
+        self._backend = backend
+
+    async def get(self, operation):
+        backend = self._backend
+        await backend._call("operations_get")
+        state = backend._operations.get(operation.name)
+        if state is None:
+            raise FakeAPIError(404, "NOT_FOUND", f"Operation {operation.name} not found")
+        if time.monotonic() - state["created"] < state["duration"]:
+            return FakeObject(name=operation.name, done=False, error=None, result=None, response=None)
+        if state["fails"]:
+            return FakeObject(
+                name=operation.name,
+                done=True,
+                error={"code": 13, "message": "Fake generation failure"},
+                result=None,
+                response=None,
+            )
+        videos = [backend._video_for(f"{operation.name}-{index}") for index in range(state["count"])]
+        response = FakeObject(generated_videos=[FakeObject(video=video) for video in videos])
+        return FakeObject(name=operation.name, done=True, error=None, result=response, response=response)
+
+
+class _FakeAio:
+    def __init__(self, backend):
+        self.files = _FakeFiles(backend)
+        self.models = _FakeModels(backend)
+        self.operations = _FakeOperations(backend)
+
+    async def aclose(self):
+        pass
+
+
+class FakeGenAIClient:
+    """
+    Drop-in for `genai.Client` in `AsyncVeoClient(client=...)`.
+
+    `calls` counts every API call by method name; `close()` stops the local video
+    server when `download_mode` is "http".
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or FakeSettings()
+        self.calls = Counter()
+        self.aio = _FakeAio(self)
+        self._random = random.Random(self.settings.seed)
+        self._ids = itertools.count(1)
+        self._files = {}
+        self._operations = {}
+        self._server = FakeVideoServer() if self.settings.download_mode == "http" else None
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def _should_fail(self, method):
+        rate = self.settings.failure_rates.get(method, 0.0)
+        return rate > 0 and self._random.random() < rate
+
+    async def _call(self, method):
+        self.calls[method] += 1
+        await asyncio.sleep(self.settings.call_latency)
+        if self._should_fail(method):
+            raise FakeAPIError(503, "UNAVAILABLE", f"Injected failure in {method}")
+
+    def _file_view(self, file_id):
+        entry = self._files[file_id]
+        ready = time.monotonic() - entry["created"] >= self.settings.file_processing_seconds
+        return FakeObject(
+            name=file_id,
+            state="ACTIVE" if ready else "PROCESSING",
+            uri=f"https://fake.invalid/v1beta/{file_id}",
+            mime_type="video/mp4",
+            size_bytes=entry["size"],
+            display_name=entry["display_name"],
+            expiration_time=datetime.now(timezone.utc) + timedelta(hours=48),
+        )
+
+    def _video_for(self, operation_name):
+        size = self.settings.video_size_bytes
+        video_id = operation_name.rsplit("/", 1)[-1]
+        mode = self.settings.download_mode
+        if mode == "inline":
+            return FakeObject(video_bytes=b"".join(_payload_chunks(size)), uri=None, mime_type="video/mp4")
+        if mode == "http":
+            return FakeObject(video_bytes=None, uri=self._server.register(video_id, size), mime_type="video/mp4")
+        return FakeObject(video_bytes=None, uri=f"files/{video_id}", mime_type="video/mp4")
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
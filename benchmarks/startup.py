@@ -0,0 +1,132 @@
+"""
+Startup benchmark for the CLI and GUI entry points.
+
+Measures the import-time profile of `main`, wall-clock time of `main.py --help` and
+`gui.py --check-config`, and time-to-first-window of the GUI. Results are written to
+`benchmarks/results/` and can be compared against a previous run:
+
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --baseline benchmarks/results/startup-20260101-120000.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_DIR, "benchmarks", "results")
+
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _env():
+    env = dict(os.environ)
+    # A dummy key keeps the GUI from blocking on the "Configuration Error" dialog.
+    env.setdefault("GOOGLE_API_KEY", "benchmark-dummy-key")
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+
+def _run(args, env):
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable] + args, cwd=PROJECT_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {completed.returncode}:\n{completed.stderr}")
+    return elapsed_ms, completed
+
+
+def import_profile(module, env, top=15):
+    """Return total import time of `module` and its slowest top-level imports (microseconds)."""
+    _, completed = _run(["-X", "importtime", "-c", f"import {module}"], env)
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({"module": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us), "depth": len(indent) // 2})
+    total = next((e["cumulative_us"] for e in reversed(entries) if e["module"] == module), None)
+    slowest = sorted(entries, key=lambda e: e["cumulative_us"], reverse=True)[:top]
+    return {"total_us": total, "slowest": slowest}
+
+
+def median_wall_ms(args, env, runs):
+    return statistics.median(_run(args, env)[0] for _ in range(runs))
+
+
+def time_to_first_window_ms(env, runs):
+    samples = []
+    for _ in range(runs):
+        _, completed = _run(["gui.py", "--measure-startup"], env)
+        match = re.search(r"time_to_first_window_ms=([\d.]+)", completed.stdout)
+        if not match:
+            raise RuntimeError(f"gui.py did not report a startup time:\n{completed.stdout}")
+        samples.append(float(match.group(1)))
+    return statistics.median(samples)
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages for metrics slower than baseline * (1 + tolerance)."""
+    regressions = []
+    for key, value in results["metrics"].items():
+        previous = baseline.get("metrics", {}).get(key)
+        if previous and value is not None and value > previous * (1 + tolerance):
+            regressions.append(f"{key}: {value:.1f} vs baseline {previous:.1f} (+{(value / previous - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Samples per wall-clock metric (median is reported)")
+    parser.add_argument("--skip-gui", action="store_true", help="Skip the time-to-first-window measurement")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs baseline (default: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    env = _env()
+    profile = import_profile("main", env)
+    metrics = {
+        "import_main_ms": profile["total_us"] / 1000 if profile["total_us"] else None,
+        "cli_help_ms": median_wall_ms(["main.py", "--help"], env, args.runs),
+        "gui_check_config_ms": median_wall_ms(["gui.py", "--check-config"], env, args.runs),
+    }
+    if not args.skip_gui:
+        metrics["gui_time_to_first_window_ms"] = time_to_first_window_ms(env, args.runs)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "metrics": metrics,
+        "import_profile_main": profile["slowest"],
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    for key, value in metrics.items():
+        print(f"{key:<32} {value:10.1f}" if value is not None else f"{key:<32} {'n/a':>10}")
+    print(f"\nResults written to {out_path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nStartup regressions detected:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print("\nNo startup regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,51 @@
+import argparse
 import sys
-from app.gui import VeoStudioWindow
-from PySide6.QtWidgets import QApplication
+import time
+
+_START_TIME = time.perf_counter()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Google Veo Studio desktop GUI")
+    parser.add_argument("--check-config", action="store_true", help="Validate .env configuration and exit without opening a window")
+    parser.add_argument("--measure-startup", action="store_true", help="Print time-to-first-window in milliseconds and exit")
+    return parser.parse_known_args(argv)
 
 def main():
-    app = QApplication(sys.argv)
-    window = VeoStudioWindow()
+    args, qt_args = parse_args()
+
+    if args.check_config:
+        from app.config import Config
+        try:
+            Config.validate()
+        except ValueError as e:
+            print(f"Configuration error: {e}")
+            sys.exit(1)
+        print("Configuration OK")
+        return
+
+    # PySide6 and the window module are only imported once a window is actually needed
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from app.gui import VeoStudioWindow
+
+    app = QApplication([sys.argv[0]] + qt_args)
+    window = VeoStudioWindow(resume_jobs=not args.measure_startup)
     window.show()
-    sys.exit(app.exec())
+
+    if args.measure_startup:
+        def report():
+            elapsed_ms = (time.perf_counter() - _START_TIME) * 1000
+            print(f"time_to_first_window_ms={elapsed_ms:.1f}")
+            app.quit()
+        # Fires once the event loop has processed the initial show/paint events
+        QTimer.singleShot(0, report)
+
+    exit_code = app.exec()
+
+    # Release pooled connections before the interpreter starts tearing down threads
+    from app.client_pool import ClientRegistry
+    ClientRegistry.shutdown()
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
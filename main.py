@@ -1,14 +1,61 @@
+import argparse
+import contextlib
 import sys
 from app.config import Config
-from app.veo_client import VeoClient
 from app.utils import setup_logger
 
 logger = setup_logger("Main")
 
-def main():
-    print("=== Google Veo Video Generation Studio ===")
-    
-    # Validate configuration
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Google Veo Video Generation Studio")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="Run jobs from a JSONL or CSV file without prompting")
+    batch_parser.add_argument("jobs", help="Path to a .jsonl or .csv job file")
+    batch_parser.add_argument("--concurrency", type=int, default=4, help="Maximum number of videos generating at once (default: 4)")
+    batch_parser.add_argument("--upload-concurrency", type=int, default=2, help="Maximum number of reference uploads at once (default: 2)")
+    batch_parser.add_argument("--analysis-concurrency", type=int, default=4, help="Maximum number of Gemini analyses at once (default: 4)")
+    batch_parser.add_argument("--manifest", help="Results manifest path (default: <jobs file>.results.jsonl)")
+    batch_parser.add_argument("--metrics-json", metavar="PATH", help="Write per-stage latency histograms as JSON ('-' for stdout)")
+    batch_parser.add_argument("--metrics-file", metavar="PATH", help="Write per-stage latency histograms in Prometheus text format")
+    batch_parser.add_argument("--metrics-port", type=int, metavar="PORT", help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while the batch runs")
+
+    history_parser = subparsers.add_parser("history", help="Show recent generation jobs")
+    history_parser.add_argument("--limit", type=int, default=20, help="Number of jobs to show (default: 20)")
+
+    serve_parser = subparsers.add_parser("serve", help="Run a local REST API for submitting and following jobs")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    serve_parser.add_argument("--workers", type=int, default=4, help="Maximum number of jobs running at once (default: 4)")
+
+    outputs_parser = subparsers.add_parser("outputs", help="Search the catalog of generated videos")
+    outputs_parser.add_argument("--model", help="Only videos from this model")
+    outputs_parser.add_argument("--aspect-ratio", help="Only videos with this aspect ratio")
+    outputs_parser.add_argument("--seed", type=int, help="Only videos generated with this seed")
+    outputs_parser.add_argument("--prompt", help="Only videos whose prompt contains this text")
+    outputs_parser.add_argument("--sha256", help="Only the video with this content hash")
+    outputs_parser.add_argument("--job", help="Only videos of this job id")
+    outputs_parser.add_argument("--since", type=parse_since, help="Only videos created after this: a duration like 7d / 12h / 30m, or a date (YYYY-MM-DD)")
+    outputs_parser.add_argument("--limit", type=int, default=20, help="Number of videos to show (default: 20)")
+    outputs_parser.add_argument("--json", action="store_true", help="Print full records as JSON lines")
+    outputs_parser.add_argument("--rebuild", action="store_true", help="Re-create the catalog from the sidecar files in output/ first")
+
+    return parser.parse_args(argv)
+
+def parse_since(value):
+    """Turn '7d', '12h', '30m' or 'YYYY-MM-DD' into an epoch timestamp."""
+    import datetime
+    import time
+
+    units = {"d": 86400, "h": 3600, "m": 60}
+    if value[-1:] in units and value[:-1].isdigit():
+        return time.time() - int(value[:-1]) * units[value[-1]]
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d").timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a duration like 7d / 12h / 30m or a YYYY-MM-DD date, got {value!r}")
+
+def validate_config():
     try:
         Config.validate()
     except ValueError as e:
@@ -16,43 +63,284 @@ def main():
         print(f"\nError: {e}")
         print("Please create a .env file with your GOOGLE_API_KEY.")
         sys.exit(1)
-        
+
+def run_batch(args):
+    import asyncio
+    from app.batch import BatchRunner, load_jobs
+    from app.client_pool import ClientRegistry
+    from app.metrics import MetricsRegistry
+    from app.routing import ModelRouter
+    from app.scheduler import RequestScheduler
+    from app.utils import BackgroundLoop
+
+    validate_config()
+
     try:
-        client = VeoClient()
+        jobs = load_jobs(args.jobs)
+    except (OSError, ValueError) as e:
+        print(f"\nError: Failed to load jobs from {args.jobs}: {e}")
+        sys.exit(1)
+
+    manifest_path = args.manifest or f"{args.jobs}.results.jsonl"
+
+    metrics = MetricsRegistry.get()
+    if args.metrics_port:
+        try:
+            metrics.serve_prometheus(args.metrics_port)
+        except OSError as e:
+            print(f"\nError: Cannot serve metrics on port {args.metrics_port}: {e}")
+            sys.exit(1)
+
+    # The pooled client lives on the shared background loop, so the batch runs there too
+    # (at the default batch priority) with the same caches, job store and poller.
+    client = ClientRegistry.get_veo_client().async_client
+
+    async def run():
+        runner = BatchRunner(
+            client,
+            manifest_path,
+            concurrency=args.concurrency,
+            upload_concurrency=args.upload_concurrency,
+            analysis_concurrency=args.analysis_concurrency,
+        )
+        # Finish operations orphaned by a previous crash alongside the new batch.
+        summary, _ = await asyncio.gather(runner.run(jobs), client.resume_pending_jobs())
+        summary["generation_cache"] = client.generation_cache_stats()
+        return summary
+
+    future = BackgroundLoop.get().submit(run())
+    try:
+        summary = future.result()
+    except KeyboardInterrupt:
+        future.cancel()
+        print("\nInterrupted. Completed jobs are recorded in the manifest; re-run to resume.")
+        sys.exit(130)
+    finally:
+        export_metrics(metrics, args)
+        ClientRegistry.shutdown()
+
+    print(
+        f"\nBatch complete: {summary['succeeded']} succeeded, {summary['failed']} failed, "
+        f"{summary['skipped']} skipped. Manifest: {manifest_path}"
+    )
+    cache = summary["generation_cache"]
+    if cache["hits"] or cache["coalesced"]:
+        print(f"  Reused results: {cache['hits']} cache hit(s), {cache['misses']} miss(es), {cache['coalesced']} coalesced duplicate(s)")
+    routing = ModelRouter.get().stats()
+    if routing["hedged"]:
+        print(f"  Hedged {routing['hedged']} slow generation(s); the hedge model won {routing['hedge_wins']}")
+    for key, stats in RequestScheduler.get().stats().items():
+        if stats["retries"]:
+            print(
+                f"  {key}: {stats['rate_limited']} rate-limited, {stats['retries']} retries, "
+                f"{stats['wait_seconds']:.1f}s queued for quota"
+            )
+    for stage, stats in summary["stages"].items():
+        print(
+            f"  {stage:<10} {stats['processed']:>4} processed, {stats['failed']} failed, "
+            f"{stats['busy_seconds']:.1f}s busy, {stats['throughput_per_min']:.1f} jobs/min"
+        )
+    if summary["failed"]:
+        sys.exit(1)
+
+def export_metrics(metrics, args):
+    import json
+
+    if args.metrics_file:
+        metrics.write_prometheus(args.metrics_file)
+    if args.metrics_json == "-":
+        print(json.dumps(metrics.summary(), indent=2))
+    elif args.metrics_json:
+        with open(args.metrics_json, "w", encoding="utf-8") as f:
+            json.dump(metrics.summary(), f, indent=2)
+
+def show_history(args):
+    import datetime
+    from app.job_store import JobStore
+
+    jobs = JobStore().list_jobs(limit=args.limit)
+    if not jobs:
+        print("No jobs recorded yet.")
+        return
+    for job in jobs:
+        created = datetime.datetime.fromtimestamp(job["created_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        outcome = job["video_path"] or job["error"] or ""
+        prompt = (job["params"].get("prompt") or "").replace("\n", " ")
+        if len(prompt) > 60:
+            prompt = prompt[:57] + "..."
+        print(f"{created}  {job['id']}  {job['state']:<11}  {job['model'] or '-'}  {prompt}  {outcome}")
+
+def run_server(args):
+    from app.client_pool import ClientRegistry
+    from app.server import create_server
+    from app.utils import BackgroundLoop
+
+    validate_config()
+
+    try:
+        server = create_server(host=args.host, port=args.port, workers=args.workers)
+    except OSError as e:
+        print(f"\nError: Cannot listen on {args.host}:{args.port}: {e}")
+        sys.exit(1)
+
+    # Finish operations orphaned by a previous crash while serving new requests.
+    BackgroundLoop.get().submit(server.service.client.resume_pending_jobs())
+    print(f"Serving on http://{args.host}:{server.server_address[1]} with {args.workers} worker(s). Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+        server.service.close()
+        ClientRegistry.shutdown()
+
+def show_outputs(args):
+    import datetime
+    import json
+    from app.output_store import OutputStore
+
+    store = OutputStore()
+    if args.rebuild:
+        print(f"Rebuilt catalog from sidecars: {store.rebuild()} video(s).")
+    records = store.query(
+        model=args.model,
+        aspect_ratio=args.aspect_ratio,
+        seed=args.seed,
+        sha256=args.sha256,
+        job_id=args.job,
+        prompt=args.prompt,
+        since=args.since,
+        limit=args.limit,
+    )
+    if not records:
+        print("No matching videos.")
+        return
+    for record in records:
+        if args.json:
+            print(json.dumps(record, ensure_ascii=False))
+            continue
+        created = datetime.datetime.fromtimestamp(record["created_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        size_mb = (record["size_bytes"] or 0) / (1024 * 1024)
+        prompt = (record["prompt"] or "").replace("\n", " ")
+        if len(prompt) > 50:
+            prompt = prompt[:47] + "..."
+        print(
+            f"{created}  {record['model'] or '-'}  {record['aspect_ratio'] or '-'}  "
+            f"seed={record['seed'] if record['seed'] is not None else '-'}  {size_mb:.1f}MB  {record['path']}  {prompt}"
+        )
+
+@contextlib.contextmanager
+def report_progress(progress, interval=15):
+    """Print a progress bar with the predicted time left every `interval` seconds while the block runs."""
+    import threading
+
+    stop = threading.Event()
+
+    def report():
+        while not stop.wait(interval):
+            filled = int(progress.fraction() * 20)
+            print(f"Progress: [{'#' * filled}{'-' * (20 - filled)}] {progress.describe()}")
+
+    thread = threading.Thread(target=report, name="ProgressReporter", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        progress.finish()
+
+def resume_pending(client):
+    results = client.resume_pending_jobs()
+    for result in results:
+        if result["video_path"]:
+            print(f"\nRECOVERED: Job {result['job_id']} video saved at {result['video_path']}")
+        else:
+            print(f"\nFAILED: Could not recover job {result['job_id']}: {result['error']}")
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "batch":
+        run_batch(args)
+        return
+    if args.command == "history":
+        show_history(args)
+        return
+    if args.command == "outputs":
+        show_outputs(args)
+        return
+    if args.command == "serve":
+        run_server(args)
+        return
+
+    print("=== Google Veo Video Generation Studio ===")
+
+    # Validate configuration
+    validate_config()
+
+    from app.client_pool import ClientRegistry
+    from app.eta import JobProgress, format_duration
+
+    try:
+        client = ClientRegistry.get_veo_client()
     except Exception:
         sys.exit(1)
-        
+
+    # Download results of generations interrupted by a previous crash
+    resume_pending(client)
+
     while True:
         print("\n--- New Video Generation Task ---")
         prompt = input("Enter your video prompt (or 'q' to quit): ").strip()
-        
+
         if prompt.lower() == 'q':
             print("Exiting...")
+            ClientRegistry.shutdown()
             break
-            
+
         if not prompt:
             print("Prompt cannot be empty.")
             continue
-            
+
         # Get optional parameters
         print("\nOptional Parameters (press Enter to use default):")
-        
+
         ar_input = input("Aspect Ratio [16:9]: ").strip()
         aspect_ratio = ar_input if ar_input else "16:9"
-        
+
         pg_input = input("Person Generation [allow_adult]: ").strip()
         person_generation = pg_input if pg_input else "allow_adult"
-        
-        print("\nGenerating video... This may take a while.")
-        
-        result_path = client.generate_video(
-            prompt=prompt,
-            aspect_ratio=aspect_ratio,
-            person_generation=person_generation
-        )
-        
-        if result_path:
-            print(f"\nSUCCESS: Video generated at {result_path}")
+
+        nv_input = input("Number of Candidates [1]: ").strip()
+        try:
+            number_of_videos = int(nv_input) if nv_input else 1
+        except ValueError:
+            print("Number of candidates must be a whole number.")
+            continue
+        if not 1 <= number_of_videos <= 4:
+            print("Number of candidates must be between 1 and 4.")
+            continue
+
+        progress = JobProgress.for_job(aspect_ratio=aspect_ratio)
+        print(f"\nGenerating video... Expected to take about {format_duration(progress.remaining_seconds())}.")
+
+        with report_progress(progress):
+            result = client.generate_video_result(
+                prompt=prompt,
+                aspect_ratio=aspect_ratio,
+                person_generation=person_generation,
+                number_of_videos=number_of_videos,
+                progress=progress,
+            )
+
+        if result and result.get("video_path"):
+            candidates = result.get("candidates") or [{"index": 0, "video_path": result["video_path"]}]
+            if len(candidates) == 1:
+                print(f"\nSUCCESS: Video generated at {result['video_path']}")
+            else:
+                print(f"\nSUCCESS: {len(candidates)} candidates generated:")
+                for candidate in candidates:
+                    print(f"  [{candidate['index']}] {candidate['video_path']}")
         else:
             print("\nFAILED: Video generation failed. Check logs for details.")
 
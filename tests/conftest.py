@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+# The fake backend never checks the key, but Config and the download headers expect one.
+os.environ.setdefault("GOOGLE_API_KEY", "test-dummy-key")
+os.environ.setdefault("GEMINI_TEXT_MODEL", "gemini-2.5-flash")
+
+from fake_genai import FakeGenAIClient, FakeSettings  # noqa: E402  (benchmarks/ is on the pytest pythonpath)
+
+
+@pytest.fixture
+def fast_polling(monkeypatch):
+    """Poll operations and files every few milliseconds instead of every few seconds."""
+    from app.polling import PollingPolicy
+
+    def fast(cls, kind):
+        return cls(initial_delay=0.01, multiplier=1.5, max_interval=0.05, jitter=0, deadline=30)
+
+    monkeypatch.setattr(PollingPolicy, "from_settings", classmethod(fast))
+
+
+@pytest.fixture
+def make_fake():
+    """Factory for FakeGenAIClient with near-instant defaults; local video servers are stopped afterwards."""
+    fakes = []
+
+    def make(**settings):
+        params = {
+            "call_latency": 0,
+            "file_processing_seconds": 0.05,
+            "analysis_seconds": 0.01,
+            "generation_seconds": 0.1,
+            "fast_generation_seconds": 0.05,
+            "video_size_bytes": 64 * 1024,
+            "download_mode": "inline",
+        }
+        params.update(settings)
+        fake = FakeGenAIClient(FakeSettings(**params))
+        fakes.append(fake)
+        return fake
+
+    yield make
+    for fake in fakes:
+        fake.close()
+
+
+@pytest.fixture
+def make_client(tmp_path, fast_polling):
+    """Factory for AsyncVeoClient on a fake backend, with every store in the test's scratch directory."""
+    from app.analysis_cache import AnalysisCache
+    from app.async_veo_client import AsyncVeoClient
+    from app.eta import DurationEstimator
+    from app.job_store import JobStore
+    from app.output_store import OutputStore
+    from app.result_cache import ResultCache
+    from app.routing import ModelRouter
+    from app.transcode import ReferencePreprocessor
+    from app.upload_cache import UploadCache
+
+    clients = []
+
+    def make(fake, router=None):
+        client = AsyncVeoClient(
+            client=fake,
+            upload_cache=UploadCache(path=str(tmp_path / "uploads.json")),
+            analysis_cache=AnalysisCache(directory=str(tmp_path / "analysis")),
+            preprocessor=ReferencePreprocessor(directory=str(tmp_path / "transcoded"), enabled=False),
+            job_store=JobStore(path=str(tmp_path / "jobs.sqlite3")),
+            router=router or ModelRouter(settings={}, path=str(tmp_path / "model_latency.json")),
+            estimator=DurationEstimator(path=str(tmp_path / "stage_durations.json")),
+            result_cache=ResultCache(directory=str(tmp_path / "results")),
+            output_store=OutputStore(path=str(tmp_path / "outputs.sqlite3"), directory=str(tmp_path / "output")),
+        )
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.job_store.close()
+        client.output_store.close()
+
+
+@pytest.fixture
+def reference_video(tmp_path):
+    path = tmp_path / "reference.mp4"
+    path.write_bytes(os.urandom(32 * 1024))
+    return str(path)
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import os
+import time
+
+from app.analysis_cache import AnalysisCache
+
+ANALYSIS = {"style_notes": "", "veo_prompt": "A prompt", "douyin": {"title": "", "description": "", "tags": []}}
+
+
+def test_key_covers_every_request_field():
+    base = ("a" * 64, "prompt", "zh", "gemini", "b" * 64)
+    keys = {AnalysisCache.make_key(*base)}
+    for index, value in enumerate(("c" * 64, "other prompt", "en", "gemini-pro", "d" * 64)):
+        changed = list(base)
+        changed[index] = value
+        keys.add(AnalysisCache.make_key(*changed))
+    assert len(keys) == 6
+    assert AnalysisCache.make_key(*base) == AnalysisCache.make_key(*base)
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = AnalysisCache(directory=str(tmp_path), max_entries=2)
+    cache.put("old", ANALYSIS)
+    cache.put("used", ANALYSIS)
+    # Make "used" the older file, then hit it so it becomes the most recent again.
+    past = time.time() - 60
+    os.utime(cache._entry_path("used"), (past, past))
+    os.utime(cache._entry_path("old"), (past + 1, past + 1))
+    assert cache.get("used") == ANALYSIS
+
+    cache.put("new", ANALYSIS)
+    assert cache.get("old") is None
+    assert cache.get("used") == ANALYSIS
+    assert cache.get("new") == ANALYSIS
+
+
+def test_entries_over_max_bytes_are_evicted(tmp_path):
+    probe = AnalysisCache(directory=str(tmp_path / "probe"))
+    probe.put("probe", ANALYSIS)
+    entry_size = os.path.getsize(probe._entry_path("probe"))
+
+    cache = AnalysisCache(directory=str(tmp_path / "cache"), max_bytes=entry_size * 3 // 2)
+    cache.put("first", ANALYSIS)
+    time.sleep(0.01)
+    cache.put("second", ANALYSIS)
+    assert cache.get("first") is None
+    assert cache.get("second") == ANALYSIS
+
+
+def test_expired_entry_is_not_served(tmp_path):
+    cache = AnalysisCache(directory=str(tmp_path), max_age_days=1)
+    cache.put("key", ANALYSIS)
+    entry_path = cache._entry_path("key")
+    with open(entry_path, "r", encoding="utf-8") as f:
+        entry = json.load(f)
+    entry["created_at"] -= 2 * 86400
+    with open(entry_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+
+    assert cache.get("key") is None
+    assert not os.path.exists(entry_path)
+
+
+def test_client_serves_repeat_analysis_from_cache(make_fake, make_client, reference_video):
+    fake = make_fake()
+    client = make_client(fake)
+
+    async def analyze_twice():
+        first = await client.analyze_reference_video(reference_video, user_prompt="night market")
+        second = await client.analyze_reference_video(reference_video, user_prompt="night market")
+        return first, second
+
+    first, second = asyncio.run(analyze_twice())
+    assert first == second
+    assert fake.calls["generate_content"] == 1
+    assert fake.calls["upload"] == 1
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+from app.analysis_output import StreamingFieldParser, extract_json, validate_analysis
+from fake_genai import ANALYSIS_RESPONSE, FakeObject
+
+ANALYSIS_TEXT = json.dumps(ANALYSIS_RESPONSE, ensure_ascii=False)
+
+
+def test_extract_json_accepts_bare_fenced_and_embedded_objects():
+    assert extract_json(ANALYSIS_TEXT) == ANALYSIS_RESPONSE
+    assert extract_json(f"```json\n{ANALYSIS_TEXT}\n```") == ANALYSIS_RESPONSE
+    assert extract_json(f"Here you go: {ANALYSIS_TEXT} Anything else?") == ANALYSIS_RESPONSE
+
+
+def test_extract_json_takes_first_object_not_greedy_span():
+    text = 'First {"veo_prompt": "a"} and then {"veo_prompt": "b"}'
+    assert extract_json(text) == {"veo_prompt": "a"}
+    # A brace inside prose before the object is skipped.
+    assert extract_json('Use {braces} carefully: {"veo_prompt": "c"}') == {"veo_prompt": "c"}
+
+
+@pytest.mark.parametrize("text", ["", "no json here", "{not: json}"])
+def test_extract_json_rejects_unparseable_text(text):
+    with pytest.raises(ValueError):
+        extract_json(text)
+
+
+def test_validate_analysis_requires_veo_prompt():
+    assert validate_analysis(ANALYSIS_RESPONSE) is ANALYSIS_RESPONSE
+    for data in ({"veo_prompt": "  "}, {"style_notes": "x"}, ["veo_prompt"]):
+        with pytest.raises(ValueError):
+            validate_analysis(data)
+
+
+def test_streaming_parser_reports_fields_as_soon_as_complete():
+    parser = StreamingFieldParser()
+    seen = []
+    # One character at a time, so every string, escape and nesting boundary is split.
+    for index, char in enumerate(ANALYSIS_TEXT):
+        for key, value in parser.feed(char):
+            seen.append((key, value, index))
+
+    assert [(key, value) for key, value, _ in seen] == [
+        ("style_notes", ANALYSIS_RESPONSE["style_notes"]),
+        ("veo_prompt", ANALYSIS_RESPONSE["veo_prompt"]),
+    ]
+    # veo_prompt was known well before the douyin copy finished streaming.
+    assert seen[-1][2] < ANALYSIS_TEXT.index('"douyin"')
+    assert parser.result() == ANALYSIS_RESPONSE
+
+
+def test_streaming_parser_handles_escapes_and_nested_strings():
+    parser = StreamingFieldParser()
+    text = '{"meta": {"veo_prompt": "nested"}, "veo_prompt": "say \\"hi\\" \\\\ {x}", "tags": ["a", "b"]}'
+    completed = []
+    for start in range(0, len(text), 5):
+        completed.extend(parser.feed(text[start:start + 5]))
+    assert completed == [("veo_prompt", 'say "hi" \\ {x}')]
+
+
+def test_client_emits_veo_prompt_before_analysis_finishes(make_fake, make_client, reference_video):
+    fake = make_fake(analysis_seconds=0.2)
+    client = make_client(fake)
+    events = []
+
+    async def analyze():
+        analysis = await client.analyze_reference_video(
+            reference_video, on_veo_prompt=lambda prompt: events.append(("veo_prompt", prompt))
+        )
+        events.append(("done", analysis["veo_prompt"]))
+
+    asyncio.run(analyze())
+    assert events == [("veo_prompt", ANALYSIS_RESPONSE["veo_prompt"]), ("done", ANALYSIS_RESPONSE["veo_prompt"])]
+
+
+def test_client_repairs_malformed_analysis_without_reuploading(make_fake, make_client, reference_video, monkeypatch):
+    fake = make_fake()
+    client = make_client(fake)
+    original = fake.aio.models.generate_content
+
+    async def generate_content(**kwargs):
+        response = await original(**kwargs)
+        if fake.calls["generate_content"] == 1:
+            # Truncated output: not valid JSON, so it must be repaired.
+            return FakeObject(text=response.text[:-20])
+        return response
+
+    monkeypatch.setattr(fake.aio.models, "generate_content", generate_content)
+    analysis = asyncio.run(client.analyze_reference_video(reference_video))
+
+    assert analysis == ANALYSIS_RESPONSE
+    assert fake.calls["generate_content"] == 2
+    assert fake.calls["upload"] == 1
@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+import pytest
+
+
+def test_identical_concurrent_requests_share_one_operation(make_fake, make_client):
+    fake = make_fake()
+    client = make_client(fake)
+
+    async def run():
+        return await asyncio.gather(*(client.generate_video_result("A prompt", model="veo-test") for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert fake.calls["generate_videos"] == 1
+    assert client.coalesced_requests == 2
+    assert len({result["video_path"] for result in results}) == 1
+    # Each caller gets its own copy of the result.
+    results[0]["video_path"] = None
+    assert results[1]["video_path"]
+
+
+def test_different_requests_are_not_coalesced(make_fake, make_client):
+    fake = make_fake()
+    client = make_client(fake)
+
+    async def run():
+        return await asyncio.gather(
+            client.generate_video_result("A prompt", model="veo-test", seed=1),
+            client.generate_video_result("A prompt", model="veo-test", seed=2),
+        )
+
+    first, second = asyncio.run(run())
+    assert fake.calls["generate_videos"] == 2
+    assert client.coalesced_requests == 0
+    assert first["video_path"] != second["video_path"]
+
+
+def test_coalesced_caller_cancelling_does_not_cancel_the_others(make_fake, make_client):
+    fake = make_fake(generation_seconds=0.2)
+    client = make_client(fake)
+
+    async def run():
+        kept = asyncio.ensure_future(client.generate_video_result("A prompt", model="veo-test"))
+        dropped = asyncio.ensure_future(client.generate_video_result("A prompt", model="veo-test"))
+        await asyncio.sleep(0.05)
+        dropped.cancel()
+        return await kept
+
+    assert os.path.exists(asyncio.run(run())["video_path"])
+    assert fake.calls["generate_videos"] == 1
+
+
+def test_seeded_result_is_served_from_result_cache(make_fake, make_client):
+    fake = make_fake()
+    client = make_client(fake)
+    client.result_cache.enabled = True
+
+    first = asyncio.run(client.generate_video_result("A prompt", model="veo-test", seed=7))
+    second = asyncio.run(client.generate_video_result("A  prompt ", model="veo-test", seed=7))
+    unseeded = asyncio.run(client.generate_video_result("A prompt", model="veo-test"))
+
+    assert fake.calls["generate_videos"] == 2
+    assert second["cached"] is True and not unseeded.get("cached")
+    assert second["sha256"] == first["sha256"]
+    assert os.path.exists(second["video_path"])
+
+
+def test_every_candidate_is_saved_and_catalogued(make_fake, make_client):
+    fake = make_fake(download_mode="sdk")
+    client = make_client(fake)
+
+    result = asyncio.run(client.generate_video_result("A prompt", model="veo-test", number_of_videos=3))
+
+    paths = [candidate["video_path"] for candidate in result["candidates"]]
+    assert len(set(paths)) == 3 and all(os.path.exists(path) for path in paths)
+    assert fake.calls["download"] == 3
+    records = client.output_store.query(job_id=result["job_id"])
+    assert sorted(record["candidate"] for record in records) == [0, 1, 2]
+    assert {record["prompt"] for record in records} == {"A prompt"}
+
+
+def test_failed_operation_fails_the_job(make_fake, make_client):
+    fake = make_fake(failure_rates={"generation": 1.0})
+    client = make_client(fake)
+
+    with pytest.raises(RuntimeError, match="Fake generation failure"):
+        asyncio.run(client.generate_video_result("A prompt", model="veo-test"))
+
+    [job] = client.job_store.list_jobs()
+    assert job["state"] == "failed"
+    assert client.router.stats()["models"]["veo-test"]["failure_rate"] == 1
@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from app.download import DownloadError, stream_download  # noqa: E402
+from fake_genai import FakeVideoServer, _payload_chunks  # noqa: E402
+
+SIZE = 3 * 1024 * 1024 + 123
+
+
+@pytest.fixture
+def video_server():
+    server = FakeVideoServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Every request the download client sends, as (url, headers)."""
+    requests = []
+    original = httpx.AsyncClient.send
+
+    async def send(self, request, **kwargs):
+        requests.append((str(request.url), dict(request.headers)))
+        return await original(self, request, **kwargs)
+
+    monkeypatch.setattr(httpx.AsyncClient, "send", send)
+    return requests
+
+
+async def no_sleep(delay, result=None):
+    return result
+
+
+def payload(size):
+    return b"".join(_payload_chunks(size))
+
+
+def test_download_is_streamed_into_place(tmp_path, video_server):
+    dest = str(tmp_path / "video.mp4")
+    result = asyncio.run(stream_download(video_server.register("full", SIZE), dest))
+
+    data = payload(SIZE)
+    assert result == {"path": dest, "sha256": hashlib.sha256(data).hexdigest(), "size_bytes": SIZE}
+    with open(dest, "rb") as f:
+        assert f.read() == data
+    assert not (tmp_path / "video.mp4.part").exists()
+
+
+def test_partial_download_resumes_with_range(tmp_path, video_server, sent):
+    dest = tmp_path / "video.mp4"
+    data = payload(SIZE)
+    offset = 1024 * 1024 + 7
+    (tmp_path / "video.mp4.part").write_bytes(data[:offset])
+
+    result = asyncio.run(stream_download(video_server.register("resume", SIZE), str(dest)))
+
+    assert [headers.get("range") for _, headers in sent] == [f"bytes={offset}-"]
+    assert result["sha256"] == hashlib.sha256(data).hexdigest()
+    assert result["size_bytes"] == SIZE
+    assert dest.read_bytes() == data
+
+
+def test_unsatisfiable_range_restarts_download(tmp_path, video_server, monkeypatch):
+    # The remote object is shorter than what we have: the partial file cannot be resumed.
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+    (tmp_path / "video.mp4.part").write_bytes(b"\0" * 2048)
+
+    result = asyncio.run(stream_download(video_server.register("short", 1024), str(tmp_path / "video.mp4")))
+    assert result["size_bytes"] == 1024
+    assert (tmp_path / "video.mp4").read_bytes() == payload(1024)
+
+
+def test_missing_video_fails_without_retrying(tmp_path, video_server, sent):
+    with pytest.raises(DownloadError):
+        asyncio.run(stream_download(f"{video_server.base_url}/videos/unknown", str(tmp_path / "video.mp4")))
+    assert len(sent) == 1
+
+
+class RedirectServer:
+    """API host that redirects every request to `target`."""
+
+    def __init__(self, target):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(302)
+                self.send_header("Location", target)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/download"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def test_credentials_are_not_sent_to_another_host(tmp_path, video_server, sent):
+    dest = tmp_path / "video.mp4"
+    offset = 4096
+    (tmp_path / "video.mp4.part").write_bytes(payload(SIZE)[:offset])
+    redirect = RedirectServer(video_server.register("redirected", SIZE))
+    try:
+        result = asyncio.run(stream_download(redirect.url, str(dest), headers={"x-goog-api-key": "secret"}))
+    finally:
+        redirect.close()
+
+    (api_url, api_headers), (storage_url, storage_headers) = sent
+    assert api_url == redirect.url and api_headers["x-goog-api-key"] == "secret"
+    assert storage_url.startswith(video_server.base_url)
+    assert "x-goog-api-key" not in storage_headers
+    # The Range header is not a credential and must survive the redirect.
+    assert storage_headers["range"] == f"bytes={offset}-"
+    assert result["size_bytes"] == SIZE
+
+
+def test_client_streams_http_videos_to_disk(make_fake, make_client):
+    fake = make_fake(download_mode="http", video_size_bytes=SIZE)
+    client = make_client(fake)
+
+    result = asyncio.run(client.generate_video_result("A prompt", model="veo-test"))
+
+    with open(result["video_path"], "rb") as f:
+        assert hashlib.sha256(f.read()).hexdigest() == result["sha256"]
+    assert result["size_bytes"] == SIZE
+    assert fake.calls["download"] == 0
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import app.job_store
+from app.job_store import FAILED, RUNNING, SUCCEEDED, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(path=str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def other(tmp_path):
+    """A second process sharing the same store."""
+    store = JobStore(path=str(tmp_path / "jobs.sqlite3"))
+    store.owner = f"{app.job_store.HOST}:other"
+    yield store
+    store.close()
+
+
+def set_owner(store, job_id, owner=None, seen_at=None):
+    with store._conn:
+        store._conn.execute("UPDATE jobs SET owner = ?, owner_seen_at = ? WHERE id = ?", (owner, seen_at, job_id))
+
+
+def test_live_owner_keeps_its_job(store, other):
+    job_id = store.create_job("generate", "veo-test", {"prompt": "p"})
+    [job] = other.list_unfinished()
+    assert job["id"] == job_id
+    assert not other.claim(job)
+    assert store.get_job(job_id)["owner"] == store.owner
+
+
+def test_expired_lease_is_claimed_once(store, other, tmp_path):
+    job_id = store.create_job("generate", "veo-test", {"prompt": "p"})
+    store.update_state(job_id, RUNNING, operation_name="operations/1")
+    set_owner(store, job_id, "remote-host:1234", time.time() - app.job_store.LEASE_SECONDS - 1)
+
+    third = JobStore(path=str(tmp_path / "jobs.sqlite3"))
+    third.owner = f"{app.job_store.HOST}:third"
+    try:
+        [seen_by_other] = other.list_unfinished()
+        [seen_by_third] = third.list_unfinished()
+        # Both saw the expired lease; the compare-and-set lets only the first take it.
+        assert other.claim(seen_by_other)
+        assert not third.claim(seen_by_third)
+    finally:
+        third.close()
+    assert store.get_job(job_id)["owner"] == other.owner
+
+
+@pytest.mark.skipif(os.name != "posix", reason="crashed owners are detected by pid on POSIX only")
+def test_dead_local_owner_is_claimable_before_lease_expires(store, other):
+    job_id = store.create_job("generate", "veo-test", {"prompt": "p"})
+    # Same host, a pid that cannot exist: detected as crashed without waiting for the lease.
+    set_owner(store, job_id, f"{app.job_store.HOST}:999999999", time.time())
+    [job] = other.list_unfinished()
+    assert other.claim(job)
+
+
+def test_finished_job_is_not_claimed(store, other):
+    job_id = store.create_job("generate", "veo-test", {"prompt": "p"})
+    set_owner(store, job_id)
+    [job] = other.list_unfinished()
+    store.update_state(job_id, SUCCEEDED, video_path="out.mp4")
+    assert not other.claim(job)
+    assert other.list_unfinished() == []
+
+
+def test_state_changes_are_recorded_as_events(store):
+    job_id = store.create_job("generate", "veo-test", {"prompt": "p"})
+    store.update_state(job_id, RUNNING, operation_name="operations/1")
+    store.update_state(job_id, FAILED, detail="boom", error="boom")
+    assert [event["state"] for event in store.get_events(job_id)] == ["submitting", RUNNING, FAILED]
+    assert store.get_job(job_id)["error"] == "boom"
+    with pytest.raises(ValueError):
+        store.update_state(job_id, FAILED, unknown="x")
+
+
+def test_client_resumes_operation_left_by_exited_process(make_fake, make_client, tmp_path):
+    fake = make_fake(generation_seconds=0.05)
+    client = make_client(fake)
+
+    async def submit():
+        return await fake.aio.models.generate_videos(model="veo-test", prompt="p")
+
+    operation = asyncio.run(submit())
+    exited = JobStore(path=client.job_store.path)
+    job_id = exited.create_job("generate", "veo-test", {"prompt": "p", "aspect_ratio": "16:9"})
+    exited.update_state(job_id, RUNNING, operation_name=operation.name)
+    exited.close()
+    set_owner(client.job_store, job_id, "remote-host:1234", time.time() - app.job_store.LEASE_SECONDS - 1)
+
+    [resumed] = asyncio.run(client.resume_pending_jobs())
+    assert resumed["job_id"] == job_id
+    assert resumed["error"] is None
+    assert client.job_store.get_job(job_id)["state"] == SUCCEEDED
+    assert fake.calls["generate_videos"] == 1
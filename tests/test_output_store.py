@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.output_store import OutputStore, candidate_path, sidecar_path
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OutputStore(path=str(tmp_path / "outputs.sqlite3"), directory=str(tmp_path / "output"))
+    yield store
+    store.close()
+
+
+def save_video(store, job_id, candidate=0, count=1, **fields):
+    path = candidate_path(store.video_path(job_id), candidate, count)
+    with open(path, "wb") as f:
+        f.write(job_id.encode("utf-8"))
+    return store.record(path, job_id, candidate=candidate, **fields)
+
+
+def test_records_are_queryable_by_every_index(store):
+    save_video(store, "job-a", model="veo-fast", aspect_ratio="16:9", seed=1, prompt="A cat on a 50% discount", created_at=100)
+    save_video(store, "job-b", model="veo-slow", aspect_ratio="9:16", seed=2, prompt="A dog", created_at=200)
+
+    assert [r["job_id"] for r in store.query()] == ["job-b", "job-a"]
+    assert [r["job_id"] for r in store.query(model="veo-fast")] == ["job-a"]
+    assert [r["job_id"] for r in store.query(aspect_ratio="9:16")] == ["job-b"]
+    assert [r["job_id"] for r in store.query(seed=1)] == ["job-a"]
+    assert [r["job_id"] for r in store.query(since=150)] == ["job-b"]
+    assert [r["job_id"] for r in store.query(prompt="50%")] == ["job-a"]
+    assert store.query(prompt="5_%") == []
+
+
+def test_rebuild_restores_catalog_from_sidecars(store, tmp_path):
+    save_video(store, "job-a", 0, 2, model="veo-fast", analysis={"veo_prompt": "p"})
+    save_video(store, "job-a", 1, 2, model="veo-fast")
+    save_video(store, "job-b", model="veo-slow")
+    # A video deleted by hand drops out; a video outside the output directory is kept.
+    os.remove(store.video_path("job-b"))
+    outside = tmp_path / "elsewhere.mp4"
+    outside.write_bytes(b"x")
+    store.record(str(outside), "job-c")
+
+    with store._lock, store._conn:
+        store._conn.execute("DELETE FROM outputs WHERE job_id = 'job-a'")
+    assert store.rebuild() == 2
+
+    records = store.query(limit=None)
+    assert sorted((r["job_id"], r["candidate"]) for r in records) == [("job-a", 0), ("job-a", 1), ("job-c", 0)]
+    [first] = [r for r in records if r["job_id"] == "job-a" and r["candidate"] == 0]
+    assert first["analysis"] == {"veo_prompt": "p"}
+
+
+def test_rebuild_finds_videos_when_sidecar_paths_are_relative_to_another_directory(store, tmp_path):
+    record = save_video(store, "job-a")
+    stale = dict(record, path=os.path.join("some", "other", "cwd", os.path.basename(record["path"])))
+    with open(sidecar_path(record["path"]), "w", encoding="utf-8") as f:
+        json.dump(stale, f)
+
+    assert store.rebuild() == 1
+    [rebuilt] = store.query()
+    assert rebuilt["path"] == record["path"]
+
+
+def test_annotate_updates_sidecar_and_catalog(store):
+    save_video(store, "job-a")
+    store.annotate("job-a", analysis={"veo_prompt": "p"})
+    assert store.query(job_id="job-a")[0]["analysis"] == {"veo_prompt": "p"}
+    assert store.rebuild() == 1
+    assert store.query(job_id="job-a")[0]["analysis"] == {"veo_prompt": "p"}
+    with pytest.raises(ValueError):
+        store.annotate("job-a", unknown=1)
+
+
+def test_client_outputs_survive_a_catalog_rebuild(make_fake, make_client):
+    fake = make_fake()
+    client = make_client(fake)
+    result = asyncio.run(client.generate_video_result("A prompt", model="veo-test", seed=3))
+
+    with client.output_store._lock, client.output_store._conn:
+        client.output_store._conn.execute("DELETE FROM outputs")
+    assert client.output_store.rebuild() == 1
+    [record] = client.output_store.query(seed=3)
+    assert record["path"] == result["video_path"]
+    assert record["sha256"] == result["sha256"]
+    assert record["model"] == "veo-test"
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+
+from app.polling import OperationPoller, PollingPolicy, PollingTimeoutError
+from fake_genai import FakeAPIError, FakeObject
+
+
+def quick_policy(**overrides):
+    params = {"initial_delay": 0.01, "multiplier": 2, "max_interval": 0.05, "jitter": 0, "deadline": 5}
+    params.update(overrides)
+    return PollingPolicy(**params)
+
+
+def test_delay_backs_off_up_to_max_interval():
+    policy = PollingPolicy(initial_delay=1, multiplier=2, max_interval=5, jitter=0)
+    assert [policy.delay(attempt) for attempt in range(5)] == [1, 2, 4, 5, 5]
+
+    jittered = PollingPolicy(initial_delay=10, multiplier=1, max_interval=10, jitter=0.2)
+    assert all(8 <= jittered.delay(0) <= 12 for _ in range(50))
+
+
+def test_waits_until_operation_is_done(make_fake):
+    fake = make_fake(generation_seconds=0.1)
+    poller = OperationPoller(fake)
+
+    async def generate():
+        operation = await fake.aio.models.generate_videos(model="veo-test", prompt="p")
+        started = time.monotonic()
+        return await poller.wait_operation(operation, quick_policy()), time.monotonic() - started
+
+    operation, elapsed = asyncio.run(generate())
+    assert operation.done and operation.error is None
+    assert elapsed >= 0.05
+    assert fake.calls["operations_get"] == poller.api_calls >= 2
+
+
+def test_deadline_raises_polling_timeout(make_fake):
+    fake = make_fake(generation_seconds=10)
+    poller = OperationPoller(fake)
+
+    async def generate():
+        operation = await fake.aio.models.generate_videos(model="veo-test", prompt="p")
+        await poller.wait_operation(operation, quick_policy(deadline=0.1))
+
+    with pytest.raises(PollingTimeoutError):
+        asyncio.run(generate())
+
+
+def test_rate_limited_polls_wait_for_retry_after_without_failing(make_fake, monkeypatch):
+    fake = make_fake(generation_seconds=0.05)
+    original_get = fake.aio.operations.get
+    rate_limited = []
+
+    async def get(operation):
+        if len(rate_limited) < 3:
+            rate_limited.append(time.monotonic())
+            error = FakeAPIError(429, "RESOURCE_EXHAUSTED", "Quota exceeded")
+            error.response = FakeObject(headers={"retry-after": "0.1"})
+            raise error
+        return await original_get(operation)
+
+    monkeypatch.setattr(fake.aio.operations, "get", get)
+    poller = OperationPoller(fake)
+
+    async def generate():
+        operation = await fake.aio.models.generate_videos(model="veo-test", prompt="p")
+        # Rate limits are not counted against max_consecutive_errors.
+        return await poller.wait_operation(operation, quick_policy(max_consecutive_errors=1))
+
+    assert asyncio.run(generate()).done
+    assert len(rate_limited) == 3
+    assert all(later - earlier >= 0.09 for earlier, later in zip(rate_limited, rate_limited[1:]))
+
+
+def test_repeated_errors_fail_the_waiter(make_fake, monkeypatch):
+    fake = make_fake()
+
+    async def get(operation):
+        raise FakeAPIError(500, "INTERNAL", "boom")
+
+    monkeypatch.setattr(fake.aio.operations, "get", get)
+    poller = OperationPoller(fake)
+
+    async def generate():
+        operation = await fake.aio.models.generate_videos(model="veo-test", prompt="p")
+        await poller.wait_operation(operation, quick_policy(max_consecutive_errors=3))
+
+    with pytest.raises(FakeAPIError):
+        asyncio.run(generate())
+    assert poller.api_calls == 3
+
+
+def test_waits_for_uploaded_file_to_become_active(make_fake, reference_video):
+    fake = make_fake(file_processing_seconds=0.1)
+    poller = OperationPoller(fake)
+
+    async def upload():
+        uploaded = await fake.aio.files.upload(file=reference_video)
+        assert uploaded.state == "PROCESSING"
+        return await poller.wait_file(uploaded, quick_policy())
+
+    assert asyncio.run(upload()).state == "ACTIVE"
+    assert fake.calls["files_get"] >= 1
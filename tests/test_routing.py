@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+from app.routing import CURRENT_MODEL, FASTEST_HEALTHY, ModelRouter
+from app.scheduler import BATCH, INTERACTIVE, with_priority
+
+FAST = "veo-3.1-fast-generate-preview"
+SLOW = "veo-3.1-generate-preview"
+
+
+def make_router(tmp_path, **settings):
+    return ModelRouter(settings=settings, path=str(tmp_path / "model_latency.json"))
+
+
+def test_explicit_model_always_wins(tmp_path):
+    router = make_router(tmp_path, policy=FASTEST_HEALTHY, models=[SLOW, FAST])
+    assert router.choose("veo-pinned") == "veo-pinned"
+
+
+def test_unknown_policy_falls_back_to_current_model(tmp_path):
+    assert make_router(tmp_path, policy="cheapest").policy == CURRENT_MODEL
+
+
+def test_fastest_healthy_measures_then_picks_lowest_median(tmp_path):
+    router = make_router(tmp_path, policy=FASTEST_HEALTHY, models=[SLOW, FAST], min_samples=2)
+    # Every candidate is tried until it has enough samples.
+    assert router.choose() == SLOW
+    for seconds in (100, 120):
+        router.record(SLOW, seconds)
+    assert router.choose() == FAST
+    for seconds in (40, 50):
+        router.record(FAST, seconds)
+    assert router.choose() == FAST
+
+
+def test_failing_model_is_avoided_until_cooldown(tmp_path, monkeypatch):
+    router = make_router(
+        tmp_path, policy=FASTEST_HEALTHY, models=[FAST, SLOW], min_samples=2, max_failure_rate=0.3, cooldown_seconds=60
+    )
+    for seconds in (40, 50):
+        router.record(FAST, seconds)
+        router.record(SLOW, seconds * 2)
+    for _ in range(3):
+        router.record(FAST, None, ok=False)
+
+    assert router.stats()["models"][FAST]["failure_rate"] == 0.6
+    assert not router.is_healthy(FAST)
+    assert router.choose() == SLOW
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert router.is_healthy(FAST)
+
+
+def test_history_is_shared_through_the_file(tmp_path):
+    router = make_router(tmp_path)
+    router.record(FAST, 42)
+    router.history.flush()
+    assert make_router(tmp_path).stats()["models"][FAST]["samples"] == 1
+
+
+def test_hedge_delay_follows_latency_percentile(tmp_path):
+    router = make_router(tmp_path, min_samples=3, hedge={"enabled": True, "percentile": 0.9, "min_delay": 30, "fallback_delay": 90})
+    assert router.hedge_delay(SLOW) == 90
+    for seconds in (10, 20, 100, 200, 300):
+        router.record(SLOW, seconds)
+    assert router.hedge_delay(SLOW) == 300
+    router = make_router(tmp_path / "other", min_samples=3, hedge={"enabled": True, "min_delay": 30})
+    for seconds in (1, 2, 3):
+        router.record(SLOW, seconds)
+    assert router.hedge_delay(SLOW) == 30
+
+
+def test_only_interactive_requests_are_hedged(tmp_path):
+    router = make_router(tmp_path, hedge={"enabled": True, "model": FAST})
+
+    async def hedge_model(priority, model):
+        async def check():
+            return router.hedge_model(model)
+
+        return await with_priority(check(), priority)
+
+    assert asyncio.run(hedge_model(INTERACTIVE, SLOW)) == FAST
+    assert asyncio.run(hedge_model(BATCH, SLOW)) is None
+    assert asyncio.run(hedge_model(INTERACTIVE, FAST)) is None
+
+
+def test_client_returns_first_result_of_hedged_request(make_fake, make_client, tmp_path):
+    fake = make_fake(generation_seconds=5, fast_generation_seconds=0.1)
+    router = make_router(
+        tmp_path,
+        hedge={"enabled": True, "model": FAST, "min_delay": 0, "fallback_delay": 0.05, "interactive_only": False},
+    )
+    client = make_client(fake, router=router)
+
+    started = time.monotonic()
+    result = asyncio.run(client.generate_video_result("A prompt", model=SLOW))
+
+    assert result["model"] == FAST
+    assert time.monotonic() - started < 3
+    assert router.hedged == 1 and router.hedge_wins == 1
+    assert fake.calls["generate_videos"] == 2
+    # The losing request is cancelled and its job closed.
+    states = {job["model"]: job["state"] for job in client.job_store.list_jobs()}
+    assert states == {SLOW: "failed", FAST: "succeeded"}
@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+import pytest
+
+from app.scheduler import BATCH, INTERACTIVE, RequestScheduler, TokenBucket, is_submit_retryable, retry_after_seconds
+from fake_genai import FakeAPIError, FakeObject
+
+
+def make_scheduler(**limits):
+    return RequestScheduler(
+        settings={
+            "limits": {"veo-test": limits} if limits else {},
+            "retry": {"max_retries": 3, "base_delay": 0.01, "max_delay": 0.05, "jitter": 0},
+        }
+    )
+
+
+def rate_limited(retry_after=None):
+    error = FakeAPIError(429, "RESOURCE_EXHAUSTED", "Quota exceeded")
+    if retry_after is not None:
+        error.response = FakeObject(headers={"Retry-After": str(retry_after)})
+    return error
+
+
+def failing(errors, result="ok"):
+    """Async callable raising each of `errors` in turn, then returning `result`; records call times."""
+    calls = []
+
+    async def call():
+        calls.append(time.monotonic())
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return call, calls
+
+
+def test_retry_after_is_read_from_header_and_details():
+    assert retry_after_seconds(rate_limited(7)) == 7
+    error = rate_limited()
+    error.details = {"error": {"details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "17s"}]}}
+    assert retry_after_seconds(error) == 17
+    assert retry_after_seconds(rate_limited()) is None
+
+
+def test_rate_limit_pauses_every_caller_for_retry_after():
+    scheduler = make_scheduler()
+    first, first_calls = failing([rate_limited(0.2)])
+    second, second_calls = failing([])
+
+    async def run():
+        async def later():
+            await asyncio.sleep(0.05)
+            return await scheduler.call("veo-test", second)
+
+        return await asyncio.gather(scheduler.call("veo-test", first), later())
+
+    assert asyncio.run(run()) == ["ok", "ok"]
+    # The second caller arrived during the pause and waited for it instead of hitting the limit.
+    assert second_calls[0] - first_calls[0] >= 0.19
+    assert first_calls[1] - first_calls[0] >= 0.19
+    stats = scheduler.stats()["veo-test"]
+    assert stats["rate_limited"] == 1 and stats["retries"] == 1 and stats["calls"] == 3
+
+
+def test_submit_is_only_retried_when_surely_rejected():
+    scheduler = make_scheduler()
+    unavailable, unavailable_calls = failing([FakeAPIError(503, "UNAVAILABLE", "down")])
+    assert asyncio.run(scheduler.call("veo-test", unavailable, retryable=is_submit_retryable)) == "ok"
+    assert len(unavailable_calls) == 2
+
+    # A 500 may have started a (billed) operation anyway.
+    internal, internal_calls = failing([FakeAPIError(500, "INTERNAL", "boom")])
+    with pytest.raises(FakeAPIError):
+        asyncio.run(scheduler.call("veo-test", internal, retryable=is_submit_retryable))
+    assert len(internal_calls) == 1
+
+
+def test_gives_up_after_max_retries():
+    scheduler = make_scheduler()
+    call, calls = failing([FakeAPIError(503, "UNAVAILABLE", "down")] * 10)
+    with pytest.raises(FakeAPIError):
+        asyncio.run(scheduler.call("veo-test", call))
+    assert len(calls) == scheduler.max_retries + 1
+
+
+def test_interactive_waiters_overtake_batch_waiters():
+    bucket = TokenBucket(rate=20, burst=1)
+    order = []
+
+    async def take(name, priority, delay):
+        await asyncio.sleep(delay)
+        await bucket.acquire(priority)
+        order.append(name)
+
+    async def run():
+        await bucket.acquire(BATCH)
+        await asyncio.gather(
+            take("batch-1", BATCH, 0),
+            take("batch-2", BATCH, 0.001),
+            take("interactive", INTERACTIVE, 0.002),
+        )
+
+    asyncio.run(run())
+    assert order == ["interactive", "batch-1", "batch-2"]
+
+
+def test_requests_per_minute_limit_spaces_calls():
+    scheduler = make_scheduler(requests_per_minute=600, burst=1)
+    times = []
+
+    async def call():
+        times.append(time.monotonic())
+
+    async def run():
+        await asyncio.gather(*(scheduler.call("veo-test", call) for _ in range(4)))
+
+    asyncio.run(run())
+    assert times[-1] - times[0] >= 0.28
+
+
+def test_client_retries_rate_limited_submit(make_fake, make_client, monkeypatch):
+    fake = make_fake()
+    client = make_client(fake)
+    original = fake.aio.models.generate_videos
+    errors = [rate_limited(0.01)]
+
+    async def generate_videos(**kwargs):
+        if errors:
+            fake.calls["generate_videos"] += 1
+            raise errors.pop()
+        return await original(**kwargs)
+
+    monkeypatch.setattr(fake.aio.models, "generate_videos", generate_videos)
+    result = asyncio.run(client.generate_video_result("A prompt", model="veo-test"))
+
+    assert result["video_path"]
+    assert fake.calls["generate_videos"] == 2
+    # Quota pressure says nothing about the model's health.
+    assert client.router.stats()["models"]["veo-test"]["failure_rate"] == 0
@@ -0,0 +1,128 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from app.metrics import PROMETHEUS_CONTENT_TYPE
+from app.server import create_server
+
+
+@pytest.fixture
+def server(make_fake, make_client):
+    fake = make_fake()
+    server = create_server(port=0, workers=2, client=make_client(fake))
+    server.fake = fake
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.service.close()
+
+
+def request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=30)
+    try:
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.getheader("Content-Type"), response.read()
+    finally:
+        connection.close()
+
+
+def request_json(server, method, path, body=None):
+    status, _, data = request(server, method, path, body)
+    return status, json.loads(data)
+
+
+def read_events(server, job_id, last_event_id=None):
+    """Follow a job's event stream until the server closes it; returns (event, data) pairs."""
+    headers = {"Last-Event-ID": str(last_event_id)} if last_event_id is not None else {}
+    status, content_type, body = request(server, "GET", f"/jobs/{job_id}/events", headers=headers)
+    assert status == 200 and content_type.startswith("text/event-stream")
+    events = []
+    for block in body.decode("utf-8").split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":"))
+        if fields:
+            events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_generate_job_streams_events_until_done(server):
+    status, job = request_json(server, "POST", "/jobs", {"prompt": "A prompt", "model": "veo-test", "priority": "batch"})
+    assert status == 202 and job["kind"] == "generate"
+
+    events = read_events(server, job["id"])
+    assert [event_id for event_id, _, _ in events] == list(range(len(events)))
+    statuses = [data["status"] for _, event, data in events if event == "status"]
+    assert statuses == ["queued", "running", "succeeded"]
+    assert any(event == "progress" for _, event, _ in events)
+    # Client log lines are routed to the job that produced them.
+    assert any(event == "log" and "submitted" in data["message"] for _, event, data in events)
+
+    # Reconnecting with Last-Event-ID replays only what was missed.
+    assert read_events(server, job["id"], last_event_id=events[-2][0]) == events[-1:]
+
+    status, finished = request_json(server, "GET", f"/jobs/{job['id']}")
+    assert finished["status"] == "succeeded" and finished["result"]["model"] == "veo-test"
+    assert finished["progress"]["fraction"] == 1 and finished["progress"]["eta_s"] == 0
+
+    status, content_type, video = request(server, "GET", f"/jobs/{job['id']}/video")
+    assert status == 200 and content_type == "video/mp4"
+    assert len(video) == server.fake.settings.video_size_bytes
+
+
+def test_analyze_job_emits_veo_prompt(server, reference_video):
+    status, job = request_json(server, "POST", "/jobs", {"kind": "analyze", "reference_video": reference_video})
+    assert status == 202
+
+    events = read_events(server, job["id"])
+    [veo_prompt] = [data["veo_prompt"] for _, event, data in events if event == "veo_prompt"]
+    status, finished = request_json(server, "GET", f"/jobs/{job['id']}")
+    assert finished["result"]["final_prompt"] == veo_prompt
+    assert server.fake.calls["generate_videos"] == 0
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        ({"kind": "edit", "prompt": "p"}, "'kind'"),
+        ({"prompt": "p", "priority": "urgent"}, "'priority'"),
+        ({"prompt": "p", "seed": "abc"}, "'seed'"),
+        ({}, "needs a 'prompt'"),
+        ({"kind": "analyze", "reference_video": "/no/such/video.mp4"}, "not found"),
+        ("not json", "Expecting value"),
+    ],
+)
+def test_invalid_jobs_are_rejected(server, body, message):
+    status, error = request_json(server, "POST", "/jobs", body)
+    assert status == 400
+    assert message in error["error"]
+    assert request_json(server, "GET", "/jobs")[1]["jobs"] == []
+
+
+def test_invalid_content_length_is_rejected(server):
+    status, _, body = request(server, "POST", "/jobs", body=b"{}", headers={"Content-Length": "-5"})
+    assert status == 400
+    assert json.loads(body)["error"] == "Invalid Content-Length"
+
+
+def test_unknown_routes_and_jobs_return_404(server):
+    assert request(server, "GET", "/nothing")[0] == 404
+    assert request(server, "GET", "/jobs/unknown")[0] == 404
+    assert request(server, "POST", "/jobs/unknown", {"prompt": "p"})[0] == 404
+
+
+def test_health_and_metrics(server):
+    status, job = request_json(server, "POST", "/jobs", {"prompt": "A prompt", "model": "veo-test"})
+    read_events(server, job["id"])
+
+    status, health = request_json(server, "GET", "/health")
+    assert status == 200 and health["jobs"]["succeeded"] == 1
+
+    status, content_type, body = request(server, "GET", "/metrics")
+    assert status == 200 and content_type == PROMETHEUS_CONTENT_TYPE
+    assert 'stage="veo_submit"' in body.decode("utf-8")
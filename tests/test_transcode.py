@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+
+import pytest
+
+from app.transcode import ReferencePreprocessor, StubTranscoder, TranscodeOptions, Transcoder
+
+
+class SlowStubTranscoder(StubTranscoder):
+    """StubTranscoder that holds each transcode long enough for callers to overlap."""
+
+    def transcode(self, src_path, dest_path, options):
+        time.sleep(0.2)
+        super().transcode(src_path, dest_path, options)
+
+
+def make_source(tmp_path, size=4096):
+    path = tmp_path / "reference.mp4"
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def make_preprocessor(tmp_path, transcoder):
+    return ReferencePreprocessor(
+        transcoder=transcoder,
+        options=TranscodeOptions(),
+        directory=str(tmp_path / "transcoded"),
+        enabled=True,
+    )
+
+
+def test_transcoded_output_is_cached(tmp_path):
+    source = make_source(tmp_path)
+    transcoder = StubTranscoder(output_bytes=1024)
+    preprocessor = make_preprocessor(tmp_path, transcoder)
+
+    first = preprocessor.prepare(source, "abc")
+    second = preprocessor.prepare(source, "abc")
+
+    assert first == second != source
+    assert os.path.getsize(first) == 1024
+    assert len(transcoder.calls) == 1
+
+
+def test_small_source_is_kept_with_marker(tmp_path):
+    source = make_source(tmp_path)
+    # A full copy is not smaller than the source, so the original should be uploaded.
+    transcoder = StubTranscoder()
+    preprocessor = make_preprocessor(tmp_path, transcoder)
+
+    assert preprocessor.prepare(source, "abc") == source
+    markers = [name for name in os.listdir(preprocessor.directory) if name.endswith(".original")]
+    assert len(markers) == 1
+    assert not [name for name in os.listdir(preprocessor.directory) if name.endswith((".mp4", ".part"))]
+
+    assert preprocessor.prepare(source, "abc") == source
+    assert len(transcoder.calls) == 1
+
+
+def test_failed_transcode_falls_back_to_original(tmp_path):
+    source = make_source(tmp_path)
+    preprocessor = make_preprocessor(tmp_path, StubTranscoder(fail=True))
+
+    assert preprocessor.prepare(source, "abc") == source
+    assert os.listdir(preprocessor.directory) == []
+
+
+def test_concurrent_calls_share_one_transcode(tmp_path):
+    source = make_source(tmp_path)
+    transcoder = SlowStubTranscoder(output_bytes=1024)
+    preprocessor = make_preprocessor(tmp_path, transcoder)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(preprocessor.prepare(source, "abc"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(transcoder.calls) == 1
+    assert len(set(results)) == 1 and results[0] != source
+
+
+def test_transcoder_requires_backend_methods():
+    class Incomplete(Transcoder):
+        def available(self):
+            return True
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_cache_evicts_least_recently_used_outputs(tmp_path):
+    transcoder = StubTranscoder(output_bytes=1024)
+    preprocessor = ReferencePreprocessor(
+        transcoder=transcoder,
+        options=TranscodeOptions(),
+        directory=str(tmp_path / "transcoded"),
+        enabled=True,
+        max_bytes=2048,
+    )
+    source = make_source(tmp_path)
+    first = preprocessor.prepare(source, "first")
+    second = preprocessor.prepare(source, "second")
+    os.utime(first, (time.time() - 60, time.time() - 60))
+    os.utime(second, (time.time() - 30, time.time() - 30))
+    # A hit makes "first" the most recently used, so "second" goes when "third" arrives.
+    preprocessor.prepare(source, "first")
+    third = preprocessor.prepare(source, "third")
+
+    assert os.path.exists(first) and os.path.exists(third)
+    assert not os.path.exists(second)
+
+
+def test_cache_drops_entries_past_max_age(tmp_path):
+    source = make_source(tmp_path)
+    preprocessor = make_preprocessor(tmp_path, StubTranscoder(output_bytes=1024))
+    old = preprocessor.prepare(source, "old")
+    stale = time.time() - (preprocessor.max_age_days + 1) * 86400
+    os.utime(old, (stale, stale))
+
+    preprocessor.prepare(source, "new")
+
+    assert not os.path.exists(old)
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import os
+
+import app.upload_cache
+from app.upload_cache import UploadCache
+
+
+def count_hashes(monkeypatch):
+    calls = []
+    original = app.upload_cache.file_sha256
+
+    def counting(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(app.upload_cache, "file_sha256", counting)
+    return calls
+
+
+def test_unchanged_file_is_not_hashed_again(tmp_path, reference_video, monkeypatch):
+    calls = count_hashes(monkeypatch)
+    cache = UploadCache(path=str(tmp_path / "uploads.json"))
+
+    first = cache.content_hash(reference_video)
+    assert cache.content_hash(reference_video) == first
+    assert len(calls) == 1
+
+    # A new process reads the index from disk.
+    assert UploadCache(path=cache.path).content_hash(reference_video) == first
+    assert len(calls) == 1
+
+    with open(reference_video, "ab") as f:
+        f.write(b"changed")
+    assert cache.content_hash(reference_video) != first
+    assert len(calls) == 2
+
+
+def test_path_index_keeps_only_uploaded_files(tmp_path, make_fake):
+    path = str(tmp_path / "uploads.json")
+    uploaded, abandoned, other = (tmp_path / f"{name}.mp4" for name in ("uploaded", "abandoned", "other"))
+    for i, video in enumerate((uploaded, abandoned, other)):
+        video.write_bytes(bytes([i]) * 1024)
+
+    cache = UploadCache(path=path)
+    sha256 = cache.content_hash(str(uploaded))
+    file = asyncio.run(make_fake().aio.files.upload(file=str(uploaded)))
+    cache.store(sha256, file)
+    cache.content_hash(str(abandoned))
+
+    # A later process prunes the entry whose upload never finished.
+    UploadCache(path=path).content_hash(str(other))
+    with open(path, "r", encoding="utf-8") as f:
+        paths = json.load(f)["paths"]
+    assert os.path.abspath(uploaded) in paths
+    assert os.path.abspath(abandoned) not in paths
+
+
+def test_client_reuses_cached_upload(make_fake, make_client, reference_video):
+    fake = make_fake()
+    client = make_client(fake)
+
+    async def analyze_twice():
+        for _ in range(2):
+            await client.analyze_reference_video(reference_video, use_cache=False)
+
+    asyncio.run(analyze_twice())
+    assert fake.calls["upload"] == 1
+    assert fake.calls["generate_content"] == 2